@@ -32,7 +32,8 @@ class ActionManager:
         else:
             print("[AM] DirectKS: MISSING - ACTIONS WILL FAIL", flush=True)
 
-    def update(self, active_tokens):
+    def update(self, active_tokens, trace=None):
+        """Applies one token set. `trace` (bridge FrameTrace) is stamped once key events are sent."""
         if not HAS_DX:
             print("[AM] Ignored update (No DirectKS)", flush=True)
             return
@@ -88,4 +89,6 @@ class ActionManager:
                     self.cooldowns[token] = now + self.COOLDOWN
                     print(f"[ACTION] RELEASE {token.upper()} (Held {int(duration*1000)}ms)", flush=True)
 
+        if trace is not None: trace.mark_report()
+
 action_manager = ActionManager()
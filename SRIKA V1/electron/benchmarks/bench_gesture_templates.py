@@ -0,0 +1,120 @@
+"""
+Gesture Template Benchmark
+Streaming DTW cost with and without lower-bound pruning, for a template
+set of recorded gestures plus random distractors (dozens in total).
+
+Templates are recorded from noise-free synthetic motion
+(benchmarks/synthetic_motion.py): a left / right punch and a left / right
+knee lift. Distractors are smooth random trajectories over random joints.
+Each scenario stream is matched twice (pruned / unpruned); the two must
+emit the same tokens on the same frames, since pruning only skips work
+that cannot produce a match.
+
+Usage: python benchmarks/bench_gesture_templates.py [--templates 48] [--frames 3000] [--budget-us 1000]
+"""
+
+import os
+import sys
+import time
+import argparse
+from collections import Counter
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+import numpy as np
+
+from bridge_metrics import percentile
+from gesture_templates import GestureMatcher, template_from_frames, MATCH_FPS
+from synthetic_motion import SyntheticMotion, FLURRY_SIDES, FLURRY_PERIOD
+
+STREAMS = ('idle', 'punch_flurry', 'kicks', 'steering_sweep')
+
+
+class FrameClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def recorded_templates():
+    """Templates cut from clean synthetic performances"""
+    kicks = SyntheticMotion('kicks', 0, noise=0.0).frames(48)
+    specs = []
+    for side, name in enumerate(('punch_l', 'punch_r')):
+        k = FLURRY_SIDES.index(side)
+        start = k * FLURRY_PERIOD
+        frames = SyntheticMotion('punch_flurry', 0, noise=0.0).frames(start + 12)[start:]
+        specs.append(template_from_frames(frames, [15 + side, 13 + side], 'xyz', name, token=name.upper(), threshold=0.12))
+    for side, name in enumerate(('knee_l', 'knee_r')):
+        start = 24 * side
+        specs.append(template_from_frames(kicks[start:start + 14], [25 + side, 27 + side], 'xy', name,
+                                          token=name.upper(), threshold=0.10))
+    return specs
+
+def distractor_templates(n, seed):
+    """Smooth random trajectories over random joint pairs (never performed in the streams)"""
+    rng = np.random.default_rng(seed)
+    specs = []
+    for i in range(n):
+        joints = rng.choice(np.arange(11, 29), size=2, replace=False).tolist()
+        length = int(rng.integers(6, 20))
+        start = rng.normal(0, 1.0, 4)
+        steps = rng.normal(0, 0.15, (length, 4)).cumsum(axis=0)
+        specs.append({'name': f"noise_{i}", 'token': f"N{i}", 'joints': joints, 'axes': 'xy', 'fps': MATCH_FPS,
+                      'trajectory': (start + steps).tolist(), 'threshold': 0.12})
+    return specs
+
+def run(specs, frames, prune):
+    clock = FrameClock()
+    matcher = GestureMatcher(specs, prune=prune)
+    perf = time.perf_counter
+    costs, events = [], []
+    for i, f in enumerate(frames):
+        clock.now = f.capture_ts
+        start = perf()
+        tokens = matcher.update(f, clock)
+        costs.append(perf() - start)
+        events += [(i, t) for t in tokens]
+    return matcher, costs, events
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--templates', type=int, default=48, help="Total templates (4 recorded + distractors)")
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--streams', nargs='*', default=list(STREAMS), choices=STREAMS)
+    parser.add_argument('--budget-us', type=float, default=1000.0, help="Fail when a pruned p99 exceeds this")
+    args = parser.parse_args()
+
+    specs = recorded_templates()
+    specs += distractor_templates(max(0, args.templates - len(specs)), args.seed)
+    print(f"Templates={len(specs)} Frames={args.frames} MatchFps={MATCH_FPS:.0f}", flush=True)
+
+    failed = False
+    for scenario in args.streams:
+        frames = SyntheticMotion(scenario, 0, seed=args.seed).frames(args.frames)
+        results = {}
+        for prune in (False, True):
+            matcher, costs, events = run(specs, frames, prune)
+            ordered = sorted(costs)
+            results[prune] = events
+            label = "pruned" if prune else "full"
+            skipped = matcher.pruned / max(1, matcher.pruned + matcher.evaluated)
+            print(
+                f"{scenario:<15} {label:<6} mean={sum(costs) / len(costs) * 1e6:7.1f}us p99={percentile(ordered, 99) * 1e6:7.1f}us"
+                f" max={ordered[-1] * 1e6:7.1f}us | Skipped={skipped:6.1%} | Matches={dict(sorted(Counter(t for _, t in events).items()))}",
+                flush=True,
+            )
+            if prune and percentile(ordered, 99) * 1e6 > args.budget_us:
+                print(f"REGRESSION: {scenario} p99 over {args.budget_us:.0f}us", flush=True)
+                failed = True
+        same = results[True] == results[False]
+        print(f"{scenario:<15} Lossless={'YES' if same else 'NO'}", flush=True)
+        failed |= not same
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Hand Feature Benchmark
+Asphalt hand gestures (palm scale, fold ratio, thumb extension) for 0, 1
+and 2 hands per frame:
+
+- dict scalar    : per-hand loop of dict distance calls (original preset),
+                   on prebuilt dicts and including the dicts of an array frame
+- per-hand array : one distances() call, then a Python loop per hand
+- extractor      : HandFeatureExtractor (float math for a frame's 1-2 hands)
+- gather         : the extractor forced onto one hand_distances() gather
+- session        : hand_features() over a whole session (offline batch)
+
+Also checks that every variant raises the same nitro / brake signals.
+Synthetic frames label the image-left hand 'Left', as the tracker does.
+
+Usage: python benchmarks/bench_hand_features.py [--frames N] [--hands 0 1 2] [--scenario nitro]
+"""
+
+import os
+import sys
+import math
+import time
+import argparse
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+import numpy as np
+
+from landmark_frame import distances, X
+import hand_features as features_module
+from hand_features import (HandFeatureExtractor, hand_features, session_hand_slots, HAND_PAIRS_A, HAND_PAIRS_B,
+                           PRESENT, FOLD_RATIO, THUMB_INDEX, THUMB_WRIST)
+from preset_batch import BatchSession
+from synthetic_motion import SyntheticMotion, SCENARIOS
+
+
+def dist(p1, p2):
+    return math.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2)
+
+def dict_signals(pose_lm, hands_lm):
+    """Reference: the preset's original per-hand dict math (brake = hand left of mid-shoulder)"""
+    nitro = brake = False
+    mid_shoulder_x = (pose_lm[11]['x'] + pose_lm[12]['x']) / 2
+    for hand in hands_lm:
+        wrist = hand[0]
+        palm = (dist(wrist, hand[5]) + dist(wrist, hand[9]) + dist(wrist, hand[13]) + dist(wrist, hand[17])) / 4
+        if palm < 0.01: continue
+        fold = (dist(hand[8], hand[5]) + dist(hand[12], hand[9]) + dist(hand[16], hand[13]) + dist(hand[20], hand[17])) / 4 / palm
+        if fold < 0.40 and dist(hand[4], hand[5]) / palm > 1.50 and dist(hand[4], wrist) / palm > 1.70:
+            nitro = True
+        if wrist['x'] < mid_shoulder_x and fold > 0.95:
+            brake = True
+    return nitro, brake
+
+def loop_signals(frame):
+    """Previous preset: distances() for all hands, Python loop over the rows"""
+    nitro = brake = False
+    if frame.hand_count:
+        (ls, _), (rs, _) = frame.pose[[11, 12], :2].tolist()
+        hands = frame.hands
+        for d, hand_x in zip(distances(hands[:, HAND_PAIRS_A], hands[:, HAND_PAIRS_B]).tolist(), hands[:, 0, X].tolist()):
+            palm = (d[0] + d[1] + d[2] + d[3]) / 4
+            if palm < 0.01: continue
+            fold = (d[4] + d[5] + d[6] + d[7]) / 4 / palm
+            if fold < 0.40 and d[8] / palm > 1.50 and d[9] / palm > 1.70:
+                nitro = True
+            if hand_x < (ls + rs) / 2 and fold > 0.95:
+                brake = True
+    return nitro, brake
+
+def batched_signals(extractor, frame):
+    nitro = brake = False
+    if frame.hand_count:
+        left, right = extractor.extract(frame)
+        for f in (left, right):
+            if f[PRESENT] and f[FOLD_RATIO] < 0.40 and f[THUMB_INDEX] > 1.50 and f[THUMB_WRIST] > 1.70:
+                nitro = True
+        brake = bool(left[PRESENT]) and left[FOLD_RATIO] > 0.95
+    return nitro, brake
+
+def session_signals(session):
+    feats = hand_features(*session_hand_slots(session.hands, session.hand_counts, session.right_hands))
+    valid = feats[..., PRESENT] > 0
+    fold = feats[..., FOLD_RATIO]
+    nitro = (valid & (fold < 0.40) & (feats[..., THUMB_INDEX] > 1.50) & (feats[..., THUMB_WRIST] > 1.70)).any(axis=1)
+    brake = valid[:, 0] & (fold[:, 0] > 0.95)
+    return list(zip(nitro.tolist(), brake.tolist()))
+
+def bench(label, fn, items, repeat):
+    best, out = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        out = [fn(item) for item in items]
+        best = min(best, time.perf_counter() - start)
+    us = best / len(items) * 1e6
+    print(f"  {label:<16} {us:8.2f} us/frame", flush=True)
+    return us, out
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--hands', nargs='*', type=int, default=[0, 1, 2], choices=[0, 1, 2])
+    parser.add_argument('--scenario', default='brake', choices=SCENARIOS)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Frames={args.frames} Scenario={args.scenario}", flush=True)
+    for n_hands in args.hands:
+        frames = SyntheticMotion(args.scenario, n_hands, seed=args.seed).frames(args.frames)
+        dicts = [f.to_dicts()[:2] for f in frames]
+        print(f"Hands={n_hands}", flush=True)
+        base, ref = bench("dict scalar", lambda lm: dict_signals(*lm), dicts, args.repeat)
+        bench("dict + to_dicts", lambda f: dict_signals(*f.to_dicts()[:2]), frames, args.repeat)
+        _, loop = bench("per-hand array", loop_signals, frames, args.repeat)
+        extractor = HandFeatureExtractor()
+        batched_us, batched = bench("extractor", lambda f: batched_signals(extractor, f), frames, args.repeat)
+        scalar_max, features_module.SCALAR_MAX_HANDS = features_module.SCALAR_MAX_HANDS, 0
+        _, gathered = bench("gather", lambda f: batched_signals(extractor, f), frames, args.repeat)
+        features_module.SCALAR_MAX_HANDS = scalar_max
+
+        start = time.perf_counter()
+        session = session_signals(BatchSession.from_frames(frames))
+        session_us = (time.perf_counter() - start) / len(frames) * 1e6
+        print(f"  {'session':<16} {session_us:8.2f} us/frame (incl. stacking)", flush=True)
+
+        match = ref == loop == batched == gathered == session
+        counts = {'nitro': sum(n for n, _ in batched), 'brake': sum(b for _, b in batched)}
+        print(f"  ratio x{base / batched_us:.2f} vs dict | Match={'YES' if match else 'NO'} | Signals={counts}", flush=True)
+
+if __name__ == "__main__":
+    main()
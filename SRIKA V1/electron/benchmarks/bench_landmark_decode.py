@@ -0,0 +1,62 @@
+"""
+Landmark Decode Benchmark
+Compares per-frame decode cost of RAW_LM (JSON) vs RAW_LMB (binary).
+
+Usage: python benchmarks/bench_landmark_decode.py [--frames N] [--hands 0|1|2]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from landmark_protocol import encode_line, decode_line, decode_frame, BINARY_PREFIX
+import binascii
+
+def make_frame(n_hands, rng):
+    pose = [{'x': rng.random(), 'y': rng.random(), 'z': rng.uniform(-1, 1), 'visibility': rng.random()} for _ in range(33)]
+    hands = [[{'x': rng.random(), 'y': rng.random(), 'z': rng.uniform(-0.1, 0.1)} for _ in range(21)] for _ in range(n_hands)]
+    handedness = [{'index': i, 'score': 0.98, 'label': 'Left' if i == 0 else 'Right'} for i in range(n_hands)]
+    return pose, hands, handedness
+
+def bench(label, fn, lines):
+    start = time.perf_counter()
+    for line in lines:
+        fn(line)
+    elapsed = time.perf_counter() - start
+    per_frame_us = elapsed / len(lines) * 1e6
+    print(f"{label:<32} {per_frame_us:8.2f} us/frame  ({len(lines) / elapsed:10.0f} fps)", flush=True)
+    return per_frame_us
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=5000)
+    parser.add_argument('--hands', type=int, default=2, choices=[0, 1, 2])
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    frames = [make_frame(args.hands, rng) for _ in range(64)]
+
+    json_lines = []
+    bin_lines = []
+    for i in range(args.frames):
+        pose, hands, handedness = frames[i % len(frames)]
+        json_lines.append('RAW_LM:' + json.dumps({'pose': pose, 'hands': hands, 'handedness': handedness}))
+        bin_lines.append(encode_line(pose, hands, handedness, frame_id=i, capture_ts=time.time()))
+
+    print(f"Frames={args.frames} Hands={args.hands}", flush=True)
+    print(f"Line size: JSON={len(json_lines[0])}B  BINARY={len(bin_lines[0])}B", flush=True)
+
+    json_us = bench("RAW_LM  (json.loads)", decode_line, json_lines)
+    raw_us = bench("RAW_LMB (decode only)",
+                   lambda l: decode_frame(binascii.a2b_base64(l[len(BINARY_PREFIX):])), bin_lines)
+    legacy_us = bench("RAW_LMB (decode + dicts)", decode_line, bin_lines)
+
+    print(f"Speedup: decode only x{json_us / raw_us:.1f} | with dicts x{json_us / legacy_us:.1f}", flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Landmark Frame Benchmark
+Per-frame preset cost: legacy dict landmarks vs array-backed LandmarkFrame.
+
+Measures
+- geometry helpers: scalar dict math vs joint_angles / joint_distances on the
+  frame arrays (what the presets use) vs the vectorized batch helpers
+- every preset: decode -> dicts -> process()  vs  decode -> LandmarkFrame -> process_frame()
+
+Pass `--baseline tekken=/path/to/old/logic.py` to time an older preset
+implementation (e.g. extracted with `git show`) alongside the current one.
+
+Usage: python benchmarks/bench_landmark_frame.py [--frames N] [--hands 0|1|2] [--baseline name=path ...]
+"""
+
+import io
+import os
+import sys
+import math
+import time
+import random
+import argparse
+import contextlib
+import importlib.util
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+import numpy as np
+
+from landmark_protocol import encode_line, decode_binary_line
+from landmark_frame import LandmarkFrame, distances, angles, joint_distances, joint_angles
+
+PRESETS = ('tekken', 'asphalt9')
+
+
+# Scalar reference helpers (as the presets computed them before LandmarkFrame)
+def dict_distance(p1, p2):
+    return math.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2)
+
+def dict_angle(a, b, c):
+    v1 = [a['x']-b['x'], a['y']-b['y'], a['z']-b['z']]
+    v2 = [c['x']-b['x'], c['y']-b['y'], c['z']-b['z']]
+    dot = v1[0]*v2[0] + v1[1]*v2[1] + v1[2]*v2[2]
+    mag1 = math.sqrt(v1[0]**2 + v1[1]**2 + v1[2]**2)
+    mag2 = math.sqrt(v2[0]**2 + v2[1]**2 + v2[2]**2)
+    if mag1 == 0 or mag2 == 0: return 0
+    return math.degrees(math.acos(max(-1.0, min(1.0, dot / (mag1 * mag2)))))
+
+
+def make_lines(n, n_hands, seed=42):
+    """Smooth synthetic motion so stateful presets take realistic branches"""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(n):
+        t = i / 60.0
+        pose = [{'x': 0.5 + 0.1 * math.sin(t * 3 + j), 'y': 0.1 + j * 0.025 + 0.1 * math.sin(t * 5 + j),
+                 'z': -0.1 + 0.5 * math.sin(t * 7 + j), 'visibility': 0.95} for j in range(33)]
+        hands = [[{'x': 0.3 + 0.4 * h + 0.03 * math.cos(j + t), 'y': 0.5 + 0.03 * math.sin(j) + rng.gauss(0, 0.002), 'z': 0.0}
+                  for j in range(21)] for h in range(n_hands)]
+        handedness = [{'label': 'Left' if h == 0 else 'Right'} for h in range(n_hands)]
+        lines.append(encode_line(pose, hands, handedness, frame_id=i + 1, capture_ts=time.time()))
+    return lines
+
+def load_logic(name, path):
+    spec = importlib.util.spec_from_file_location(f"bench_{name}", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.ControllerLogic
+
+def bench(label, fn, items, repeat=1):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()): # Presets print debug lines
+            for item in items:
+                fn(item)
+        best = min(best, time.perf_counter() - start)
+    per_frame_us = best / len(items) * 1e6
+    print(f"  {label:<40} {per_frame_us:8.2f} us/frame", flush=True)
+    return per_frame_us
+
+
+def bench_geometry(packets):
+    print("Geometry (elbow angles x2 + arm/torso distances x3)", flush=True)
+    dict_frames = [p.to_legacy()[0] for p in packets]
+    arr_frames = [LandmarkFrame.from_packet(p) for p in packets]
+    a_idx, b_idx, c_idx = np.array([11, 12]), np.array([13, 14]), np.array([15, 16])
+    da, db = np.array([11, 15, 16]), np.array([12, 11, 12])
+
+    def scalar(lm):
+        dict_angle(lm[11], lm[13], lm[15]); dict_angle(lm[12], lm[14], lm[16])
+        dict_distance(lm[11], lm[12]); dict_distance(lm[15], lm[11]); dict_distance(lm[16], lm[12])
+
+    ja, jb, jc, jda, jdb = (idx.tolist() for idx in (a_idx, b_idx, c_idx, da, db))
+    def joints(frame):
+        joint_angles(frame.pose, ja, jb, jc)
+        joint_distances(frame.pose, jda, jdb)
+
+    def vectorized(frame):
+        pose = frame.pose
+        angles(pose[a_idx], pose[b_idx], pose[c_idx]).tolist()
+        distances(pose[da], pose[db]).tolist()
+
+    before = bench("dict scalar", scalar, dict_frames, repeat=3)
+    after = bench("LandmarkFrame joint_* (per frame)", joints, arr_frames, repeat=3)
+    vector = bench("LandmarkFrame vectorized (per frame)", vectorized, arr_frames, repeat=3)
+    print(f"  ratio x{before / after:.2f} (vectorized x{before / vector:.2f})", flush=True)
+
+    # Where vectorizing pays: the same features for a whole session in one call
+    poses = np.stack([f.pose for f in arr_frames]).astype(np.float64)
+    start = time.perf_counter()
+    for _ in range(3):
+        angles(poses[:, a_idx], poses[:, b_idx], poses[:, c_idx])
+        distances(poses[:, da], poses[:, db])
+    print(f"  {'vectorized over all frames':<40} {(time.perf_counter() - start) / 3 / len(arr_frames) * 1e6:8.2f} us/frame", flush=True)
+
+def bench_preset(name, logic_cls, packets, lines, label):
+    print(f"Preset {name} ({label})", flush=True)
+    results = {}
+
+    logic = logic_cls()
+    results['dicts'] = bench("decode + dicts + process()",
+                             lambda line: logic.process(*decode_binary_line(line).to_legacy()), lines)
+    if hasattr(logic_cls, 'process_frame'):
+        logic = logic_cls()
+        results['frame'] = bench("decode + LandmarkFrame + process_frame()",
+                                 lambda line: logic.process_frame(LandmarkFrame.from_packet(decode_binary_line(line))), lines)
+        logic = logic_cls()
+        results['frame_only'] = bench("process_frame() only",
+                                      logic.process_frame, [LandmarkFrame.from_packet(p) for p in packets])
+    logic = logic_cls()
+    legacy = [p.to_legacy() for p in packets]
+    results['dicts_only'] = bench("process() only (prebuilt dicts)", lambda lm: logic.process(*lm), legacy)
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--hands', type=int, default=2, choices=[0, 1, 2])
+    parser.add_argument('--baseline', action='append', default=[], metavar='NAME=PATH',
+                        help="Older logic.py to time next to the current preset")
+    args = parser.parse_args()
+
+    lines = make_lines(args.frames, args.hands)
+    packets = [decode_binary_line(l) for l in lines]
+    print(f"Frames={args.frames} Hands={args.hands}", flush=True)
+
+    bench_geometry(packets)
+
+    baselines = dict(b.split('=', 1) for b in args.baseline)
+    for name in PRESETS:
+        path = os.path.join(ELECTRON_DIR, 'presets', name, 'logic.py')
+        if name in baselines:
+            bench_preset(name, load_logic(name + '_baseline', baselines[name]), packets, lines, "baseline")
+        bench_preset(name, load_logic(name, path), packets, lines, "current")
+
+if __name__ == "__main__":
+    main()
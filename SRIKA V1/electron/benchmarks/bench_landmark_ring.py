@@ -0,0 +1,64 @@
+"""
+Landmark Ring Load Test
+Runs the Python producer stand-in in a separate process and reads the
+newest slot the way the bridge does, reporting throughput and latency.
+
+Usage: python benchmarks/bench_landmark_ring.py [--fps 120|240] [--seconds N]
+"""
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from landmark_ring import LandmarkRingReader, run_producer
+from bridge_metrics import percentile
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--fps', type=float, default=240.0)
+    parser.add_argument('--seconds', type=float, default=5.0)
+    parser.add_argument('--poll', type=float, default=0.0005, help="Reader poll interval (s)")
+    parser.add_argument('--dicts', action='store_true', help="Also materialize legacy dicts per frame")
+    args = parser.parse_args()
+
+    name = f"srika_bench_{os.getpid()}"
+    producer = multiprocessing.Process(target=run_producer, args=(name, args.fps, args.seconds))
+    producer.start()
+
+    reader = None
+    while reader is None:
+        try: reader = LandmarkRingReader(name)
+        except FileNotFoundError: time.sleep(0.01)
+
+    latencies = []
+    read_cost = 0.0
+    frames = 0
+    while producer.is_alive() or reader.has_new():
+        if not reader.has_new():
+            time.sleep(args.poll)
+            continue
+        t0 = time.perf_counter()
+        packet = reader.read_latest()
+        if packet is None: continue
+        if args.dicts: packet.to_legacy()
+        read_cost += time.perf_counter() - t0
+        latencies.append(time.time() - packet.capture_ts)
+        frames += 1
+
+    producer.join()
+    written = reader.write_seq()
+    reader.close()
+
+    lat = sorted(latencies)
+    print(f"Target={args.fps:.0f}fps Written={written} Read={frames} Missed={reader.missed} Torn={reader.torn}"
+          f" Unaccounted={written - frames - reader.missed}", flush=True)
+    print(f"Read cost {read_cost / max(frames, 1) * 1e6:.2f} us/frame"
+          f" | Publish->read ms p50={percentile(lat, 50) * 1000:.3f} p95={percentile(lat, 95) * 1000:.3f}"
+          f" p99={percentile(lat, 99) * 1000:.3f}", flush=True)
+
+if __name__ == "__main__":
+    main()
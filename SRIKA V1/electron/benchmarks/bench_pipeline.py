@@ -0,0 +1,79 @@
+"""
+Pipeline Benchmark
+Frame loop latency with the backend report sent inline vs on the pipeline's
+backend stage, for a simulated backend that occasionally stalls (a ViGEm
+report waiting on the driver, a SendInput call behind a busy desktop).
+
+Each frame: simulated decode + preset work (busy loop, holds the GIL like
+the real presets), then a report. Reported per mode: frame loop time per
+frame (what the next frame waits for), reports sent / coalesced, and the
+backend stage's queue wait.
+
+Usage: python benchmarks/bench_pipeline.py [--frames 600] [--fps 60] [--backend-ms 1.5] [--stall-ms 12] [--stall-every 30]
+"""
+
+import os
+import sys
+import time
+import argparse
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+from bridge_metrics import percentile
+from pipeline import Stage, merge_reports
+
+
+def spin(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+def run(args, inline):
+    sent = []
+    def backend(item):
+        tokens, n = item
+        # Blocking backend call (releases the GIL like a driver / OS call)
+        time.sleep(args.stall_ms / 1000 if n % args.stall_every == 0 else args.backend_ms / 1000)
+        sent.append(n)
+
+    stage = Stage('backend', backend, capacity=2, policy='latest', merge=merge_reports, inline=inline)
+    period = 1.0 / args.fps
+    costs = []
+    next_at = time.perf_counter()
+    for n in range(args.frames):
+        now = time.perf_counter()
+        if next_at > now:
+            time.sleep(next_at - now)
+        next_at += period
+        start = time.perf_counter()
+        spin(args.preset_ms / 1000)
+        stage.submit((['RB', f"steer:{n % 7 / 10:.1f}"], n))
+        costs.append(time.perf_counter() - start)
+    stage.close(timeout=5.0)
+    return stage, sorted(costs), sent
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=600)
+    parser.add_argument('--fps', type=float, default=60.0)
+    parser.add_argument('--preset-ms', type=float, default=1.0, help="Decode + preset work per frame")
+    parser.add_argument('--backend-ms', type=float, default=1.5, help="Usual backend report time")
+    parser.add_argument('--stall-ms', type=float, default=12.0, help="Backend report time on a stall")
+    parser.add_argument('--stall-every', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"Frames={args.frames} Fps={args.fps:.0f} Preset={args.preset_ms}ms Backend={args.backend_ms}ms Stall={args.stall_ms}ms/{args.stall_every}", flush=True)
+    budget = 1000.0 / args.fps
+    for inline in (True, False):
+        stage, costs, sent = run(args, inline)
+        over = sum(1 for c in costs if c * 1000 > budget)
+        print(
+            f"{'inline' if inline else 'pipelined':<9} Loop p50={percentile(costs, 50) * 1000:6.3f}ms p99={percentile(costs, 99) * 1000:6.3f}ms"
+            f" max={costs[-1] * 1000:6.3f}ms | OverBudget={over} | Reports={len(sent)} Coalesced={stage.coalesced}"
+            f" | Wait p99<={stage.wait.percentile(99) * 1000:.3f}ms",
+            flush=True,
+        )
+
+if __name__ == "__main__":
+    main()
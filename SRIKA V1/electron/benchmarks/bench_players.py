@@ -0,0 +1,145 @@
+"""
+Multi-player Benchmark
+Couch versus: checks that the player batch (player_batch.py) gives every
+player exactly the tokens of an independent single-player pipeline
+(filter_frame + process_frame on their own preset instance), and reports
+its per-frame cost for 1, 2 and 4 players. "vs 1p" is the batch's cost
+relative to one single-player pipeline (about x1 per player: players run
+their own pipelines, nothing is shared).
+
+Player p's motion is the bench_preset_batch synthetic session with seed
+seed + p, on player 0's capture stamps (one camera); players 2+ step out
+of view now and then. Frames go through the multi-player wire format
+(encode_packet -> decode_frame -> LandmarkFrame.from_player_packet).
+
+Times are the best of --repeat runs (each run starts from fresh presets;
+independent and batched runs alternate).
+
+Usage: python benchmarks/bench_players.py [--frames N] [--seed S] [--players 1,2,4] [--repeat 3]
+"""
+
+import os
+import sys
+import time
+import argparse
+from array import array
+from collections import Counter
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+import numpy as np
+
+from landmark_protocol import LandmarkPacket, encode_packet, decode_frame
+from landmark_frame import LandmarkFrame
+from landmark_filter import filter_frame
+from player_batch import PlayerBatch
+from preset_batch import first_mismatch
+from preset_schema import CompiledPreset
+from bench_preset_batch import synthetic_session, load_logic, timed
+from bench_preset_schema import ASPHALT9_DEFINITION
+
+ABSENT_EVERY = 400 # Players 2+ are out of view for ABSENT_FOR frames of every ABSENT_EVERY
+ABSENT_FOR = 60
+
+
+class _Clock:
+    now = 0.0
+    def __call__(self):
+        return self.now
+
+def player_packets(frames, seed, players):
+    """(wire frames, stamps): one multi-player frame per camera frame"""
+    sessions = [synthetic_session(frames, seed + p) for p in range(players)]
+    stamps = sessions[0].timestamps
+    packets = []
+    for i in range(frames):
+        pose = array('f')
+        hands, labels, owners = [], [], []
+        for p, session in enumerate(sessions):
+            absent = p > 0 and (i + p * 97) % ABSENT_EVERY < ABSENT_FOR
+            pose.frombytes((np.zeros_like(session.poses[i]) if absent else session.poses[i]).tobytes())
+            for h in range(0 if absent else session.hand_counts[i]):
+                hands.append(array('f', session.hands[i, h].tobytes()))
+                labels.append('Right' if session.right_hands[i, h] else 'Left')
+                owners.append(p)
+        packet = LandmarkPacket(i + 1, stamps[i].item(), pose, hands, labels, players=players, hand_players=owners)
+        packets.append(encode_packet(packet))
+    return packets, stamps
+
+def run_independent(make_logic, packets, stamps, players):
+    """One single-player pipeline per player"""
+    clock = _Clock()
+    logics = [make_logic() for _ in range(players)]
+    for logic in logics:
+        logic.clock = clock
+    timeline = [[] for _ in range(players)]
+    for data, stamp in zip(packets, stamps.tolist()):
+        clock.now = stamp
+        frames = LandmarkFrame.from_player_packet(decode_frame(data))
+        for p, (logic, frame) in enumerate(zip(logics, frames)):
+            frame = filter_frame(logic, frame)
+            timeline[p].append(logic.process_frame(frame) if frame.has_pose else [])
+    return timeline
+
+def run_batched(make_logic, packets, stamps, players):
+    clock = _Clock()
+    logic = make_logic()
+    logic.clock = clock
+    batch = PlayerBatch(logic)
+    timeline = [[] for _ in range(players)]
+    for data, stamp in zip(packets, stamps.tolist()):
+        clock.now = stamp
+        tokens = batch.process(LandmarkFrame.from_player_packet(decode_frame(data)), optional=False)
+        for p in range(players):
+            timeline[p].append(tokens[p])
+    return timeline
+
+def best_of(repeat, *fns):
+    """(result, best time) of every fn; runs alternate, so a noisy stretch hits all of them alike"""
+    runs = [[timed(fn) for fn in fns] for _ in range(repeat)]
+    return [(runs[0][i][0], min(run[i][1] for run in runs)) for i in range(len(fns))]
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=6000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--players', default='1,2,4')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    presets = {
+        'tekken': load_logic('tekken'),
+        'asphalt9': load_logic('asphalt9'),
+        'schema': lambda: CompiledPreset(ASPHALT9_DEFINITION, preset_id='asphalt9-schema'),
+    }
+    counts = [int(n) for n in args.players.split(',')]
+    print(f"Frames={args.frames} Seed={args.seed}", flush=True)
+
+    ok = True
+    for name, make_logic in presets.items():
+        base = None
+        for players in counts:
+            packets, stamps = player_packets(args.frames, args.seed, players)
+            (independent, _), (batched, t_batch) = best_of(
+                args.repeat,
+                lambda: run_independent(make_logic, packets, stamps, players),
+                lambda: run_batched(make_logic, packets, stamps, players),
+            )
+            mismatches = [(p, first_mismatch(a, b)) for p, (a, b) in enumerate(zip(independent, batched))]
+            mismatches = [(p, i) for p, i in mismatches if i is not None]
+            base = base or (players, t_batch)
+            tokens = Counter(t.split(':')[0] for timeline in batched for frame in timeline for t in frame)
+            print(
+                f"{name:<9} Players={players}  Batch={t_batch / args.frames * 1e6:7.1f}us/frame"
+                f" | vs {base[0]}p x{t_batch / base[1]:4.2f} | Match={'YES' if not mismatches else 'NO'}"
+                f" | Tokens={sum(tokens.values())}",
+                flush=True,
+            )
+            for p, i in mismatches:
+                ok = False
+                print(f"  player {p + 1} first mismatch @{i}: independent={independent[p][i]} batched={batched[p][i]}", flush=True)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""
+Preset Batch Benchmark
+Checks that `process_batch()` reproduces the streaming token timeline
+exactly and compares the cost of both paths over a whole session.
+
+Sessions are synthetic: a jittery idle stance with punch / kick / burst
+impulses (Tekken) and sustained fist / open-palm segments with arm reach
+crossing the throttle thresholds (Asphalt 9). Capture timestamps include
+dropouts and repeated / out-of-order frames, and the body is lost for a few
+frames now and then.
+
+Usage: python benchmarks/bench_preset_batch.py [--frames N] [--seed S] [--fps F]
+"""
+
+import io
+import os
+import sys
+import time
+import argparse
+import contextlib
+import importlib.util
+from collections import Counter
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+import numpy as np
+
+from preset_batch import BatchSession, run_streaming, first_mismatch
+
+PRESETS = ('tekken', 'asphalt9')
+
+
+def synthetic_session(frames, seed=7, fps=60.0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / fps + rng.uniform(0, 0.2 / fps, frames) # Camera jitter
+    # Tracking dropouts, then repeated / out-of-order capture stamps
+    for k in rng.choice(np.arange(1, frames), size=max(1, frames // 1000), replace=False):
+        t[k:] += 0.5
+    for k in rng.choice(np.arange(1, frames), size=max(1, frames // 250), replace=False):
+        t[k] = t[k - 1] - rng.choice([0.0, 0.005])
+
+    poses = np.zeros((frames, 33, 4), dtype=np.float32)
+    poses[:, :, 0] = 0.5 + 0.15 * np.sin(np.arange(33) * 1.7)
+    poses[:, :, 1] = 0.1 + np.arange(33) * 0.025
+    poses[:, :, 2] = -0.1
+    poses[:, :, 3] = 0.95
+    poses += rng.normal(0, 0.004, poses.shape).astype(np.float32)
+
+    # Steering: wrists tilt slowly against each other; reach crosses the throttle thresholds
+    tilt = 0.25 * np.sin(t * 0.9)
+    reach = 0.12 + 0.07 * np.sin(t * 0.37)
+    poses[:, 15, 1] = 0.5 + tilt
+    poses[:, 16, 1] = 0.5 - tilt
+    poses[:, 15, 0] = poses[:, 11, 0] + reach
+    poses[:, 16, 0] = poses[:, 12, 0] - reach
+
+    # Impulses: wrist thrusts (z), wrist raises (y), knee lifts (y)
+    for start in rng.choice(frames - 8, size=max(1, frames // 40), replace=False):
+        joint, axis = [(15, 2), (16, 2), (15, 1), (16, 1), (25, 1), (26, 1)][rng.integers(6)]
+        ramp = -np.linspace(0, rng.uniform(0.05, 0.35), 6)
+        poses[start:start + 6, joint, axis] += ramp.astype(np.float32)
+
+    # Hands: alternating sustained shapes (0 neutral, 1 fist + thumb, 2 open palm)
+    hands = np.zeros((frames, 2, 21, 4), dtype=np.float32)
+    counts = rng.integers(0, 3, frames // 30 + 1).repeat(30)[:frames]
+    shapes = rng.integers(0, 3, (frames // 12 + 1, 2)).repeat(12, axis=0)[:frames]
+    wrist = np.array([[0.35, 0.6], [0.7, 0.6]], dtype=np.float32)
+    for h in range(2):
+        hands[:, h, :, 0] = wrist[h, 0]
+        hands[:, h, :, 1] = wrist[h, 1]
+        for j in (5, 9, 13, 17): # MCPs one palm length up
+            hands[:, h, j, 1] -= 0.08
+            hands[:, h, j, 0] += (j - 11) * 0.004
+        tips_up = np.where(shapes[:, h] == 2, 0.09, 0.02).astype(np.float32)
+        for tip, mcp in ((8, 5), (12, 9), (16, 13), (20, 17)):
+            hands[:, h, tip, :2] = hands[:, h, mcp, :2]
+            hands[:, h, tip, 1] -= tips_up
+        thumb = np.where(shapes[:, h] == 1, 0.14, 0.03).astype(np.float32)
+        hands[:, h, 4, 0] = wrist[h, 0] - thumb
+        hands[:, h, 4, 1] = wrist[h, 1] - 0.02
+    hands += rng.normal(0, 0.002, hands.shape).astype(np.float32)
+
+    # Body lost now and then (hands may still be tracked)
+    has_pose = np.ones(frames, dtype=bool)
+    for start in rng.choice(frames, size=max(1, frames // 500), replace=False):
+        has_pose[start:start + rng.integers(1, 20)] = False
+    poses[~has_pose] = 0.0
+
+    right = np.tile([False, True], (frames, 1))
+    return BatchSession(poses, hands, counts, t, right, has_pose)
+
+def load_logic(name):
+    path = os.path.join(ELECTRON_DIR, 'presets', name, 'logic.py')
+    spec = importlib.util.spec_from_file_location(f"batch_{name}", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod.ControllerLogic
+
+def timed(fn):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()): # Presets print debug lines
+        result = fn()
+    return result, time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--fps', type=float, default=60.0)
+    args = parser.parse_args()
+
+    session = synthetic_session(args.frames, args.seed, args.fps)
+    print(f"Frames={len(session)} Seed={args.seed}", flush=True)
+
+    ok = True
+    for name in PRESETS:
+        logic_cls = load_logic(name)
+        streamed, t_stream = timed(lambda: run_streaming(logic_cls(), session))
+        batched, t_batch = timed(lambda: logic_cls().process_batch(session))
+        mismatch = first_mismatch(streamed, batched)
+        counts = Counter(t.split(':')[0] for tokens in streamed for t in tokens)
+        print(
+            f"{name:<10} Streaming={t_stream * 1000:8.1f}ms  Batch={t_batch * 1000:7.1f}ms  x{t_stream / t_batch:5.1f}"
+            f" | Match={'YES' if mismatch is None else 'NO'} | Tokens={dict(sorted(counts.items()))}",
+            flush=True,
+        )
+        if mismatch is not None:
+            ok = False
+            print(f"  first mismatch @{mismatch}: stream={streamed[mismatch]} batch={batched[mismatch]}", flush=True)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Preset Schema Benchmark
+Compiles the native Asphalt 9 preset written as a declarative definition
+(presets/asphalt9/definition.json, the store's racing definition without
+its engine_config) and checks that it emits exactly the native
+preset's tokens, frame by frame. Also reports the
+compile time and the per-frame cost of both evaluators.
+
+Sessions: the bench_preset_batch synthetic session (dropouts, repeated /
+out-of-order stamps) and the synthetic_motion scenarios with 0-2 hands.
+
+Usage: python benchmarks/bench_preset_schema.py [--frames N] [--seed S]
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from collections import Counter
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+from preset_batch import BatchSession, run_streaming, first_mismatch
+from preset_schema import CompiledPreset
+from synthetic_motion import SyntheticMotion, SCENARIOS
+from bench_preset_batch import synthetic_session, load_logic, timed
+
+with open(os.path.join(ELECTRON_DIR, 'presets', 'asphalt9', 'definition.json')) as f:
+    ASPHALT9_DEFINITION = json.load(f) # The store's racing definition (store_service.py)
+
+def sessions(frames, seed):
+    yield 'batch_session', synthetic_session(frames, seed)
+    for scenario in SCENARIOS:
+        for hands in (0, 2):
+            yield f"{scenario}/{hands}h", BatchSession.from_frames(SyntheticMotion(scenario, hands, seed=seed).frames(frames))
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    native_cls = load_logic('asphalt9')
+    compiled = [CompiledPreset(ASPHALT9_DEFINITION).compile_ms for _ in range(20)]
+    print(f"Frames={args.frames} Seed={args.seed} | Compile={min(compiled):.3f}ms", flush=True)
+
+    ok = True
+    for label, session in sessions(args.frames, args.seed):
+        native, t_native = timed(lambda: run_streaming(native_cls(), session))
+        declared, t_declared = timed(lambda: run_streaming(CompiledPreset(ASPHALT9_DEFINITION), session))
+        mismatch = first_mismatch(native, declared)
+        counts = Counter(t.split(':')[0] for tokens in declared for t in tokens)
+        n = len(session)
+        print(
+            f"{label:<18} Native={t_native / n * 1e6:6.1f}us  Compiled={t_declared / n * 1e6:6.1f}us/frame"
+            f" | Match={'YES' if mismatch is None else 'NO'} | Tokens={dict(sorted(counts.items()))}",
+            flush=True,
+        )
+        if mismatch is not None:
+            ok = False
+            print(f"  first mismatch @{mismatch}: native={native[mismatch]} compiled={declared[mismatch]}", flush=True)
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Preset Throughput Suite
+Runs every preset discovered by the bridge's loader over synthetic motion
+(benchmarks/synthetic_motion.py) and measures, per preset x scenario x
+hand count:
+
+- throughput: process() frames/sec, mean / p50 / p99 / max us per frame
+- allocations: mean transient bytes allocated per frame (tracemalloc peak
+  above the pre-call level) and memory blocks still held after the run
+- tokens emitted, so a run that silently stops taking a branch shows up
+
+Inputs are prebuilt legacy dicts and the preset clock follows the frame
+capture timestamps, so cooldowns behave as at --fps in real time.
+
+Regression gates (exit 1):
+    --budget-us U      p99 per-frame cost above U
+    --baseline F.json  mean cost more than --tolerance above a previous --json run
+
+Usage: python benchmarks/bench_presets.py [--frames N] [--presets a b] [--scenarios s ...] [--hands 0 1 2]
+                                          [--api process|process_frame] [--json out.json] [--baseline old.json]
+"""
+
+import io
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import contextlib
+import tracemalloc
+from collections import Counter
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+import numpy as np
+
+from bridge_metrics import percentile
+from preset_loader import load_preset_modules
+from synthetic_motion import SyntheticMotion, SCENARIOS
+
+RESULTS_VERSION = 1
+
+
+class FrameClock:
+    """Preset clock pinned to the capture timestamp of the frame being processed"""
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_logic(logic_cls):
+    logic = logic_cls()
+    clock = FrameClock()
+    if hasattr(logic, 'clock'):
+        logic.clock = clock
+    return logic, clock
+
+def make_inputs(frames, api):
+    if api == 'process_frame':
+        return [((f,), f.capture_ts) for f in frames]
+    return [(f.to_dicts(), f.capture_ts) for f in frames]
+
+def time_run(logic_cls, inputs, api):
+    """One pass with a fresh preset: per-frame costs (s) and token counts"""
+    logic, clock = make_logic(logic_cls)
+    fn = getattr(logic, api)
+    perf = time.perf_counter
+    costs = []
+    tokens = Counter()
+    with contextlib.redirect_stdout(io.StringIO()): # Presets print debug lines
+        for args, ts in inputs:
+            clock.now = ts
+            start = perf()
+            out = fn(*args)
+            costs.append(perf() - start)
+            for t in out:
+                tokens[t.split(':')[0]] += 1
+    return costs, tokens
+
+def alloc_run(logic_cls, inputs, api):
+    """Mean transient bytes per frame and blocks retained after the run"""
+    logic, clock = make_logic(logic_cls)
+    fn = getattr(logic, api)
+    gc.collect()
+    blocks_before = sys.getallocatedblocks()
+    tracemalloc.start()
+    transient = 0
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            for args, ts in inputs:
+                clock.now = ts
+                tracemalloc.reset_peak()
+                base = tracemalloc.get_traced_memory()[0]
+                fn(*args)
+                transient += tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+    del fn
+    gc.collect()
+    return transient / max(1, len(inputs)), sys.getallocatedblocks() - blocks_before
+
+def bench_case(name, logic_cls, scenario, hands, args):
+    frames = SyntheticMotion(scenario, hands, fps=args.fps, seed=args.seed).frames(args.frames)
+    inputs = make_inputs(frames, args.api)
+
+    best = None
+    for _ in range(args.repeat):
+        costs, tokens = time_run(logic_cls, inputs, args.api)
+        if best is None or sum(costs) < sum(best[0]):
+            best = (costs, tokens)
+    costs, tokens = best
+    total = sum(costs)
+    ordered = sorted(costs)
+
+    result = {
+        'preset': name,
+        'scenario': scenario,
+        'hands': hands,
+        'api': args.api,
+        'frames': len(costs),
+        'fps': len(costs) / total if total > 0 else 0.0,
+        'mean_us': total / len(costs) * 1e6,
+        'p50_us': percentile(ordered, 50) * 1e6,
+        'p99_us': percentile(ordered, 99) * 1e6,
+        'max_us': ordered[-1] * 1e6,
+        'tokens': dict(sorted(tokens.items())),
+    }
+    if not args.no_alloc:
+        alloc_inputs = inputs[:args.alloc_frames]
+        result['alloc_bytes_per_frame'], result['retained_blocks'] = alloc_run(logic_cls, alloc_inputs, args.api)
+    return result
+
+def check(results, args):
+    """Budget / baseline failures as printable lines"""
+    failures = []
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            for r in json.load(f)['results']:
+                baseline[(r['preset'], r['scenario'], r['hands'], r['api'])] = r
+    for r in results:
+        case = f"{r['preset']}/{r['scenario']}/{r['hands']}h"
+        if args.budget_us and r['p99_us'] > args.budget_us:
+            failures.append(f"{case}: p99 {r['p99_us']:.1f}us over budget {args.budget_us:.1f}us")
+        old = baseline.get((r['preset'], r['scenario'], r['hands'], r['api']))
+        if old and r['mean_us'] > old['mean_us'] * (1 + args.tolerance):
+            failures.append(f"{case}: mean {r['mean_us']:.1f}us vs baseline {old['mean_us']:.1f}us (+{args.tolerance:.0%} allowed)")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=3000)
+    parser.add_argument('--fps', type=float, default=60.0, help="Synthetic camera rate (drives preset timing)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help="Timed passes per case (best is kept)")
+    parser.add_argument('--presets', nargs='*', default=None, help="Default: every discovered preset")
+    parser.add_argument('--scenarios', nargs='*', default=list(SCENARIOS), choices=SCENARIOS)
+    parser.add_argument('--hands', nargs='*', type=int, default=[0, 1, 2], choices=[0, 1, 2])
+    parser.add_argument('--api', default='process', choices=['process', 'process_frame'])
+    parser.add_argument('--no-alloc', action='store_true', help="Skip the tracemalloc pass")
+    parser.add_argument('--alloc-frames', type=int, default=1000)
+    parser.add_argument('--budget-us', type=float, default=0.0, help="Fail when a case's p99 exceeds this")
+    parser.add_argument('--baseline', default=None, help="Results JSON from an earlier run")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed mean slowdown vs --baseline")
+    parser.add_argument('--json', default=None, help="Write machine-readable results here")
+    args = parser.parse_args()
+
+    modules = load_preset_modules(prefix="bench_", log=lambda *a, **k: None)
+    presets = {
+        name: mod.ControllerLogic for name, mod in sorted(modules.items())
+        if hasattr(mod, 'ControllerLogic') and (args.presets is None or name in args.presets)
+    }
+    print(f"Presets={','.join(presets)} Frames={args.frames} Fps={args.fps:.0f} Api={args.api}", flush=True)
+
+    results = []
+    for name, logic_cls in presets.items():
+        if not hasattr(logic_cls, args.api):
+            print(f"{name:<10} skipped (no {args.api})", flush=True)
+            continue
+        for scenario in args.scenarios:
+            for hands in args.hands:
+                r = bench_case(name, logic_cls, scenario, hands, args)
+                results.append(r)
+                alloc = "" if args.no_alloc else f" | Alloc={r['alloc_bytes_per_frame']:7.0f}B/f Retained={r['retained_blocks']:+d}"
+                print(
+                    f"{name:<10} {scenario:<15} {hands}h  {r['fps']:9.0f} fps  mean={r['mean_us']:6.1f}us"
+                    f" p99={r['p99_us']:6.1f}us max={r['max_us']:7.1f}us{alloc} | Tokens={r['tokens']}",
+                    flush=True,
+                )
+
+    failures = check(results, args)
+    for line in failures:
+        print(f"REGRESSION: {line}", flush=True)
+
+    if args.json:
+        doc = {
+            'version': RESULTS_VERSION,
+            'created': time.time(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'machine': platform.machine(),
+            'args': {k: v for k, v in vars(args).items() if k not in ('json', 'baseline')},
+            'results': results,
+            'failures': failures,
+        }
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(doc, f, indent=1)
+        print(f"Results written to {args.json}", flush=True)
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
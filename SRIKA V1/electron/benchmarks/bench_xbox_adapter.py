@@ -0,0 +1,104 @@
+"""
+Xbox Adapter Benchmark
+Controller reports sent for the token timelines of the native presets, with
+the adapter diffing every token set against the last report it sent.
+
+Timelines come from the bench_preset_batch synthetic session (streaming
+process_frame), so they have the real mix of repeated sets (a steering
+angle held for several frames, ACCEL held for seconds) and single-frame
+strikes. The gamepad is a fake vgamepad that counts calls and keeps the
+state the driver would see; after every update that state must equal the
+state the token set asks for (checked, as no frame is shorter than MIN_HOLD).
+
+Usage: python benchmarks/bench_xbox_adapter.py [--frames N] [--seed S] [--repeat 3]
+"""
+
+import os
+import sys
+import argparse
+
+ELECTRON_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, ELECTRON_DIR)
+
+from preset_batch import run_streaming
+from xbox_adapter import XboxAdapter, desired_state, BUTTONS, BUTTON_BITS
+from bench_preset_batch import synthetic_session, load_logic, timed, PRESETS
+
+
+# vgamepad button (or its name without vgamepad) -> token
+BUTTON_NAMES_TO_TOKEN = {button: token.lower() for token, button in BUTTONS.items()}
+
+
+class FakeGamepad:
+    """vgamepad.VX360Gamepad stand-in: counts calls, tracks the state of the last report"""
+    def __init__(self):
+        self.calls = 0
+        self.reports = 0
+        self.pending = [0, [0.0, 0.0, 0.0]]
+        self.state = (0, (0.0, 0.0, 0.0)) # As sent by the last update()
+
+    def left_joystick_float(self, x_value_float, y_value_float):
+        self.calls += 1
+        self.pending[1][0] = x_value_float
+
+    def right_trigger_float(self, value_float):
+        self.calls += 1
+        self.pending[1][1] = value_float
+
+    def left_trigger_float(self, value_float):
+        self.calls += 1
+        self.pending[1][2] = value_float
+
+    def press_button(self, button):
+        self.calls += 1
+        self.pending[0] |= BUTTON_BITS[BUTTON_NAMES_TO_TOKEN[button]]
+
+    def release_button(self, button):
+        self.calls += 1
+        self.pending[0] &= ~BUTTON_BITS[BUTTON_NAMES_TO_TOKEN[button]]
+
+    def update(self):
+        self.calls += 1
+        self.reports += 1
+        self.state = (self.pending[0], tuple(self.pending[1]))
+
+def feed(timeline, stamps):
+    gamepad = FakeGamepad()
+    clock = lambda: now
+    adapter = XboxAdapter(gamepad=gamepad, clock=clock)
+    mismatches = 0
+    for tokens, now in zip(timeline, stamps):
+        adapter.update(tokens)
+        if gamepad.state != desired_state(tokens):
+            mismatches += 1
+    return adapter, gamepad, mismatches
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--frames', type=int, default=20000)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    session = synthetic_session(args.frames, args.seed)
+    stamps = [i / 60.0 for i in range(len(session))] # Steady 60 fps: every frame outlasts MIN_HOLD
+    print(f"Frames={len(session)} Seed={args.seed}", flush=True)
+
+    ok = True
+    for name in PRESETS:
+        timeline, _ = timed(lambda: run_streaming(load_logic(name)(), session))
+        runs = [timed(lambda: feed(timeline, stamps)) for _ in range(args.repeat)]
+        (adapter, gamepad, mismatches), _ = runs[0]
+        elapsed = min(t for _, t in runs)
+        ok = ok and not mismatches
+        print(
+            f"{name:<10} Updates={adapter.updates} Reports={adapter.reports} Suppressed={adapter.suppressed}"
+            f" ({adapter.suppressed / max(1, adapter.updates) * 100:.1f}%) | GamepadCalls={gamepad.calls}"
+            f" ({gamepad.calls / max(1, adapter.updates):.2f}/update) | {elapsed / len(timeline) * 1e6:.2f}us/update"
+            f" | StateMatch={'YES' if not mismatches else f'NO ({mismatches})'}",
+            flush=True,
+        )
+    sys.exit(0 if ok else 1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""
+Synthetic Motion
+Parametric MediaPipe-shaped landmark streams for preset benchmarks.
+
+Frames follow what MediaPipe gets in the app: the unmirrored camera image
+(the selfie mirror is CSS on the preview only), normalized coordinates,
+y down, z negative towards the camera. Pose has 33 landmarks, hands 21.
+
+Hand labels are as MediaPipe Hands reports them for that unmirrored image.
+Hands assumes a mirrored selfie input, so the player's right hand (on the
+image's left, smaller x) is labelled 'Left'. The asphalt9 brake watches that
+'Left' hand. Hands are listed 'Left' first. Each hand sits on the pose wrist
+on its side of the image (15 for 'Left', 16 for 'Right'). Presets only use
+heights, depths and distances, which mirroring the image leaves unchanged,
+so the pose's left / right layout does not affect their tokens.
+
+Scenarios
+    idle            guard stance, sway, breathing, sensor noise
+    punch_flurry    alternating straight punches (wrist thrust towards camera)
+    kicks           alternating knee lifts
+    steering_sweep  hands on an imaginary wheel, full lock to lock
+    nitro           steering + sustained fist with the thumb flared
+    brake           steering + sustained open palm on the 'Left' hand (the player's right)
+"""
+
+import os
+import sys
+import math
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+import numpy as np
+
+from landmark_protocol import FIELDS, HAND_POINTS
+from landmark_frame import LandmarkFrame, X, Y, Z
+
+SCENARIOS = ('idle', 'punch_flurry', 'kicks', 'steering_sweep', 'nitro', 'brake')
+HAND_LABELS = ('Left', 'Right')
+
+# Standing guard stance: (x, y, z, visibility) per pose landmark
+_STANCE = [
+    (0.50, 0.20, -0.30, 0.99),                                                   # 0 nose
+    (0.49, 0.18, -0.28, 0.99), (0.48, 0.18, -0.28, 0.99), (0.47, 0.18, -0.28, 0.99), # 1-3 left eye
+    (0.51, 0.18, -0.28, 0.99), (0.52, 0.18, -0.28, 0.99), (0.53, 0.18, -0.28, 0.99), # 4-6 right eye
+    (0.45, 0.19, -0.15, 0.98), (0.55, 0.19, -0.15, 0.98),                         # 7-8 ears
+    (0.49, 0.23, -0.27, 0.99), (0.51, 0.23, -0.27, 0.99),                         # 9-10 mouth
+    (0.40, 0.32, -0.10, 0.99), (0.60, 0.32, -0.10, 0.99),                         # 11-12 shoulders
+    (0.36, 0.45, -0.05, 0.97), (0.64, 0.45, -0.05, 0.97),                         # 13-14 elbows
+    (0.42, 0.30, -0.20, 0.96), (0.58, 0.30, -0.20, 0.96),                         # 15-16 wrists (guard)
+    (0.42, 0.28, -0.21, 0.93), (0.58, 0.28, -0.21, 0.93),                         # 17-18 pinkies
+    (0.43, 0.28, -0.22, 0.93), (0.57, 0.28, -0.22, 0.93),                         # 19-20 index
+    (0.43, 0.29, -0.21, 0.93), (0.57, 0.29, -0.21, 0.93),                         # 21-22 thumbs
+    (0.44, 0.62, 0.00, 0.95), (0.56, 0.62, 0.00, 0.95),                           # 23-24 hips
+    (0.43, 0.78, 0.02, 0.90), (0.57, 0.78, 0.02, 0.90),                           # 25-26 knees
+    (0.43, 0.93, 0.05, 0.85), (0.57, 0.93, 0.05, 0.85),                           # 27-28 ankles
+    (0.42, 0.95, 0.06, 0.80), (0.58, 0.95, 0.06, 0.80),                           # 29-30 heels
+    (0.44, 0.97, 0.00, 0.80), (0.56, 0.97, 0.00, 0.80),                           # 31-32 foot index
+]
+# Left / right joint groups that move with the wrist / knee
+_WRIST_GROUP = ((15, 17, 19, 21), (16, 18, 20, 22))
+_KNEE_GROUP = ((25, 27, 29, 31), (26, 28, 30, 32))
+# Punch order within a flurry (0 = left, 1 = right), one punch every FLURRY_PERIOD frames
+FLURRY_SIDES = (0, 1, 0, 1, 1, 0, 0, 1)
+FLURRY_PERIOD = 20
+
+# Hand shapes, in palm lengths: (finger tip reach from its MCP, thumb tip offset (inward, up))
+HAND_SHAPES = {
+    'relaxed': (0.60, (0.50, 0.80)),
+    'fist': (0.20, (0.30, 0.60)),
+    'fist_thumb': (0.20, (1.90, 0.50)),
+    'open': (1.05, (1.00, 0.70)),
+}
+_MCP_OFFSETS = ((5, 0.30, 1.00), (9, 0.10, 1.05), (13, -0.10, 1.00), (17, -0.30, 0.90)) # (MCP, inward, up)
+
+
+def stance():
+    return np.array(_STANCE, dtype=np.float32)
+
+def hand_landmarks(shape, wrist_x, wrist_y, label, palm=0.07):
+    """21 hand landmarks for a named shape, palm facing the camera, fingers up"""
+    tip_reach, (thumb_in, thumb_up) = HAND_SHAPES[shape]
+    inward = 1.0 if label == 'Left' else -1.0 # Thumbs point towards the body centre
+    pts = np.zeros((HAND_POINTS, FIELDS), dtype=np.float32)
+    pts[:, X], pts[:, Y] = wrist_x, wrist_y
+
+    def put(i, dx, dy, z=0.0):
+        pts[i, X] = wrist_x + inward * dx * palm
+        pts[i, Y] = wrist_y - dy * palm
+        pts[i, Z] = z
+
+    # PIP / DIP / TIP above the MCP; folded fingers curl back so the tip ends below it
+    reach = (0.45 * tip_reach, 0.75 * tip_reach, tip_reach) if tip_reach >= 0.5 else (0.25, 0.10, -tip_reach)
+    for mcp, dx, up in _MCP_OFFSETS:
+        put(mcp, dx, up)
+        for k, r in enumerate(reach, start=1):
+            put(mcp + k, dx, up + r, -0.01 * k)
+
+    # Thumb: CMC near the wrist, MCP / IP on the way to the tip
+    put(1, 0.20, 0.15)
+    for k, frac in ((2, 0.40), (3, 0.75), (4, 1.0)):
+        put(k, 0.20 + (thumb_in - 0.20) * frac, 0.15 + (thumb_up - 0.15) * frac, -0.01 * (k - 1))
+    return pts
+
+
+class SyntheticMotion:
+    """Deterministic landmark stream for one scenario (same seed -> same frames)"""
+
+    def __init__(self, scenario='idle', hands=2, fps=60.0, seed=0, noise=0.003):
+        if scenario not in SCENARIOS:
+            raise ValueError(f"Unknown scenario {scenario!r} (choose from {', '.join(SCENARIOS)})")
+        self.scenario = scenario
+        self.hands = max(0, min(2, hands))
+        self.fps = fps
+        self.noise = noise
+        self.rng = np.random.default_rng(seed)
+
+    # --- Motion primitives ---
+    @staticmethod
+    def _pulse(phase, attack=4, release=6):
+        """0 -> 1 over `attack` frames, back to 0 over `release` frames"""
+        if phase < 0 or phase >= attack + release:
+            return 0.0
+        if phase < attack:
+            return (phase + 1) / attack
+        return 1.0 - (phase - attack + 1) / release
+
+    def _punch(self, pose, side, amount):
+        s, e, w = (11, 13, 15) if side == 0 else (12, 14, 16)
+        if amount <= 0:
+            return
+        # Arm straightens towards the camera: wrist in front of the shoulder, elbow on the line
+        target = pose[s, :3] + np.array([0.0, 0.02, -0.55], dtype=np.float32)
+        delta = (target - pose[w, :3]) * amount
+        for j in _WRIST_GROUP[side]:
+            pose[j, :3] += delta
+        straight = (pose[s, :3] + pose[w, :3]) / 2
+        pose[e, :3] += (straight - pose[e, :3]) * amount
+
+    def _knee_lift(self, pose, side, amount):
+        for j in _KNEE_GROUP[side]:
+            pose[j, Y] -= 0.16 * amount
+            pose[j, Z] -= 0.10 * amount
+
+    def _wheel(self, pose, t):
+        """Both wrists on a wheel in front of the chest, sweeping lock to lock"""
+        angle = math.radians(80) * math.sin(2 * math.pi * t / 4.0)
+        cx, cy, r = 0.50, 0.50, 0.17
+        dx, dy = r * math.cos(angle), r * math.sin(angle)
+        for side, (wx, wy) in enumerate(((cx - dx, cy - dy), (cx + dx, cy + dy))):
+            offset = np.array([wx, wy], dtype=np.float32) - pose[15 + side, :2]
+            for j in _WRIST_GROUP[side]:
+                pose[j, :2] += offset
+                pose[j, Z] = -0.25
+            pose[13 + side, :2] += offset * 0.5
+
+    # --- Frames ---
+    def frame(self, i):
+        t = i / self.fps
+        pose = stance()
+        pose[:, X] += 0.015 * math.sin(t * 1.3)                # Sway
+        pose[:23, Y] += 0.004 * math.sin(t * 2 * math.pi / 3.5) # Breathing
+        shapes = ['fist', 'fist']
+
+        if self.scenario == 'punch_flurry':
+            k, phase = divmod(i, FLURRY_PERIOD)
+            self._punch(pose, FLURRY_SIDES[k % len(FLURRY_SIDES)], self._pulse(phase))
+        elif self.scenario == 'kicks':
+            for side in (0, 1):
+                self._knee_lift(pose, side, self._pulse((i + 24 * side) % 48, attack=5, release=8))
+        elif self.scenario in ('steering_sweep', 'nitro', 'brake'):
+            self._wheel(pose, t)
+            shapes = ['relaxed', 'relaxed']
+            held = (i % 75) < 45 # Hold the gesture, then relax
+            if held and self.scenario == 'nitro':
+                shapes = ['fist_thumb', 'fist_thumb']
+            elif held and self.scenario == 'brake':
+                shapes[0] = 'open'
+
+        if self.noise:
+            pose[:, :3] += self.rng.normal(0, self.noise, (len(pose), 3)).astype(np.float32)
+        labels = list(HAND_LABELS[:self.hands])
+        hands = np.stack([
+            hand_landmarks(shapes[h], pose[15 + h, X], pose[15 + h, Y], labels[h]) for h in range(self.hands)
+        ]) if self.hands else None
+        if hands is not None and self.noise:
+            hands[..., :3] += self.rng.normal(0, self.noise / 3, hands[..., :3].shape).astype(np.float32)
+        jitter = self.rng.uniform(0, 0.15 / self.fps)
+        return LandmarkFrame(pose, hands, labels, i + 1, t + jitter)
+
+    def frames(self, n):
+        return [self.frame(i) for i in range(n)]
@@ -0,0 +1,256 @@
+"""
+SRIKA Bridge Metrics
+Lightweight instrumentation for the input bridge (wake-ups, CPU, latency, startup, frame tracing).
+"""
+
+import time
+import bisect
+import threading
+from contextlib import contextmanager
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile over an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+class LoopStats:
+    """
+    Per-window loop statistics.
+    - wakeups: how often the main loop woke up (data vs timer)
+    - cpu: process CPU time / wall time over the window
+    - dispatch latency: time a line waited between stdin read and dispatch
+    """
+
+    def __init__(self, interval=10.0):
+        self.interval = interval
+        self._reset(time.time())
+
+    def _reset(self, now):
+        self.window_start = now
+        self.cpu_start = time.process_time()
+        self.next_report = now + self.interval
+        self.data_wakeups = 0
+        self.timer_wakeups = 0
+        self.frames = 0
+        self.commands = 0
+        self.latencies = []
+
+    def on_wake(self, had_data):
+        if had_data: self.data_wakeups += 1
+        else: self.timer_wakeups += 1
+
+    def on_dispatch(self, enqueued_at, is_frame):
+        if is_frame: self.frames += 1
+        else: self.commands += 1
+        self.latencies.append(time.perf_counter() - enqueued_at)
+
+    def due(self, now):
+        return now >= self.next_report
+
+    def report(self, now=None):
+        """Returns a LOOP_STATS status line and starts a new window"""
+        now = now or time.time()
+        wall = max(now - self.window_start, 1e-6)
+        cpu = time.process_time() - self.cpu_start
+        wakeups = self.data_wakeups + self.timer_wakeups
+        lat = sorted(self.latencies)
+
+        line = (
+            f"LOOP_STATS: Wakeups={wakeups} ({wakeups / wall:.1f}/s, data={self.data_wakeups}, timer={self.timer_wakeups})"
+            f" | CPU={cpu / wall * 100:.1f}%{' (idle)' if self.frames == 0 else ''}"
+            f" | Frames={self.frames} Cmds={self.commands}"
+            f" | Dispatch ms p50={percentile(lat, 50) * 1000:.2f} p95={percentile(lat, 95) * 1000:.2f}"
+            f" max={(lat[-1] if lat else 0.0) * 1000:.2f}"
+        )
+        self._reset(now)
+        return line
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram (log-spaced, microsecond bounds).
+    O(log buckets) per sample, no per-sample storage.
+    """
+    BOUNDS_US = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 25000, 50000, 100000, 250000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS_US) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds):
+        us = seconds * 1e6
+        self.counts[bisect.bisect_left(self.BOUNDS_US, us)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max: self.max = seconds
+
+    def percentile(self, pct):
+        """Upper bound (seconds) of the bucket holding the pct-th sample"""
+        if not self.count:
+            return 0.0
+        target = pct / 100.0 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(self.BOUNDS_US[i] / 1e6, self.max) if i < len(self.BOUNDS_US) else self.max
+        return self.max
+
+    def summary(self):
+        mean = self.total / self.count if self.count else 0.0
+        return (
+            f"Count={self.count} | Mean={mean * 1000:.3f}ms"
+            f" | p50<={self.percentile(50) * 1000:.3f}ms p95<={self.percentile(95) * 1000:.3f}ms"
+            f" p99<={self.percentile(99) * 1000:.3f}ms | Max={self.max * 1000:.3f}ms"
+        )
+
+
+class StartupTimeline:
+    """
+    Records how long each startup phase took.
+    Sequential phases use mark(); jobs running on startup threads use measure().
+    """
+
+    def __init__(self, t0=None):
+        self.t0 = t0 if t0 is not None else time.perf_counter()
+        self.last = self.t0
+        self.phases = [] # (name, seconds, parallel)
+        self._lock = threading.Lock()
+
+    def mark(self, name):
+        """Closes a sequential phase that started at the previous mark"""
+        now = time.perf_counter()
+        with self._lock:
+            self.phases.append((name, now - self.last, False))
+            self.last = now
+
+    @contextmanager
+    def measure(self, name):
+        """Times a job running in parallel with other phases"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.phases.append((name, time.perf_counter() - start, True))
+
+    def elapsed(self):
+        return time.perf_counter() - self.t0
+
+    def report(self):
+        with self._lock:
+            parts = [f"{name}={sec * 1000:.1f}ms{' (parallel)' if parallel else ''}" for name, sec, parallel in self.phases]
+        return f"STARTUP_TIMELINE: {' | '.join(parts)} | Total={self.elapsed() * 1000:.1f}ms"
+
+
+class FrameTrace:
+    """
+    Timestamps of one landmark frame on its way to the controller.
+    capture_ts is renderer epoch time, everything else is perf_counter.
+    """
+    __slots__ = ('frame_id', 'capture_ts', 'enqueued_at', 'dequeued_at', 'decoded_at', 'preset_done_at', 'reported_at')
+
+    def __init__(self, enqueued_at, dequeued_at=None):
+        self.frame_id = 0
+        self.capture_ts = 0.0
+        self.enqueued_at = enqueued_at
+        self.dequeued_at = dequeued_at if dequeued_at is not None else time.perf_counter()
+        self.decoded_at = None
+        self.preset_done_at = None
+        self.reported_at = None
+
+    def mark_decoded(self, packet=None):
+        self.decoded_at = time.perf_counter()
+        if packet is not None:
+            self.frame_id = packet.frame_id
+            self.capture_ts = packet.capture_ts
+
+    def mark_preset_done(self):
+        self.preset_done_at = time.perf_counter()
+
+    def mark_report(self):
+        """Called by a backend right after the controller / key report went out"""
+        self.reported_at = time.perf_counter()
+
+
+class LatencyTracer:
+    """
+    Per-stage latency histograms for landmark frames.
+    - transport : renderer capture -> bridge stdin read (needs capture_ts)
+    - queue_wait: stdin read -> dispatch
+    - decode    : dispatch -> landmarks decoded
+    - preset    : logic.process()
+    - backend   : preset done -> report sent (only frames that produced tokens)
+    - end_to_end: renderer capture -> report sent
+    """
+    STAGES = ('transport', 'queue_wait', 'decode', 'preset', 'backend', 'end_to_end')
+    CAPTURE_GAP = 0.25 # Capture-to-capture interval counted as a dropout (s)
+
+    def __init__(self):
+        self._lock = threading.Lock() # Frames with tokens are recorded by the backend stage's thread
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._reset()
+
+    def _reset(self):
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+        self.frames = 0
+        self.last_frame_id = 0
+        self.last_capture_ts = 0.0
+        self.stale = 0 # Captured at / before the previous frame (duplicates, reordering)
+        self.gaps = 0
+        # perf_counter -> epoch offset, so capture_ts can be compared with local stamps
+        self._epoch_offset = time.time() - time.perf_counter()
+
+    def begin(self, enqueued_at):
+        return FrameTrace(enqueued_at)
+
+    def record(self, trace):
+        with self._lock:
+            self._record(trace)
+
+    def _record(self, trace):
+        h = self.histograms
+        self.frames += 1
+        h['queue_wait'].add(trace.dequeued_at - trace.enqueued_at)
+        if trace.decoded_at is None:
+            return
+        h['decode'].add(trace.decoded_at - trace.dequeued_at)
+        if trace.frame_id:
+            self.last_frame_id = trace.frame_id
+        if trace.capture_ts:
+            h['transport'].add(max(0.0, trace.enqueued_at + self._epoch_offset - trace.capture_ts))
+            if self.last_capture_ts:
+                interval = trace.capture_ts - self.last_capture_ts
+                if interval <= 0: self.stale += 1
+                elif interval > self.CAPTURE_GAP: self.gaps += 1
+            self.last_capture_ts = max(self.last_capture_ts, trace.capture_ts)
+        if trace.preset_done_at is None:
+            return
+        h['preset'].add(trace.preset_done_at - trace.decoded_at)
+        if trace.reported_at is None:
+            return
+        h['backend'].add(trace.reported_at - trace.preset_done_at)
+        if trace.capture_ts:
+            h['end_to_end'].add(max(0.0, trace.reported_at + self._epoch_offset - trace.capture_ts))
+
+    def report(self):
+        """Returns LATENCY_STATS status lines (one per stage with samples)"""
+        with self._lock:
+            return self._report()
+
+    def _report(self):
+        lines = [f"LATENCY_STATS: Frames={self.frames} | LastFrameId={self.last_frame_id} | Stale={self.stale} | Gaps={self.gaps}"]
+        for stage in self.STAGES:
+            hist = self.histograms[stage]
+            if hist.count:
+                lines.append(f"LATENCY_STATS: Stage={stage} | {hist.summary()}")
+        return lines
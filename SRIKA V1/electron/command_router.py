@@ -0,0 +1,103 @@
+"""
+SRIKA Command Router
+Registry-based dispatch for bridge stdin lines, with per-command timing.
+
+Resolution order:
+    1. hot prefixes (landmark frames) - checked first with a single startswith
+    2. exact commands ('idle', internal markers)
+    3. 'PREFIX:' / 'PREFIX:SUB:' commands - O(1) dict lookups on the colon-delimited head
+    4. default handler (comma separated token lines)
+
+Presets and backends can register their own prefixes; a preset module that
+defines `register_commands(router)` is handed the bridge router at load time.
+"""
+
+import time
+
+from bridge_metrics import LatencyHistogram
+
+MAX_PREFIX_DEPTH = 2 # 'CMD:VERIFY:' style prefixes
+
+
+class CommandRouter:
+    def __init__(self, default=None):
+        self.default = default
+        self._hot = ()        # ((prefix, handler, name), ...)
+        self._hot_prefixes = ()
+        self._exact = {}      # line -> (handler, name)
+        self._prefixed = {}   # 'PREFIX:' -> (handler, name)
+        self.stats = {}       # name -> LatencyHistogram
+
+    def register(self, prefix, handler, name=None, hot=False, exact=False):
+        """
+        prefix : 'SET_PROFILE:' (prefix match, must end with ':') or an exact line when exact=True
+        hot    : plain startswith match, checked before everything else (per-frame commands)
+        """
+        name = name or prefix.rstrip(':')
+        if not (exact or hot) and not prefix.endswith(':'):
+            raise ValueError(f"Prefix commands must end with ':' ({prefix})")
+
+        if hot:
+            self._hot = self._hot + ((prefix, handler, name),)
+            self._hot_prefixes = tuple(p for p, _, _ in self._hot)
+        elif exact:
+            self._exact[prefix] = (handler, name)
+        else:
+            self._prefixed[prefix] = (handler, name)
+        self.stats.setdefault(name, LatencyHistogram())
+
+    def unregister(self, prefix):
+        self._hot = tuple(h for h in self._hot if h[0] != prefix)
+        self._hot_prefixes = tuple(p for p, _, _ in self._hot)
+        self._exact.pop(prefix, None)
+        self._prefixed.pop(prefix, None)
+
+    def resolve(self, line):
+        """Returns (handler, name) for a line, or (default, 'DEFAULT')"""
+        if line.startswith(self._hot_prefixes):
+            for prefix, handler, name in self._hot:
+                if line.startswith(prefix):
+                    return handler, name
+
+        hit = self._exact.get(line) or self._exact.get(line.lower())
+        if hit:
+            return hit
+
+        # Longest 'A:B:' head first, then 'A:'
+        end = -1
+        heads = []
+        for _ in range(MAX_PREFIX_DEPTH):
+            end = line.find(':', end + 1)
+            if end < 0: break
+            heads.append(line[:end + 1])
+        for head in reversed(heads):
+            hit = self._prefixed.get(head)
+            if hit:
+                return hit
+
+        return self.default, 'DEFAULT'
+
+    def dispatch(self, line):
+        handler, name = self.resolve(line)
+        if handler is None:
+            return
+        start = time.perf_counter()
+        try:
+            handler(line)
+        finally:
+            hist = self.stats.get(name)
+            if hist is None:
+                hist = self.stats[name] = LatencyHistogram()
+            hist.add(time.perf_counter() - start)
+
+    def dump_stats(self):
+        """One ROUTER_STATS line per command that has been called"""
+        return [
+            f"ROUTER_STATS: {name} | {hist.summary()}"
+            for name, hist in sorted(self.stats.items(), key=lambda kv: -kv[1].count)
+            if hist.count
+        ]
+
+    def reset_stats(self):
+        for name in self.stats:
+            self.stats[name] = LatencyHistogram()
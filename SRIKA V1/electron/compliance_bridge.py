@@ -22,6 +22,7 @@ running = True
 active_backend = "NONE"  # "STEAM_INPUT" | "ACCESSIBILITY" | "NONE"
 steam_process = None
 focused_window = None
+REPEAT_INTERVAL = 0.05  # Re-send held tokens at 20Hz (accessibility)
 
 # ==========================================
 # Threaded Input Reader
@@ -38,6 +39,18 @@ def read_stdin():
         except:
             running = False
             break
+    input_queue.put(None) # EOF: wake the main loop
+
+def wait_for_commands(timeout=None):
+    """Blocks until a command arrives (or timeout), then drains the queue"""
+    batch = []
+    try:
+        batch.append(input_queue.get(timeout=timeout))
+        while batch[-1] is not None:
+            batch.append(input_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
 
 # ==========================================
 # BACKEND DETECTION
@@ -143,9 +156,15 @@ def main():
     
     try:
         while running:
+            # Wake on data. While tokens are held, wake every 50ms to repeat them.
+            holding = last_command.lower() != "idle"
+            batch = wait_for_commands(REPEAT_INTERVAL if holding else None)
+
             # Process input commands
-            while not input_queue.empty():
-                cmd = input_queue.get_nowait()
+            for cmd in batch:
+                if cmd is None:
+                    running = False
+                    break
                 
                 if cmd.startswith("REDETECT_BACKEND"):
                     select_backend()
@@ -169,8 +188,6 @@ def main():
             if last_command.lower() == "idle":
                 # Nothing to release in accessibility mode
                 pass
-            
-            time.sleep(0.05)  # Lower frequency for accessibility
 
     except KeyboardInterrupt:
         pass
@@ -0,0 +1,147 @@
+"""
+SRIKA Frame Features
+Per-frame memo of derived features shared by every stage that looks at a
+frame: the preset, its gesture templates, declarative presets and debug
+output. Stages request features by name and each one is computed at most
+once per frame; derived features fetch their inputs through the same cache.
+
+    cache = feature_cache(logic) # One cache per preset instance (consumer 'preset')
+    torso, reach_l, reach_r = cache.get(frame, 'pose_distances')
+    left, right = cache.get(frame, 'hand_features')
+
+Entries are keyed by frame id (frames without one, e.g. from the legacy
+process() path, by the frame object) and describe the frame the preset sees,
+after its LANDMARK_FILTER. Values are shared: treat them as read-only.
+hits / misses count lookups, so the savings show up in CMD:DUMP_STATS.
+
+Memoizing only pays when a frame has more than one consumer: every caller
+names itself (feature_cache(logic, 'templates')), and while the preset is
+the only one, get() computes the feature directly without storing it.
+
+Features (register_feature(name, fn) adds more; fn(frame, cache) -> value):
+    pose_distances  [shoulder width, left wrist-shoulder, right wrist-shoulder] (2D)
+    shoulder_width  float
+    wrist_shoulder  [left, right]
+    elbow_angles    [left, right] degrees
+    hand_features   [left, right] hand_features.py rows (slotted by handedness)
+    palm_scale      [left, right] (0 for a missing hand)
+    body_frame      (shoulder midpoint (3,), shoulder width) or None when the shoulders are degenerate
+"""
+
+import math
+import weakref
+
+import numpy as np
+
+from landmark_frame import joint_distances, joint_angles
+from hand_features import HandFeatureExtractor, PALM_SCALE
+
+# Pose distance pairs: torso (shoulder-shoulder), left arm reach, right arm reach
+POSE_PAIRS_A = np.array([11, 15, 16])
+POSE_PAIRS_B = np.array([12, 11, 12])
+
+# Elbow angle triplets (shoulder, elbow, wrist) for left / right arm
+ELBOW_A = np.array([11, 12])
+ELBOW_B = np.array([13, 14])
+ELBOW_C = np.array([15, 16])
+
+ANCHOR_JOINTS = (11, 12) # Shoulders: origin at their midpoint, unit = their distance
+MIN_BODY_SCALE = 1e-3
+
+
+def body_frame(pose, scale=None):
+    """(shoulder midpoint (3,), shoulder width) of a pose, None when the shoulders are degenerate"""
+    (lx, ly, lz), (rx, ry, rz) = pose[ANCHOR_JOINTS, :3].tolist()
+    if scale is None:
+        scale = math.hypot(lx - rx, ly - ry)
+    if scale < MIN_BODY_SCALE:
+        return None
+    return np.array([(lx + rx) / 2, (ly + ry) / 2, (lz + rz) / 2]), scale
+
+def _hand_rows(frame, cache):
+    return cache.hand_extractor.extract(frame)
+
+FEATURES = {
+    'pose_distances': lambda frame, cache, a=POSE_PAIRS_A.tolist(), b=POSE_PAIRS_B.tolist(): joint_distances(frame.pose, a, b),
+    'shoulder_width': lambda frame, cache: cache.get(frame, 'pose_distances')[0],
+    'wrist_shoulder': lambda frame, cache: cache.get(frame, 'pose_distances')[1:],
+    'elbow_angles': lambda frame, cache, a=ELBOW_A.tolist(), b=ELBOW_B.tolist(), c=ELBOW_C.tolist(): joint_angles(frame.pose, a, b, c),
+    'hand_features': _hand_rows,
+    'palm_scale': lambda frame, cache: [row[PALM_SCALE] for row in cache.get(frame, 'hand_features')],
+    'body_frame': lambda frame, cache: body_frame(frame.pose, cache.get(frame, 'shoulder_width')),
+}
+
+def register_feature(name, fn):
+    """Adds a named feature for every cache; fn(frame, cache) -> value"""
+    FEATURES[name] = fn
+
+
+class FeatureCache:
+    """Named features of the current frame, each computed on first request"""
+
+    def __init__(self, features=FEATURES):
+        self.features = features
+        self.hand_extractor = HandFeatureExtractor()
+        self.consumers = set()
+        self.enabled = False # Memoizing: more than one consumer
+        self.key = None
+        self.values = {}
+        self.frames = 0
+        self.hits = 0
+        self.misses = 0
+
+    def consume(self, consumer):
+        """Registers a stage that reads this cache; the second one turns memoizing on"""
+        if consumer not in self.consumers:
+            self.consumers.add(consumer)
+            self.enabled = len(self.consumers) > 1
+
+    def get(self, frame, name):
+        if not self.enabled:
+            return self.features[name](frame, self) # One consumer: nothing to share
+        key = frame.frame_id or frame
+        if key is not self.key and key != self.key:
+            self.key = key
+            self.values = {}
+            self.frames += 1
+        values = self.values
+        if name in values:
+            self.hits += 1
+            return values[name]
+        self.misses += 1
+        value = values[name] = self.features[name](frame, self)
+        return value
+
+    def reset_stats(self):
+        self.frames = self.hits = self.misses = 0
+
+    def status(self, label=""):
+        consumers = ','.join(sorted(self.consumers)) or '-'
+        if not self.enabled:
+            return f"FEATURE_CACHE: {label} | Consumers={consumers} | Off (single consumer)"
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return (f"FEATURE_CACHE: {label} | Consumers={consumers}"
+                f" | Frames={self.frames} Hits={self.hits} Misses={self.misses} HitRate={rate:.1f}%")
+
+
+# Caches per ControllerLogic instance (a reloaded preset gets a fresh cache)
+_caches = weakref.WeakKeyDictionary()
+
+def feature_cache(logic, consumer='preset'):
+    """The FeatureCache shared by every stage of one preset; consumer names the calling stage"""
+    cache = _caches.get(logic)
+    if cache is None:
+        cache = _caches[logic] = FeatureCache()
+    if consumer not in cache.consumers:
+        cache.consume(consumer)
+    return cache
+
+def cache_stats(registry):
+    """FEATURE_CACHE status lines for the presets in a logic registry that used their cache"""
+    return [_caches[logic].status(name) for name, logic in registry.items() if logic in _caches]
+
+def reset_cache_stats(registry):
+    for logic in registry.values():
+        if logic in _caches:
+            _caches[logic].reset_stats()
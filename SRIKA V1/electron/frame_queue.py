@@ -0,0 +1,107 @@
+"""
+SRIKA Frame Queue
+Latest-frame-wins queue for the bridge stdin stream.
+
+Control lines (SET_PROFILE, CMD:VERIFY, idle, token lines) are delivered
+in strict FIFO order. Landmark frames are collapsed so that at most one
+(the newest) is ever pending, keeping controller output close to the
+player instead of working through a backlog of stale poses.
+"""
+
+import time
+import queue
+import threading
+from collections import deque
+
+
+def is_landmark_line(item):
+    """Default frame predicate for (enqueued_at, line) items"""
+    return item is not None and item[1].startswith("RAW_LM")
+
+
+class FrameCoalescingQueue:
+    """
+    Drop-in replacement for queue.Queue (put / get / get_nowait / empty).
+    - A frame arriving while the newest pending item is a frame replaces it (coalesced).
+    - A frame arriving behind a control command evicts the older pending frame (dropped).
+    """
+
+    def __init__(self, is_frame=is_landmark_line):
+        self.is_frame = is_frame
+        self._items = deque()
+        self._frame_pending = False
+        self._cond = threading.Condition(threading.Lock())
+        self._reset_stats()
+
+    def _reset_stats(self):
+        self.frames_in = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+
+    def put(self, item):
+        with self._cond:
+            items = self._items
+            if self.is_frame(item):
+                self.frames_in += 1
+                if items and self._frame_pending and self.is_frame(items[-1]):
+                    items[-1] = item
+                    self.coalesced += 1
+                else:
+                    if self._frame_pending:
+                        # Stale frame sitting in front of a control command
+                        for i, pending in enumerate(items):
+                            if self.is_frame(pending):
+                                del items[i]
+                                self.dropped += 1
+                                break
+                    items.append(item)
+                    self._frame_pending = True
+            else:
+                items.append(item)
+
+            if len(items) > self.max_depth:
+                self.max_depth = len(items)
+            self._cond.notify()
+
+    def _pop(self):
+        item = self._items.popleft()
+        if self._frame_pending and self.is_frame(item):
+            self._frame_pending = False
+        return item
+
+    def get(self, block=True, timeout=None):
+        with self._cond:
+            if not block:
+                if not self._items: raise queue.Empty
+                return self._pop()
+
+            if timeout is None:
+                while not self._items:
+                    self._cond.wait()
+            else:
+                deadline = time.monotonic() + timeout
+                while not self._items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0: raise queue.Empty
+                    self._cond.wait(remaining)
+            return self._pop()
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+    def empty(self):
+        with self._cond:
+            return not self._items
+
+    def qsize(self):
+        with self._cond:
+            return len(self._items)
+
+    def take_stats(self):
+        """Returns (frames_in, coalesced, dropped, max_depth) and resets the counters"""
+        with self._cond:
+            stats = (self.frames_in, self.coalesced, self.dropped, self.max_depth)
+            self._reset_stats()
+            self.max_depth = len(self._items)
+            return stats
@@ -0,0 +1,118 @@
+"""
+SRIKA Frame Scheduler
+Per-frame time budget for the landmark loop. The deadline is a fraction of
+the measured camera interval (capture stamps, arrival times for frames
+without one); a frame that took longer (stdin read -> preset done) than its
+deadline moves the bridge one quality level down, a run of frames well
+inside it moves it back up. Every stamp passed to begin() must be on one
+clock (the bridge's perf_counter): renderer capture stamps are epoch time.
+
+    level = scheduler.begin(capture_ts - PERF_EPOCH_OFFSET if capture_ts else enqueued_at)
+    if scheduler.skip(getattr(logic, 'CRITICAL', True)): return # No end() for a skipped frame
+    ...
+    scheduler.end(time.perf_counter() - enqueued_at)
+
+Levels (each one keeps the savings of the levels before it):
+    FULL         everything
+    NO_OPTIONAL  optional features skipped (GESTURE_TEMPLATES matching)
+    NO_DEBUG     preset debug output skipped (PRESET_DEBUG lines)
+    HALF_RATE    presets with CRITICAL = False are evaluated every other frame
+                 (the backend keeps the previous report on a skipped frame)
+
+Frames run at each level are counted for SCHEDULER_STATS lines.
+"""
+
+FULL, NO_OPTIONAL, NO_DEBUG, HALF_RATE = range(4)
+LEVEL_NAMES = ('FULL', 'NO_OPTIONAL', 'NO_DEBUG', 'HALF_RATE')
+
+
+class FrameScheduler:
+    """Deadline from the camera rate, quality level from how the last frames met it"""
+
+    BUDGET_FRACTION = 0.9   # Share of the camera interval a frame may take
+    DEFAULT_INTERVAL = 1 / 30
+    MIN_INTERVAL = 1 / 240  # Stamp gaps outside this range (duplicates, dropouts) do not update the rate
+    MAX_INTERVAL = 1 / 10
+    RATE_SMOOTHING = 0.05   # EMA weight of a new interval
+    SETTLE_FRAMES = 3       # Frames a new level runs before it can drop again
+    RECOVER_FRACTION = 0.5  # Frames under this share of the deadline count towards recovery
+    RECOVER_FRAMES = 30     # ... and this many in a row move one level back up
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.interval = self.DEFAULT_INTERVAL
+        self.level = FULL
+        self._last_stamp = None
+        self._since_change = 0
+        self._calm = 0
+        self._odd = False
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = [0] * len(LEVEL_NAMES) # Frames run at each level
+        self.late = 0
+        self.skipped = 0
+        self.worst = 0.0
+        self._degraded_seen = 0
+
+    @property
+    def deadline(self):
+        return self.interval * self.BUDGET_FRACTION
+
+    def begin(self, stamp):
+        """Start of a frame (stamp in seconds); returns the level to run it at"""
+        last = self._last_stamp
+        if last is not None:
+            gap = stamp - last
+            if self.MIN_INTERVAL <= gap <= self.MAX_INTERVAL:
+                self.interval += (gap - self.interval) * self.RATE_SMOOTHING
+        if last is None or stamp > last:
+            self._last_stamp = stamp
+        self.frames[self.level] += 1
+        return self.level
+
+    def skip(self, critical=True):
+        """True when the preset can sit this frame out (HALF_RATE, non-critical preset)"""
+        if self.level < HALF_RATE or critical:
+            return False
+        self._odd = not self._odd
+        if self._odd:
+            self.skipped += 1
+        return self._odd
+
+    def end(self, elapsed):
+        """End of a frame that ran: elapsed = stdin read -> preset done (s); not called for skipped frames"""
+        deadline = self.deadline
+        self._since_change += 1
+        if elapsed > self.worst:
+            self.worst = elapsed
+        if elapsed > deadline:
+            self.late += 1
+            self._calm = 0
+            if self.enabled and self.level < HALF_RATE and self._since_change >= self.SETTLE_FRAMES:
+                self._set_level(self.level + 1)
+        elif elapsed >= deadline * self.RECOVER_FRACTION:
+            self._calm = 0 # On time, but not with room to spare: the streak starts over
+        elif self.level > FULL:
+            self._calm += 1
+            if self._calm >= self.RECOVER_FRAMES:
+                self._set_level(self.level - 1)
+
+    def _set_level(self, level):
+        self.level = level
+        self._since_change = 0
+        self._calm = 0
+
+    def degraded(self):
+        """True when frames ran below FULL or missed their deadline since the previous call"""
+        count = self.late + sum(self.frames[FULL + 1:])
+        seen, self._degraded_seen = self._degraded_seen, count
+        return count != seen
+
+    def status(self):
+        levels = " ".join(f"{name}={n}" for name, n in zip(LEVEL_NAMES, self.frames))
+        return (
+            f"SCHEDULER_STATS: Deadline={self.deadline * 1000:.1f}ms ({1 / self.interval:.0f}fps)"
+            f" | Level={LEVEL_NAMES[self.level]}{'' if self.enabled else ' (off)'}"
+            f" | Late={self.late} Worst={self.worst * 1000:.1f}ms Skipped={self.skipped} | {levels}"
+        )
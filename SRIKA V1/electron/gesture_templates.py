@@ -0,0 +1,343 @@
+"""
+SRIKA Gesture Templates
+Dynamic gestures (an uppercut, a hadouken) matched against recorded joint
+trajectories with streaming dynamic time warping, next to a preset's own
+threshold rules.
+
+A template is a short trajectory of selected pose joints in body
+coordinates: origin between the shoulders, unit = shoulder width, so the
+player's position and distance from the camera do not matter.
+
+    {'name': 'uppercut_r', 'token': 'X',
+     'joints': ['right_wrist', 'right_elbow'], 'axes': 'xy', 'fps': 30,
+     'trajectory': [[wrist_x, wrist_y, elbow_x, elbow_y], ...],
+     'threshold': 0.15,  # Mean distance per template point (body units)
+     'cooldown': 0.4}    # Seconds before the template can fire again
+
+Presets declare templates in GESTURE_TEMPLATES (a list of such dicts).
+Store presets ship the same list under 'gesture_templates' in their
+LOAD_PRESET item (the profile's storePreset); SET_SETTINGS
+{"gestureTemplates": [...]} replaces it at runtime. The bridge appends
+the tokens of matched templates to the preset's own tokens.
+Templates are recorded from a session with:
+
+    python gesture_templates.py SESSION.srs --start 120 --end 150 --joints right_wrist right_elbow --name uppercut_r --token X
+
+Matching runs every template on every frame as one set of array ops:
+- Subsequence DTW (a match may start at any frame) with Itakura steps:
+  each frame advances a template by 0, 1 or 2 points, so a performance
+  may be up to 2x faster than the recording; slower ones add cost.
+- A template fires as soon as a path through its last point costs at
+  most threshold x length; its paths are then cleared.
+- Pruning: partial paths over budget are dropped (cost only grows). A
+  template with no live path is skipped unless the frame is within
+  budget of its first point (LB_Kim). A template with live paths is
+  cleared when its cheapest path plus the frame's distance to the
+  template's bounding box (envelope lower bound) is over budget.
+"""
+
+import sys
+import json
+import time
+import weakref
+import argparse
+
+import numpy as np
+
+from landmark_frame import joint_index, X, Y, Z
+from kinematics import FrameTimer, FRAME_STALE, FRAME_GAP
+from frame_features import feature_cache, body_frame
+
+MATCH_FPS = 30.0 # Templates are resampled to the camera's nominal rate
+AXIS_INDEX = {'x': X, 'y': Y, 'z': Z}
+
+
+def body_features(pose, joints, axes, body=None):
+    """
+    Selected (joint, axis) channels of a pose in body coordinates (origin between
+    the shoulders, unit = shoulder width), or None when the shoulders are degenerate.
+    body: the pose's frame_features.body_frame(), when already known.
+    """
+    if body is None:
+        body = body_frame(pose)
+    if body is None:
+        return None
+    anchor, scale = body
+    return (pose[joints, axes] - anchor[axes]) / scale
+
+def channels_of(joints, axes):
+    """Joint names / indices + axes string -> [(joint, axis), ...], joint-major"""
+    joint_ids = [joint_index(j) for j in joints]
+    axis_ids = [AXIS_INDEX[a] for a in axes]
+    return [(j, a) for j in joint_ids for a in axis_ids]
+
+
+class GestureTemplate:
+    """Validated template spec"""
+    __slots__ = ('name', 'token', 'channels', 'trajectory', 'threshold', 'cooldown')
+
+    def __init__(self, name, token, channels, trajectory, threshold=0.15, cooldown=0.4):
+        self.name = name
+        self.token = token
+        self.channels = channels
+        self.trajectory = trajectory
+        self.threshold = threshold
+        self.cooldown = cooldown
+
+    @classmethod
+    def from_spec(cls, spec, fps=MATCH_FPS):
+        """Template dict -> GestureTemplate, trajectory resampled from spec['fps'] to fps"""
+        name = spec.get('name', '?')
+        try:
+            axes = spec.get('axes', 'xy')
+            if not axes or any(a not in AXIS_INDEX for a in axes):
+                raise ValueError(f"axes must use x / y / z, got {axes!r}")
+            channels = channels_of(spec['joints'], axes)
+            traj = np.asarray(spec['trajectory'], dtype=np.float64)
+            if traj.ndim != 2 or traj.shape[1] != len(channels) or len(traj) < 2:
+                raise ValueError(f"trajectory must be (frames >= 2, {len(channels)}), got {traj.shape}")
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Gesture template {name!r}: missing or invalid {e}") from None
+        except ValueError as e:
+            raise ValueError(f"Gesture template {name!r}: {e}") from None
+
+        src_fps = float(spec.get('fps', fps))
+        if src_fps != fps:
+            t_src = np.arange(len(traj)) / src_fps
+            t_dst = np.arange(0.0, t_src[-1] + 1e-9, 1.0 / fps)
+            traj = np.stack([np.interp(t_dst, t_src, traj[:, c]) for c in range(traj.shape[1])], axis=1)
+        return cls(name, spec.get('token', name), channels, traj,
+                   float(spec.get('threshold', 0.15)), float(spec.get('cooldown', 0.4)))
+
+
+class GestureMatcher:
+    """
+    Streaming DTW over every template at once (see module docstring).
+    Frames are taken at most `fps` times a second, so faster cameras see
+    the same template timing. prune=False evaluates every template on
+    every frame (reference for benchmarks).
+    """
+
+    def __init__(self, specs, fps=MATCH_FPS, fallback_dt=0.016, max_gap=0.25, prune=True):
+        self.templates = [GestureTemplate.from_spec(s, fps) for s in specs]
+        self.timer = FrameTimer(fallback_dt, max_gap)
+        self.min_step = 0.75 / fps # Tolerates capture jitter
+        self.last_step = None
+        self.prune = prune
+        k = len(self.templates)
+
+        # Union of channels; each template weights only its own
+        union = []
+        for t in self.templates:
+            union += [c for c in t.channels if c not in union]
+        self.joints = np.array([j for j, _ in union], dtype=np.intp)
+        self.axes = np.array([a for _, a in union], dtype=np.intp)
+        n_ch = len(union)
+        self.lengths = np.array([len(t.trajectory) for t in self.templates], dtype=np.intp)
+        t_max = int(self.lengths.max()) if k else 1
+
+        self.points = np.zeros((k, t_max, n_ch))
+        self.weights = np.zeros((k, 1, n_ch))
+        self.pad = np.full((k, t_max), np.inf) # +inf past each template's end
+        self.box_lo = np.full((k, n_ch), -np.inf)
+        self.box_hi = np.full((k, n_ch), np.inf)
+        for i, t in enumerate(self.templates):
+            cols = [union.index(c) for c in t.channels]
+            n = len(t.trajectory)
+            self.points[i, :n, cols] = t.trajectory.T
+            self.weights[i, 0, cols] = 1.0
+            self.pad[i, :n] = 0.0
+            self.box_lo[i, cols] = t.trajectory.min(axis=0)
+            self.box_hi[i, cols] = t.trajectory.max(axis=0)
+        self.first = self.points[:, 0, :]
+        self.first_weights = self.weights[:, 0, :]
+        self.budget = np.array([t.threshold for t in self.templates]) * self.lengths
+        self.last_index = self.lengths - 1
+        self.tokens = [t.token for t in self.templates]
+        self.cooldowns = np.array([t.cooldown for t in self.templates])
+
+        self.cost = np.full((k, t_max), np.inf) # DTW column: cheapest path ending at each template point
+        self.live = np.zeros(k, dtype=bool)
+        self.cheapest = np.full(k, np.inf)
+        self.ready_at = np.zeros(k)
+
+        # Counters
+        self.frames = 0    # Frames matched (after rate limiting)
+        self.evaluated = 0 # Template updates actually computed
+        self.pruned = 0    # Template updates skipped by a lower bound
+        self.matches = 0
+
+    def __len__(self):
+        return len(self.templates)
+
+    def reset(self):
+        self.cost[:] = np.inf
+        self.live[:] = False
+        self.cheapest[:] = np.inf
+        self.last_step = None
+
+    def update(self, frame, clock=time.time, features=None):
+        """
+        Feeds one LandmarkFrame; returns the tokens of templates that completed on it.
+        features: the preset's FeatureCache, to share the frame's body_frame.
+        """
+        if not self.templates or not frame.has_pose:
+            return []
+        status, now, _ = self.timer.step(frame.capture_ts, clock)
+        if status == FRAME_STALE:
+            return []
+        if status == FRAME_GAP:
+            self.reset()
+        elif self.last_step is not None and now - self.last_step < self.min_step:
+            return []
+        self.last_step = now
+        body = features.get(frame, 'body_frame') if features is not None else None
+        x = body_features(frame.pose, self.joints, self.axes, body)
+        if x is None:
+            return []
+        self.frames += 1
+
+        # Lower bounds: distance to each template's first point (new path) / bounding box (live paths)
+        start = self.first - x
+        start *= self.first_weights
+        start *= start
+        lb_start = np.sqrt(start.sum(axis=1))
+        candidates = (lb_start <= self.budget) | self.live if self.prune else np.ones(len(self.templates), dtype=bool)
+        candidates &= self.ready_at <= now
+        if self.prune and self.live.any():
+            live = self.live & candidates
+            excess = np.maximum(self.box_lo - x, 0.0)
+            excess += np.maximum(x - self.box_hi, 0.0)
+            excess *= excess
+            lb_box = np.sqrt(excess.sum(axis=1))
+            doomed = live & (self.cheapest + lb_box > self.budget) & (lb_start > self.budget)
+            candidates &= ~doomed
+            dropped = self.live & ~candidates
+            if dropped.any():
+                self.cost[dropped] = np.inf
+                self.live[dropped] = False
+        active = np.flatnonzero(candidates)
+        self.evaluated += len(active)
+        self.pruned += len(self.templates) - len(active)
+        if not len(active):
+            return []
+
+        # DTW column update (Itakura steps: stay, advance 1, advance 2; a new path may start at point 0)
+        diff = self.points[active] - x
+        diff *= self.weights[active]
+        diff *= diff
+        dist = np.sqrt(diff.sum(axis=2))
+        dist += self.pad[active]
+        prev = self.cost[active]
+        best = prev.copy()
+        np.minimum(best[:, 1:], prev[:, :-1], out=best[:, 1:])
+        np.minimum(best[:, 2:], prev[:, :-2], out=best[:, 2:])
+        best[:, 0] = 0.0
+        dist += best
+        budget = self.budget[active]
+        dist[dist > budget[:, None]] = np.inf
+        self.cost[active] = dist
+        self.cheapest[active] = dist.min(axis=1)
+        self.live[active] = np.isfinite(self.cheapest[active])
+
+        done = dist[np.arange(len(active)), self.last_index[active]] <= budget
+        if not done.any():
+            return []
+        fired = active[done]
+        self.cost[fired] = np.inf
+        self.live[fired] = False
+        self.cheapest[fired] = np.inf
+        self.ready_at[fired] = now + self.cooldowns[fired]
+        self.matches += len(fired)
+        return [self.tokens[i] for i in fired.tolist()]
+
+
+# Matchers per ControllerLogic instance, rebuilt when GESTURE_TEMPLATES is replaced (SET_SETTINGS)
+_matchers = weakref.WeakKeyDictionary()
+
+def gesture_tokens(logic, frame):
+    """Tokens of the preset's GESTURE_TEMPLATES completed by frame ([] when it has none)"""
+    specs = getattr(logic, 'GESTURE_TEMPLATES', None)
+    if not specs:
+        return []
+    entry = _matchers.get(logic)
+    if entry is None or entry[0] is not specs:
+        try:
+            matcher = GestureMatcher(specs, fallback_dt=getattr(logic, 'DT_FALLBACK', 0.016))
+        except ValueError as e:
+            print(f"LOGIC_ERROR: {e}", flush=True)
+            matcher = GestureMatcher([])
+        entry = _matchers[logic] = (specs, matcher)
+    return entry[1].update(frame, getattr(logic, 'clock', time.time), feature_cache(logic, 'templates'))
+
+
+# ==========================================
+# TEMPLATE RECORDING
+# ==========================================
+def template_from_frames(frames, joints, axes='xy', name='gesture', token=None, fps=MATCH_FPS,
+                         threshold=0.15, cooldown=0.4):
+    """Template spec from a run of LandmarkFrames (frames without a usable pose are skipped)"""
+    channels = channels_of(joints, axes)
+    j = np.array([c[0] for c in channels], dtype=np.intp)
+    a = np.array([c[1] for c in channels], dtype=np.intp)
+    rows, stamps = [], []
+    for f in frames:
+        feat = body_features(f.pose, j, a) if f.has_pose else None
+        if feat is not None:
+            rows.append(feat.tolist())
+            stamps.append(f.capture_ts)
+    if len(rows) < 2:
+        raise ValueError("Need at least 2 frames with a pose")
+    traj = np.array(rows)
+    if all(stamps) and stamps[-1] > stamps[0]:
+        # Resample the captured (irregular) timing onto a uniform grid
+        t = np.array(stamps) - stamps[0]
+        grid = np.arange(0.0, t[-1] + 1e-9, 1.0 / fps)
+        traj = np.stack([np.interp(grid, t, traj[:, c]) for c in range(traj.shape[1])], axis=1)
+    spec = {'name': name, 'token': token or name, 'joints': list(joints), 'axes': axes, 'fps': fps,
+            'trajectory': np.round(traj, 4).tolist(), 'threshold': threshold, 'cooldown': cooldown}
+    GestureTemplate.from_spec(spec, fps) # Validate
+    return spec
+
+def session_frames(records):
+    """LandmarkFrames of a recorded session's landmark lines"""
+    from landmark_protocol import decode_binary_line, decode_json_line, BINARY_PREFIX
+    from landmark_frame import LandmarkFrame
+    frames = []
+    for ts, line in records:
+        if line.startswith(BINARY_PREFIX):
+            frame = LandmarkFrame.from_packet(decode_binary_line(line))
+        elif line.startswith("RAW_LM"):
+            frame = LandmarkFrame.from_dicts(*decode_json_line(line))
+        else:
+            continue
+        if not frame.capture_ts:
+            frame.capture_ts = ts
+        frames.append(frame)
+    return frames
+
+def main():
+    from session_recorder import read_session
+
+    parser = argparse.ArgumentParser(description="Record a gesture template from a session (.srs)")
+    parser.add_argument('session')
+    parser.add_argument('--start', type=int, required=True, help="First landmark frame (0-based)")
+    parser.add_argument('--end', type=int, required=True, help="Last landmark frame (inclusive)")
+    parser.add_argument('--joints', nargs='+', required=True, help="Pose joint names or indices")
+    parser.add_argument('--axes', default='xy')
+    parser.add_argument('--name', required=True)
+    parser.add_argument('--token', default=None, help="Token to emit (default: the name)")
+    parser.add_argument('--threshold', type=float, default=0.15)
+    parser.add_argument('--cooldown', type=float, default=0.4)
+    args = parser.parse_args()
+
+    _, records = read_session(args.session)
+    frames = session_frames(records)[args.start:args.end + 1]
+    joints = [int(j) if j.isdigit() else j for j in args.joints]
+    spec = template_from_frames(frames, joints, args.axes, args.name, args.token,
+                                threshold=args.threshold, cooldown=args.cooldown)
+    json.dump(spec, sys.stdout)
+    print(flush=True)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+SRIKA Hand Features
+Gesture features for both hands, computed as one batched array pass.
+
+Hands are placed in fixed slots by their handedness label (slot 0 = 'Left',
+slot 1 = 'Right'), so a feature always describes the same hand whatever
+order the tracker listed them in. When both hands carry the same label the
+one further left in the image takes the 'Left' slot (the tracker's 'Left'
+hand is the image-left one for the app's camera feed).
+
+Feature vector per slot (FEATURE_NAMES; an empty slot is all zeros):
+    present       1.0 when the slot holds a usable hand (palm scale >= MIN_PALM_SCALE)
+    palm_scale    mean wrist -> MCP distance
+    fold_ratio    mean fingertip -> MCP distance / palm scale (~0.2 fist, ~1.0 open)
+    thumb_index   thumb tip -> index MCP / palm scale
+    thumb_wrist   thumb tip -> wrist / palm scale
+    wrist_x, wrist_y
+
+hand_distances() measures every pair of every hand in one gather; it takes
+a whole session (frames, 2, 21, 4). A single frame's one or two hands are cheaper with plain float math
+(hand_measures() picks), and both compute in float64 so streaming
+and offline presets see the same values.
+
+    extractor = HandFeatureExtractor()
+    left, right = extractor.extract(frame) # Rows of FEATURES floats
+    vector = extractor.vector              # (2 * FEATURES,) array for templates / logging
+"""
+
+import math
+
+import numpy as np
+
+from landmark_protocol import HAND_POINTS, FIELDS, MAX_HANDS
+from landmark_frame import X, Y
+
+HAND_SLOTS = {'Left': 0, 'Right': 1}
+FEATURE_NAMES = ('present', 'palm_scale', 'fold_ratio', 'thumb_index', 'thumb_wrist', 'wrist_x', 'wrist_y')
+FEATURES = len(FEATURE_NAMES)
+PRESENT, PALM_SCALE, FOLD_RATIO, THUMB_INDEX, THUMB_WRIST, WRIST_X, WRIST_Y = range(FEATURES)
+MIN_PALM_SCALE = 0.01 # Smaller palms are detection noise
+SCALAR_MAX_HANDS = 2 # One frame's hands: float math beats the NumPy gather (bench_hand_features.py)
+
+# Hand distance pairs:
+#   0-3 wrist -> MCPs (palm scale) | 4-7 tips -> MCPs (fold) | 8 thumb tip -> index MCP | 9 thumb tip -> wrist
+HAND_PAIRS_A = np.array([0, 0, 0, 0, 8, 12, 16, 20, 4, 4])
+HAND_PAIRS_B = np.array([5, 9, 13, 17, 5, 9, 13, 17, 5, 0])
+PAIRS = len(HAND_PAIRS_A)
+_PAIR_INDEX = np.concatenate([HAND_PAIRS_A, HAND_PAIRS_B])
+_EMPTY_ROW = (0.0,) * FEATURES
+
+
+def hand_slots(handedness, hands):
+    """Slot (0 / 1) for each listed hand, None past MAX_HANDS; hands is (n, 21, >=1) for the x fallback"""
+    if len(hands) == 1:
+        return [HAND_SLOTS.get(handedness[0], 0) if handedness else 0]
+    count = min(len(hands), MAX_HANDS)
+    slots = [HAND_SLOTS.get(label, 0) for label in handedness[:count]]
+    slots += [0] * (count - len(slots)) # Missing labels
+    if count == MAX_HANDS and slots[0] == slots[1]:
+        slots = [0, 1] if hands[0, 0, X] <= hands[1, 0, X] else [1, 0]
+    return slots + [None] * (len(hands) - count)
+
+def session_slots(hands, hand_counts, right_hands):
+    """Batch counterpart of hand_slots(): (frames, listed) slot of each listed hand (listed <= MAX_HANDS)"""
+    listed = min(hands.shape[1], MAX_HANDS)
+    slots = right_hands[:, :listed].astype(np.intp)
+    if listed == MAX_HANDS:
+        dup = (hand_counts >= MAX_HANDS) & (slots[:, 0] == slots[:, 1])
+        first_right = hands[:, 0, 0, X] > hands[:, 1, 0, X]
+        slots[dup, 0] = first_right[dup]
+        slots[dup, 1] = ~first_right[dup]
+    return slots
+
+def session_hand_slots(hands, hand_counts, right_hands):
+    """
+    Batch counterpart of hand_slots() for preset_batch.BatchSession arrays.
+    Returns slot-ordered hands (frames, 2, 21, 4) and presence (frames, 2).
+    """
+    n = len(hands)
+    slots = session_slots(hands, hand_counts, right_hands)
+    listed = slots.shape[1]
+    slotted = np.zeros((n, MAX_HANDS, HAND_POINTS, FIELDS), dtype=np.float32)
+    present = np.zeros((n, MAX_HANDS), dtype=bool)
+    frames = np.arange(n)
+    for j in range(listed):
+        m = j < hand_counts
+        slotted[frames[m], slots[m, j]] = hands[m, j]
+        present[frames[m], slots[m, j]] = True
+    return slotted, present
+
+def hand_distances(hands):
+    """(..., 21, >=2) hands -> (..., 10) float64 distances for HAND_PAIRS_A / HAND_PAIRS_B, one gather for all hands"""
+    pts = np.take(hands, _PAIR_INDEX, axis=-2)[..., :2].astype(np.float64)
+    delta = pts[..., :PAIRS, :] - pts[..., PAIRS:, :]
+    return np.hypot(delta[..., X], delta[..., Y])
+
+def hand_measures(hands):
+    """
+    (distances, wrists) lists for (n, 21, >=2) hands, as hand_distances(hands).tolist()
+    and hands[:, 0, :2].tolist(): float math up to SCALAR_MAX_HANDS, one gather above.
+    """
+    if len(hands) > SCALAR_MAX_HANDS:
+        return hand_distances(hands).tolist(), hands[:, 0, :2].tolist()
+    dists, wrists = [], []
+    hypot = math.hypot
+    for hand in hands[:, :, :2].tolist():
+        (wx, wy), _, _, _, (tx, ty), (ix, iy), _, _, (itx, ity), (mx, my), _, _, (mtx, mty), (rx, ry), _, _, (rtx, rty), \
+            (px, py), _, _, (ptx, pty) = hand
+        dists.append([hypot(wx - ix, wy - iy), hypot(wx - mx, wy - my), hypot(wx - rx, wy - ry), hypot(wx - px, wy - py),
+                      hypot(itx - ix, ity - iy), hypot(mtx - mx, mty - my), hypot(rtx - rx, rty - ry), hypot(ptx - px, pty - py),
+                      hypot(tx - ix, ty - iy), hypot(tx - wx, ty - wy)])
+        wrists.append((wx, wy))
+    return dists, wrists
+
+def slot_rows(handedness, hands, dists, wrists):
+    """[left, right] feature rows from each listed hand's distances / wrist (lists, as hand_distances().tolist())"""
+    rows = [_EMPTY_ROW, _EMPTY_ROW]
+    for slot, d, (wx, wy) in zip(hand_slots(handedness, hands), dists, wrists):
+        if slot is None: continue
+        palm = (d[0] + d[1] + d[2] + d[3]) / 4
+        if palm < MIN_PALM_SCALE: continue
+        rows[slot] = [1.0, palm, ((d[4] + d[5] + d[6] + d[7]) / 4) / palm, d[8] / palm, d[9] / palm, wx, wy]
+    return rows
+
+def hand_features(slotted, present):
+    """(..., 2, 21, >=2) slot-ordered hands + (..., 2) presence -> (..., 2, FEATURES) float64"""
+    d = hand_distances(slotted)
+    out = np.zeros(d.shape[:-1] + (FEATURES,))
+    palm = (d[..., 0] + d[..., 1] + d[..., 2] + d[..., 3]) / 4
+    valid = present & ~(palm < MIN_PALM_SCALE)
+    safe_palm = np.where(valid, palm, 1.0)
+    out[..., PRESENT] = valid
+    out[..., PALM_SCALE] = palm
+    out[..., FOLD_RATIO] = ((d[..., 4] + d[..., 5] + d[..., 6] + d[..., 7]) / 4) / safe_palm
+    out[..., THUMB_INDEX] = d[..., 8] / safe_palm
+    out[..., THUMB_WRIST] = d[..., 9] / safe_palm
+    out[..., WRIST_X:] = slotted[..., 0, :2]
+    out[~valid] = 0.0
+    return out
+
+
+class HandFeatureExtractor:
+    """
+    Streaming extractor. The frame's hands go through hand_measures()
+    and the per-slot ratios are plain float math in the same order as
+    hand_features(), so streaming and session features are identical.
+    """
+
+    def __init__(self):
+        self.features = [_EMPTY_ROW] * MAX_HANDS
+
+    def extract(self, frame):
+        """[left, right] feature rows (FEATURES floats each) for the frame"""
+        rows = [_EMPTY_ROW, _EMPTY_ROW]
+        if frame.hand_count:
+            hands = frame.hands
+            rows = slot_rows(frame.handedness, hands, *hand_measures(hands))
+        self.features = rows
+        return rows
+
+    @property
+    def vector(self):
+        """Latest features as one flat (2 * FEATURES,) array: Left slot, then Right"""
+        return np.array(self.features).reshape(-1)
+
+    def feature(self, label, name):
+        return self.features[HAND_SLOTS[label]][FEATURE_NAMES.index(name)]
@@ -4,13 +4,17 @@ Supports Steam Input for Games and Accessibility for Apps.
 Zero anti-cheat risk. 
 """
 
+import time
+STARTUP_T0 = time.perf_counter() # Launch reference for the startup timeline
+
 import sys
 import os
-import time
+import json
+import asyncio
 import threading
 import queue
 import ctypes
-import psutil
+from concurrent.futures import ThreadPoolExecutor
 
 # ==========================================
 # LOGGING (SAFE)
@@ -29,71 +33,101 @@ log_to_file(f"Python: {sys.version}")
 log_to_file(f"CWD: {os.getcwd()}")
 log_to_file(f"PID: {os.getpid()}")
 
-# ==========================================
-# STEAM API HACK
-# ==========================================
-try:
-    # Use site-packages directly if available
-    try:
-        from steamworks.methods import STEAMWORKS
-        STEAMWORKS_CLASS = STEAMWORKS
-        STEAM_AVAILABLE = True
-    except:
-        STEAM_AVAILABLE = False
-except Exception:
-    STEAM_AVAILABLE = False
-
-# ==========================================
-# ACCESSIBILITY (pywinauto)
-# ==========================================
-try:
-    import pywinauto
-    from pywinauto import Desktop
-    PYWINAUTO_AVAILABLE = True
-except ImportError:
-    PYWINAUTO_AVAILABLE = False
-
 # ==========================================
 # STATE & CONFIG
 # ==========================================
-input_queue = queue.Queue()
+from frame_queue import FrameCoalescingQueue
+input_queue = FrameCoalescingQueue() # Control lines in order, RAW_LM frames latest-wins
 running = True
 active_backend = "ACCESSIBILITY" # Default
 active_profile = "asphalt" # Standard fallback
 
+# Landmark Frame Protocol (Binary RAW_LMB + JSON RAW_LM fallback)
+from landmark_protocol import decode_json_line, decode_binary_line, encode_packet_line, BINARY_PREFIX, JSON_PREFIX, SHM_NOTIFY_LINE
+from bridge_metrics import LoopStats, StartupTimeline, LatencyTracer
+from command_router import CommandRouter
+from preset_loader import load_preset_modules, load_preset_module, resolve_logic, apply_settings, carry_state, PresetWatcher
+from session_recorder import SessionRecorder
+from pipeline import Pipeline, Stage, merge_reports
+from frame_scheduler import FrameScheduler, NO_OPTIONAL, NO_DEBUG
+import output_writer
+
+timeline = StartupTimeline(STARTUP_T0)
+timeline.mark("core_imports")
+
+# Slow startup work (ViGEm pad creation, preset exec, requests import) runs in parallel
+startup_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix="srika-startup")
+
 # Backends
-try:
-    from xbox_adapter import xbox_adapter
-except Exception:
-    xbox_adapter = None
+xbox_adapter = None # Resolved in main() once the parallel load finishes
+
+def load_xbox_adapter():
+    with timeline.measure("xbox_adapter"):
+        try:
+            from xbox_adapter import xbox_adapter as adapter
+            return adapter
+        except Exception:
+            return None
+
+xbox_future = startup_pool.submit(load_xbox_adapter)
+
+# Optional Shared-Memory Transport (stdin stays for control lines)
+LM_TRANSPORT = os.environ.get('SRIKA_LM_TRANSPORT', 'stdin').lower()
+LM_SHM_NAME = os.environ.get('SRIKA_LM_SHM_NAME', 'srika_landmarks')
+lm_ring = None
+
+# Preset Hot Reload ("1" = watch presets/*/logic.py and carry state over, "fresh" = watch, restart state)
+WATCH_PRESETS = os.environ.get('SRIKA_WATCH_PRESETS', '').lower()
+PRESET_WATCH_INTERVAL = 1.0
+preset_watcher = None
+preset_settings = {} # Preset name -> SET_SETTINGS values applied so far
+
+# Session Recording (CMD:RECORD_START / CMD:RECORD_STOP, or from launch: "1" = default path)
+RECORD_SESSION = os.environ.get('SRIKA_RECORD_SESSION', '')
+session_recorder = None
+PERF_EPOCH_OFFSET = time.time() - time.perf_counter() # Queue stamps -> receive timestamps
+
+# Pipelined Backend ("0" = send reports on the dispatch loop, e.g. single-core hosts)
+PIPELINE = os.environ.get('SRIKA_PIPELINE', '1') != '0'
+BACKEND_QUEUE_CAPACITY = 2 # Reports waiting for the backend; beyond that the newest is merged in
+
+# Adaptive Quality ("0" = never degrade; frames are still timed against the deadline)
+FRAME_SCHEDULER = os.environ.get('SRIKA_FRAME_SCHEDULER', '1') != '0'
+
+# Periodic Jobs (one asyncio task each)
+ACCESS_STATUS_INTERVAL = 300.0
+PROCESS_DETECT_INTERVAL = 300.0
+HEARTBEAT_INTERVAL = 1.0
+LOOP_STATS_INTERVAL = 10.0
+QUEUE_STATS_INTERVAL = 1.0
+PIPELINE_STATS_INTERVAL = 1.0
+SCHEDULER_STATS_INTERVAL = 5.0
+STDIN_LINE_LIMIT = 1 << 20 # RAW_LM JSON frames can be several KB
 
 # Dynamic Preset Discovery
 logic_registry = {}
+preset_modules = {}
 
 def load_presets():
-    global logic_registry
-    preset_dir = os.path.join(os.path.dirname(__file__), 'presets')
-    if not os.path.exists(preset_dir):
-        print(f"[BRIDGE] Preset directory not found: {preset_dir}", flush=True)
-        return
-        
-    for d in os.listdir(preset_dir):
-        path = os.path.join(preset_dir, d)
-        if os.path.isdir(path):
-            logic_file = os.path.join(path, 'logic.py')
-            if os.path.exists(logic_file):
-                try:
-                    import importlib.util
-                    spec = importlib.util.spec_from_file_location(f"preset_{d}", logic_file)
-                    mod = importlib.util.module_from_spec(spec)
-                    spec.loader.exec_module(mod)
-                    if hasattr(mod, 'logic'):
-                        logic_registry[d] = mod.logic
-                        print(f"[BRIDGE] Loaded preset: {d}", flush=True)
-                except Exception as e:
-                    print(f"[BRIDGE] Failed to load preset {d}: {e}", flush=True)
-
-load_presets()
+    with timeline.measure("presets"):
+        _load_presets()
+
+def _load_presets():
+    preset_modules.update(load_preset_modules())
+    for name, mod in preset_modules.items():
+        if hasattr(mod, 'logic'):
+            logic_registry[name] = mod.logic
+
+presets_future = startup_pool.submit(load_presets)
+
+# Frame stages (NumPy): imported here, while the startup jobs above run, not on the first frame / command
+from landmark_frame import LandmarkFrame
+from landmark_filter import filter_frame
+from gesture_templates import gesture_tokens
+from frame_features import cache_stats, reset_cache_stats
+from player_batch import player_batch, apply_batch_settings, batch_stats
+from preset_schema import compile_store_preset
+timeline.mark("frame_stages")
 
 # Steam State
 steam_api = None
@@ -107,6 +141,7 @@ tekken_pid = None
 def detect_steam_app():
     """Detect if target game (Tekken) is running and return its PID"""
     global tekken_pid
+    import psutil
     tekken_names = ['Polaris-Win64-Shipping', 'TEKKEN 8', 'TEKKEN', 'TekkenGame']
     for proc in psutil.process_iter(['name', 'pid']):
         try:
@@ -123,51 +158,6 @@ def detect_steam_app():
     tekken_pid = None
     return False
 
-def select_best_backend():
-    global active_backend, steam_api
-    
-    # 0. ALWAYS PREFER VIRTUAL CONTROLLER IF DRIVER IS WORKING
-    if xbox_adapter and xbox_adapter.gamepad:
-        active_backend = "VIRTUAL_CONTROLLER"
-        print("[BRIDGE] Backend Selected: VIRTUAL_CONTROLLER", flush=True)
-        return
-        
-    # 1. Try Steam Input if game is running and API available
-    app_running = detect_steam_app()
-    if STEAM_AVAILABLE and app_running:
-        try:
-            if not steam_api:
-                # Create steam_appid.txt
-                if not os.path.exists("steam_appid.txt"):
-                    with open("steam_appid.txt", "w") as f:
-                        f.write("1778820") # Tekken 8
-                
-                # Attempt to initialize
-                if hasattr(steamworks, 'STEAMWORKS'):
-                    steam_api = steamworks.STEAMWORKS()
-                elif hasattr(steamworks, 'steamworks') and hasattr(steamworks.steamworks, 'STEAMWORKS'):
-                    steam_api = steamworks.steamworks.STEAMWORKS()
-                
-                if steam_api:
-                    steam_api.initialize()
-            
-            active_backend = "STEAM_INPUT"
-            print("BACKEND_SELECTED:STEAM_INPUT", flush=True)
-            print("STEAM_INPUT_STATUS:READY", flush=True)
-            return
-        except: pass
-        
-    # 2. Fallback to Accessibility
-    if PYWINAUTO_AVAILABLE:
-        active_backend = "ACCESSIBILITY"
-        if app_running:
-             print(f"BACKEND_SELECTED:ACCESSIBILITY (Game Detected PID={tekken_pid})", flush=True)
-        else:
-             print("BACKEND_SELECTED:ACCESSIBILITY", flush=True)
-    else:
-        active_backend = "NONE"
-        print("BACKEND_SELECTED:NONE", flush=True)
-
 # ==========================================
 # ACCESS CONTROL
 # ==========================================
@@ -175,47 +165,57 @@ def select_best_backend():
 native_dir = '_srika_native' if os.path.exists(os.path.join(os.path.dirname(__file__), '..', '_srika_native')) else 'srika_native'
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', native_dir))
 
-try:
-    from managers.access_client import AccessClient
-except ImportError:
-    # Fallback for structured imports
-    try:
-        if native_dir == '_srika_native':
-             from _srika_native.managers.access_client import AccessClient
-        else:
-             from srika_native.managers.access_client import AccessClient
-    except ImportError as e:
-        print(f"[BRIDGE] CRITICAL: Could not import AccessClient from {native_dir}: {e}", flush=True)
-        class AccessClient: 
-            def __init__(self): self.is_verified = True
-            def get_session_limits(self): return {'allowed': True, 'plan': 'PRO'}
-            def verify_user(self, jwt): return {'allowed': True}
-
-access_client = AccessClient()
+def load_access_client():
+    with timeline.measure("access_client"):
+        try:
+            from managers.access_client import AccessClient
+        except ImportError:
+            # Fallback for structured imports
+            try:
+                if native_dir == '_srika_native':
+                     from _srika_native.managers.access_client import AccessClient
+                else:
+                     from srika_native.managers.access_client import AccessClient
+            except ImportError as e:
+                print(f"[BRIDGE] CRITICAL: Could not import AccessClient from {native_dir}: {e}", flush=True)
+                class AccessClient: 
+                    def __init__(self): self.is_verified = True
+                    def get_session_limits(self): return {'allowed': True, 'plan': 'PRO'}
+                    def verify_user(self, jwt): return {'allowed': True}
+        return AccessClient()
+
+access_client = None # Resolved in main() once the parallel load finishes
+access_future = startup_pool.submit(load_access_client)
 demo_remaining = 60.0
-last_frame_time = time.time()
 session_expired = False
 
 # ==========================================
 # INPUT EXECUTION
 # ==========================================
-def execute_input(tokens):
-    global session_expired, active_backend
+first_report_pending = True
+
+def execute_input(tokens, trace=None):
+    """Sends tokens to the active backend. `trace` (FrameTrace) is stamped when the report goes out."""
+    global session_expired, active_backend, first_report_pending
     
     if session_expired:
         return # Input blocked
 
+    if first_report_pending and tokens:
+        first_report_pending = False
+        print(f"STARTUP_FIRST_REPORT: {timeline.elapsed() * 1000:.1f}ms after launch | Backend={active_backend}", flush=True)
+
     # Silent execution for speed
     if active_backend == "VIRTUAL_CONTROLLER" and xbox_adapter:
         try:
-            xbox_adapter.update(tokens)
+            xbox_adapter.update(tokens, trace)
         except Exception as e:
              print(f"XBOX_ERROR: {e}", flush=True)
             
     elif active_backend == "ACCESSIBILITY":
         try:
             from action_manager import action_manager
-            action_manager.update(tokens)
+            action_manager.update(tokens, trace)
         except Exception as e:
             print(f"ACTION_MANAGER_ERROR: {e}", flush=True)
         
@@ -239,30 +239,537 @@ def execute_input(tokens):
                 elif action in ['LEFT', 'RIGHT']:
                     val = -1.0 if action == 'LEFT' else 1.0
                     print(f"[STEAM_INPUT] Analog=MOVE_X | Value={val}", flush=True)
+            if trace is not None: trace.mark_report()
         except Exception as e:
             print(f"STEAM_EXEC_ERROR: {e}", flush=True)
             
     elif active_backend == "ACCESSIBILITY":
         try:
             from action_manager import action_manager
-            action_manager.update(tokens)
+            action_manager.update(tokens, trace)
         except Exception as e:
             print(f"ACTION_MANAGER_ERROR: {e}", flush=True)
 
+# Couch versus: players 2+ each get their own virtual controller (created on their first report)
+player_adapters = {}
+
+def execute_player_input(player, tokens, trace=None):
+    """Sends an extra player's tokens to their own controller (virtual controller backend only)"""
+    if session_expired or active_backend != "VIRTUAL_CONTROLLER" or not xbox_adapter:
+        return # Keyboard / accessibility backends have one player
+    adapter = player_adapters.get(player)
+    if adapter is None:
+        from xbox_adapter import XboxAdapter
+        adapter = player_adapters[player] = XboxAdapter()
+        print(f"[BRIDGE] Player {player + 1}: virtual controller {'CREATED' if adapter.gamepad else 'UNAVAILABLE'}", flush=True)
+    try:
+        adapter.update(tokens, trace)
+    except Exception as e:
+        print(f"XBOX_ERROR: Player {player + 1} | {e}", flush=True)
+
+def controller_adapters():
+    """(player, XboxAdapter) of every virtual controller in use"""
+    adapters = [(0, xbox_adapter)] if xbox_adapter and xbox_adapter.gamepad else []
+    return adapters + sorted(player_adapters.items())
+
+def send_report(item):
+    """Backend stage handler: (tokens, trace[, {player: tokens}]) -> active backend"""
+    tokens, trace = item[0], item[1]
+    players = item[2] if len(item) > 2 else None
+    if tokens or not players:
+        execute_input(tokens, trace)
+    if players:
+        for player, player_tokens in players.items():
+            execute_player_input(player, player_tokens, trace)
+    if trace is not None:
+        latency_tracer.record(trace)
+
+# A ViGEm report or SendInput call can stall for milliseconds: it runs on its own
+# worker so decode + preset of the next frame are not held up behind it.
+# Only the report is offloaded; decode / filter / preset stay on the dispatch loop (pipeline.py)
+pipeline = Pipeline()
+backend_stage = pipeline.add(Stage('backend', send_report, capacity=BACKEND_QUEUE_CAPACITY,
+                                   policy='latest', merge=merge_reports, inline=not PIPELINE))
+
 # ==========================================
-# SYSTEM THREADS
+# STDIN / TRANSPORT READERS
 # ==========================================
+bridge_loop = None # asyncio loop of the running bridge
+frame_ready = None # asyncio.Event: input_queue has items
+
+def enqueue_line(line):
+    """Thread-safe: queue a line and wake the dispatcher"""
+    input_queue.put((time.perf_counter(), line))
+    if bridge_loop:
+        bridge_loop.call_soon_threadsafe(frame_ready.set)
+
+def enqueue_eof():
+    input_queue.put(None)
+    if bridge_loop:
+        bridge_loop.call_soon_threadsafe(frame_ready.set)
+
 def read_input():
-    global running
+    """Blocking fallback reader (Windows pipes cannot be attached to the event loop)"""
     while running:
         try:
             line = sys.stdin.readline()
             if not line: break
-            input_queue.put(line.strip())
+            enqueue_line(line.strip())
         except:
             break
+    enqueue_eof()
+
+async def read_input_async():
+    """Async stdin reader; falls back to a reader thread where pipes are unsupported"""
+    loop = asyncio.get_running_loop()
+    reader = asyncio.StreamReader(limit=STDIN_LINE_LIMIT)
+    try:
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(reader), sys.stdin)
+    except (NotImplementedError, OSError, ValueError, AttributeError):
+        threading.Thread(target=read_input, daemon=True).start()
+        return
+
+    try:
+        while running:
+            try:
+                line = await reader.readline()
+            except (ValueError, asyncio.LimitOverrunError) as e:
+                print(f"[BRIDGE] Dropped oversized stdin line: {e}", flush=True)
+                continue
+            except Exception as e: # Broken pipe / reset: treat as EOF
+                print(f"[BRIDGE] stdin read failed: {e}", flush=True)
+                break
+            if not line: break
+            enqueue_line(line.decode('utf-8', 'replace').strip())
+    finally:
+        enqueue_eof() # The dispatcher always learns that input ended
+
+def read_shm_frames():
+    """Watches the shared-memory ring and wakes the main loop when a new frame lands"""
+    global lm_ring
+    try:
+        from landmark_ring import LandmarkRingReader
+    except Exception as e:
+        print(f"[BRIDGE] SHM transport unavailable: {e}", flush=True)
+        return
+
+    idle_since = time.time()
+    while running:
+        if lm_ring is None:
+            try:
+                lm_ring = LandmarkRingReader(LM_SHM_NAME)
+                print(f"[BRIDGE] SHM transport attached: {LM_SHM_NAME}", flush=True)
+            except FileNotFoundError:
+                time.sleep(0.5) # Producer not up yet
+                continue
+            except Exception as e:
+                print(f"[BRIDGE] SHM attach failed: {e}", flush=True)
+                return
+
+        if lm_ring.has_new():
+            idle_since = time.time()
+            enqueue_line(SHM_NOTIFY_LINE) # Coalesces like any RAW_LM frame
+            time.sleep(0.0005)
+        else:
+            # Poll fast while frames are flowing, back off when the camera is idle
+            time.sleep(0.001 if time.time() - idle_since < 1.0 else 0.02)
+
+# ==========================================
+# COMMAND DISPATCH
+# ==========================================
+lm_count = 0
+loop_stats = LoopStats(LOOP_STATS_INTERVAL)
+latency_tracer = LatencyTracer()
+scheduler = FrameScheduler(enabled=FRAME_SCHEDULER)
+dispatch_enqueued_at = 0.0 # perf_counter stdin-read time of the line being dispatched
+
+def handle_idle(cmd):
+    # Force release (every player's controller)
+    backend_stage.submit(([], None, dict.fromkeys(player_adapters, [])) if player_adapters else ([], None))
+
+def handle_set_profile(cmd):
+    global active_profile
+    active_profile = cmd.replace("SET_PROFILE:", "").strip()
+    print(f"[BRIDGE] Active Profile Sync: {active_profile}", flush=True)
+
+def handle_set_settings(cmd):
+    try:
+        payload = cmd.replace("SET_SETTINGS:", "").strip()
+        new_settings = json.loads(payload)
+        
+        # Update active logic
+        name = active_profile
+        if name not in logic_registry and "-official" in name:
+            name = name.replace("-official", "")
+        logic = logic_registry.get(name)
+        
+        if logic:
+            apply_settings(logic, new_settings)
+            apply_batch_settings(logic, new_settings) # Couch versus: the other players' instances
+            preset_settings.setdefault(name, {}).update(new_settings) # Re-applied after a hot reload
+    except Exception as e:
+        print(f"SET_SETTINGS_ERROR: {e}", flush=True)
+
+def handle_load_preset(cmd):
+    # Store / inventory preset: declarative definition compiled into an evaluator (preset_schema.py)
+    try:
+        item = json.loads(cmd[len("LOAD_PRESET:"):])
+        preset = compile_store_preset(item)
+        logic_registry[preset.preset_id] = preset
+        print(f"[BRIDGE] Loaded store preset: {preset.preset_id} | Compile={preset.compile_ms:.2f}ms", flush=True)
+    except Exception as e:
+        print(f"LOAD_PRESET_ERROR: {e}", flush=True)
+
+def handle_landmarks(cmd):
+    global lm_count
+    lm_count += 1
+    trace = latency_tracer.begin(dispatch_enqueued_at)
+    level = None
+    
+    try:
+        # Route by Active Profile
+        tokens = []
+        logic = resolve_logic(logic_registry, active_profile)
+
+        if cmd == SHM_NOTIFY_LINE:
+            packet = lm_ring.read_latest() if lm_ring else None
+            if packet is None: return
+            if session_recorder is not None:
+                session_recorder.record(encode_packet_line(packet), dispatch_enqueued_at + PERF_EPOCH_OFFSET)
+        elif cmd.startswith(BINARY_PREFIX):
+            packet = decode_binary_line(cmd)
+        else:
+            packet = None
+            pose_lm, hands_lm, handedness_lm, frame_id, capture_ts = decode_json_line(cmd) # Legacy JSON
+
+        # Array-backed presets (process_frame) skip the dict conversion entirely
+        frame = frames = None
+        if logic and hasattr(logic, 'process_frame'):
+            if packet is not None and packet.multiplayer:
+                frames = LandmarkFrame.from_player_packet(packet)
+            elif packet is not None:
+                frame = LandmarkFrame.from_packet(packet) # SHM packets were copied out of the ring by read_latest
+            else:
+                frame = LandmarkFrame.from_dicts(pose_lm, hands_lm, handedness_lm, frame_id, capture_ts)
+        elif packet is not None:
+            pose_lm, hands_lm, handedness_lm = packet.to_legacy()
+        trace.mark_decoded(packet if packet is not None else frame)
+        player_tokens = None
+
+        # Frame budget: degrade when the last frames ran past the camera interval
+        # Capture stamps are renderer epoch time: moved onto the perf_counter clock of the enqueue stamps
+        level = scheduler.begin(trace.capture_ts - PERF_EPOCH_OFFSET if trace.capture_ts else dispatch_enqueued_at)
+        if logic and scheduler.skip(getattr(logic, 'CRITICAL', True)):
+            level = None # A skipped frame says nothing about the budget: no end()
+            return # Backend keeps the previous report
+        if hasattr(logic, 'debug_output'):
+            logic.debug_output = level < NO_DEBUG
+            
+        if frames is not None:
+            # Couch versus: every player through the preset on their own instance (player_batch.py)
+            tokens, *others = player_batch(logic).process(frames, optional=level < NO_OPTIONAL, debug=level < NO_DEBUG)
+            player_tokens = {p: t for p, t in enumerate(others, 1) if t}
+        elif frame is not None:
+            frame = filter_frame(logic, frame)
+            tokens = logic.process_frame(frame)
+            if level < NO_OPTIONAL:
+                matched = gesture_tokens(logic, frame) # Recorded motion templates (GESTURE_TEMPLATES)
+                if matched: tokens = list(tokens) + matched
+        elif logic:
+            tokens = logic.process(pose_lm, hands_lm, handedness_lm)
+        trace.mark_preset_done()
+            
+        if tokens or player_tokens:
+            # 1. ALWAYS Relay back to UI for "Recent Actions" (players 2+ on their own tag)
+            if tokens:
+                print(f"G_ACTION:{','.join(tokens)}", flush=True)
+            if player_tokens:
+                for p, t in player_tokens.items():
+                    print(f"G_ACTION_P{p + 1}:{','.join(t)}", flush=True)
+            
+            # 2. Execute via Active Backend (the backend stage records the trace once sent)
+            backend_stage.submit((tokens, trace, player_tokens) if player_tokens else (tokens, trace))
+            trace = None
+    except Exception as e:
+        print(f"LOGIC_ERROR: {e}", flush=True)
+    finally:
+        if level is not None:
+            scheduler.end(time.perf_counter() - dispatch_enqueued_at)
+        if trace is not None:
+            latency_tracer.record(trace)
+
+def handle_verify(cmd):
+    # Handle Verification (network call runs off the event loop)
+    jwt = cmd.replace("CMD:VERIFY:", "").strip()
+    asyncio.ensure_future(verify_session(jwt))
+
+def handle_dump_stats(cmd):
+    controllers = controller_adapters()
+    for line in (router.dump_stats() + cache_stats(logic_registry) + batch_stats(logic_registry) + pipeline.report()
+                 + [scheduler.status()] + [adapter.status(f"player {p + 1}") for p, adapter in controllers]):
+        print(line, flush=True)
+    if cmd.endswith(":RESET"):
+        router.reset_stats()
+        reset_cache_stats(logic_registry)
+        pipeline.reset_stats()
+        scheduler.reset_stats()
+        for _, adapter in controllers:
+            adapter.reset_stats()
+
+def handle_dump_latency(cmd):
+    for line in latency_tracer.report():
+        print(line, flush=True)
+    if cmd.endswith(":RESET"):
+        latency_tracer.reset()
+
+def start_recording(path=None):
+    global session_recorder
+    stop_recording()
+    try:
+        session_recorder = SessionRecorder(path, active_profile)
+        print(session_recorder.status("STARTED"), flush=True)
+    except OSError as e:
+        print(f"RECORD_STATUS: FAILED | {e}", flush=True)
+
+def stop_recording():
+    global session_recorder
+    recorder, session_recorder = session_recorder, None
+    if recorder is not None:
+        recorder.close()
+        print(recorder.status("STOPPED"), flush=True)
+
+def handle_record_start(cmd):
+    path = cmd[len("CMD:RECORD_START:"):].strip() if cmd.startswith("CMD:RECORD_START:") else ""
+    start_recording(path or None)
+
+def handle_record_stop(cmd):
+    stop_recording()
+
+# ==========================================
+# PRESET HOT RELOAD
+# ==========================================
+async def hot_reload_preset(name, carry=True):
+    """Re-executes a preset off the event loop, then swaps it in between two frames"""
+    loop = asyncio.get_running_loop()
+    start = time.perf_counter()
+    try:
+        mod = await loop.run_in_executor(None, load_preset_module, name)
+    except Exception as e:
+        print(f"[BRIDGE] Failed to reload preset {name}: {e}", flush=True) # The running version stays active
+        return
+    load_ms = (time.perf_counter() - start) * 1000
+
+    # Swap: runs on the loop, so no frame is being dispatched right now
+    start = time.perf_counter()
+    logic, old = getattr(mod, 'logic', None), logic_registry.get(name)
+    carried = []
+    if carry and logic is not None:
+        if old is not None:
+            carried = carry_state(old, logic)
+        if name in preset_settings:
+            apply_settings(logic, preset_settings[name], log=lambda *a, **k: None)
+    preset_modules[name] = mod
+    if logic is not None:
+        logic_registry[name] = logic
+    register_preset_commands({name: mod})
+    swap_ms = (time.perf_counter() - start) * 1000
+    state = f"carried({len(carried)})" if carry else "fresh"
+    print(f"[BRIDGE] Reloaded preset: {name} | Load={load_ms:.1f}ms Swap={swap_ms:.2f}ms | State={state}", flush=True)
+
+def handle_reload_preset(cmd):
+    # CMD:RELOAD_PRESET:<name>[:FRESH]
+    name, _, mode = cmd[len("CMD:RELOAD_PRESET:"):].strip().partition(":")
+    asyncio.ensure_future(hot_reload_preset(name, carry=mode.upper() != "FRESH"))
+
+async def watch_presets():
+    for name in preset_watcher.changed():
+        await hot_reload_preset(name, carry=WATCH_PRESETS != "fresh")
+
+def handle_tokens(cmd):
+    # Execute IMMEDIATELY when received
+    if access_client.is_verified and not session_expired:
+        tokens = [t.strip() for t in cmd.split(',') if t.strip()]
+        if session_recorder is not None:
+            session_recorder.record(cmd, dispatch_enqueued_at + PERF_EPOCH_OFFSET) # Only lines that passed the gate replay
+        if tokens:
+            print(f"G_ACTION:{','.join(tokens)}", flush=True)
+            backend_stage.submit((tokens, None))
+
+router = CommandRouter(default=handle_tokens)
+# Hot path first: landmark frames
+router.register(BINARY_PREFIX, handle_landmarks, name="RAW_LMB", hot=True)
+router.register(JSON_PREFIX, handle_landmarks, name="RAW_LM", hot=True)
+router.register(SHM_NOTIFY_LINE, handle_landmarks, name="RAW_LM_SHM", hot=True)
+# Control
+router.register("idle", handle_idle, exact=True)
+router.register("SET_PROFILE:", handle_set_profile)
+router.register("SET_SETTINGS:", handle_set_settings)
+router.register("LOAD_PRESET:", handle_load_preset)
+router.register("CMD:VERIFY:", handle_verify)
+router.register("CMD:DUMP_STATS", handle_dump_stats, exact=True)
+router.register("CMD:DUMP_STATS:", handle_dump_stats)
+router.register("CMD:DUMP_LATENCY", handle_dump_latency, exact=True)
+router.register("CMD:DUMP_LATENCY:", handle_dump_latency)
+router.register("CMD:RECORD_START", handle_record_start, exact=True)
+router.register("CMD:RECORD_START:", handle_record_start)
+router.register("CMD:RECORD_STOP", handle_record_stop, exact=True)
+router.register("CMD:RELOAD_PRESET:", handle_reload_preset)
+
+def register_preset_commands(modules=None):
+    # Preset-owned commands (optional `register_commands(router)` hook)
+    for preset_name, preset_mod in (modules or preset_modules).items():
+        if hasattr(preset_mod, 'register_commands'):
+            try:
+                preset_mod.register_commands(router)
+            except Exception as e:
+                print(f"[BRIDGE] Preset {preset_name} failed to register commands: {e}", flush=True)
+
+async def verify_session(jwt):
+    global demo_remaining, session_expired
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(None, access_client.verify_user, jwt)
+    except Exception as e:
+        print(f"VERIFY_ERROR: {e}", flush=True)
+        result = {}
+    if result.get('allowed'):
+        demo_remaining = float(result.get('demo_seconds') or 60.0)
+        session_expired = False
+        print(f"VERIFY_RESULT:ALLOWED|PLAN:{result.get('plan')}", flush=True)
+    else:
+        print("VERIFY_RESULT:DENIED", flush=True)
+
+async def dispatch_loop():
+    """Wakes only when input_queue has data; returns on stdin EOF"""
+    global dispatch_enqueued_at
+    while True:
+        await frame_ready.wait()
+        frame_ready.clear()
+        loop_stats.on_wake(True)
+
+        # Drain everything that arrived while we were busy
+        while True:
+            try:
+                item = input_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                return # stdin closed
+            enqueued_at, cmd = item
+            dispatch_enqueued_at = enqueued_at
+            loop_stats.on_dispatch(enqueued_at, cmd.startswith("RAW_LM"))
+            # Recorded in dispatch order, so a replay sees exactly what the presets saw
+            # (SHM frames and token lines are recorded by their handlers: frame copy / after the access gate)
+            if session_recorder is not None and cmd != SHM_NOTIFY_LINE and router.resolve(cmd)[0] is not handle_tokens:
+                session_recorder.record(cmd, enqueued_at + PERF_EPOCH_OFFSET)
+            router.dispatch(cmd)
+
+# ==========================================
+# PERIODIC JOBS
+# ==========================================
+async def run_periodic(interval, job):
+    """Runs job immediately and then every `interval` seconds (monotonic clock)"""
+    while True:
+        loop_stats.on_wake(False)
+        try:
+            await job()
+        except Exception as e:
+            print(f"[BRIDGE] Periodic job {job.__name__} failed: {e}", flush=True)
+        await asyncio.sleep(interval)
+
+async def broadcast_access_status():
+    # The backend is chosen once at startup (virtual controller when available), never overridden here
+    # TEKKEN_STATUS and STEAM_INPUT_STATUS logs removed as per user request
+
+    # PLAN STATUS BROADCAST
+    limits = await asyncio.get_running_loop().run_in_executor(None, access_client.get_session_limits)
+    if not limits['allowed']:
+         print("ACCESS_STATUS:LOCKED", flush=True)
+    elif limits['plan'] == 'FREE':
+         print(f"ACCESS_STATUS:FREE|DEMO_LEFT:{int(demo_remaining)}", flush=True)
+    else:
+         print("ACCESS_STATUS:PAID", flush=True)
+
+async def detect_processes():
+    # psutil scan can take tens of ms: keep it off the event loop
+    await asyncio.get_running_loop().run_in_executor(None, detect_steam_app)
+
+last_heartbeat_count = 0
+async def heartbeat():
+    global last_heartbeat_count
+    if lm_count != last_heartbeat_count:
+        last_heartbeat_count = lm_count
+        print(f"DEBUG: Bridge active | Backend={active_backend} | Count={lm_count}", flush=True)
+
+async def report_loop_stats():
+    if loop_stats.due(time.time()):
+        print(loop_stats.report(), flush=True)
+
+async def report_queue_stats():
+    # Backpressure report (only when frames were actually shed)
+    frames_in, coalesced, dropped, max_depth = input_queue.take_stats()
+    if coalesced or dropped:
+        print(f"QUEUE_STATS: Frames={frames_in} | Coalesced={coalesced} | Dropped={dropped} | MaxDepth={max_depth}", flush=True)
+
+async def report_pipeline_stats():
+    # Stage gauges, only for stages that coalesced / dropped reports since the last check
+    for stage in pipeline.shed():
+        print(stage.status(), flush=True)
+
+async def report_scheduler_stats():
+    # Quality level usage, only while frames are missing their deadline
+    if scheduler.degraded():
+        print(scheduler.status(), flush=True)
+
+# ==========================================
+# RUNTIME
+# ==========================================
+async def run_bridge():
+    global bridge_loop, frame_ready
+    bridge_loop = asyncio.get_running_loop()
+    frame_ready = asyncio.Event()
+    if not input_queue.empty():
+        frame_ready.set()
+
+    stdin_task = asyncio.ensure_future(read_input_async())
+    if LM_TRANSPORT == 'shm':
+        threading.Thread(target=read_shm_frames, daemon=True).start()
+
+    periodic = [
+        asyncio.ensure_future(run_periodic(ACCESS_STATUS_INTERVAL, broadcast_access_status)),
+        asyncio.ensure_future(run_periodic(PROCESS_DETECT_INTERVAL, detect_processes)),
+        asyncio.ensure_future(run_periodic(HEARTBEAT_INTERVAL, heartbeat)),
+        asyncio.ensure_future(run_periodic(LOOP_STATS_INTERVAL, report_loop_stats)),
+        asyncio.ensure_future(run_periodic(QUEUE_STATS_INTERVAL, report_queue_stats)),
+        asyncio.ensure_future(run_periodic(PIPELINE_STATS_INTERVAL, report_pipeline_stats)),
+        asyncio.ensure_future(run_periodic(SCHEDULER_STATS_INTERVAL, report_scheduler_stats)),
+    ]
+    if preset_watcher is not None:
+        periodic.append(asyncio.ensure_future(run_periodic(PRESET_WATCH_INTERVAL, watch_presets)))
+    try:
+        await dispatch_loop()
+    finally:
+        for task in periodic + [stdin_task]:
+            task.cancel()
+        await asyncio.gather(*periodic, stdin_task, return_exceptions=True)
 
 def main():
+    global running, xbox_adapter, access_client, preset_watcher
+    # All prints from here on are batched by a writer thread (never block the frame loop)
+    stdout_writer = output_writer.install()
+    timeline.mark("module_init")
+
+    # Join the parallel startup jobs
+    xbox_adapter = xbox_future.result()
+    access_client = access_future.result()
+    presets_future.result()
+    startup_pool.shutdown(wait=False)
+    timeline.mark("parallel_wait")
+    register_preset_commands()
+    if WATCH_PRESETS:
+        preset_watcher = PresetWatcher()
+
+    print(timeline.report(), flush=True)
     print("SRIKA_INPUT_BRIDGE_STARTED", flush=True)
     
     # IMMEDIATE CHECK: VIGEMBUS (Force Controller Creation)
@@ -280,129 +787,21 @@ def main():
     admin_status = 'TRUE' if ctypes.windll.shell32.IsUserAnAdmin() != 0 else 'FALSE'
     print(f"ADMIN_STATUS:{admin_status}", flush=True)
     
-    # Note: select_best_backend() might override this if Tekken not running?
-    # No, we want controller ALWAYS if available, per user request.
-    # So we skip select_best_backend() unless we need Steam Input.
-    
-    detect_steam_app() # Just to update PID log
-    
-    threading.Thread(target=read_input, daemon=True).start()
-    
-    global last_frame_time, demo_remaining, session_expired
-    last_command = "idle"
-    last_status_time = 0
+    # Controller ALWAYS if available, per user request (no automatic Steam Input selection).
+    # Process detection (PID log) runs as a periodic job in the runtime.
     
-    try:
-        while running:
-            current_time = time.time()
-            delta_time = current_time - last_frame_time
-            last_frame_time = current_time
-
-            # Refresh detection every 5 minutes (300 seconds)
-            if current_time - last_status_time > 300.0:
-                last_status_time = current_time
-                # DISABLED: We force Virtual Controller at startup, don't override it
-                # select_best_backend()
-                # BROADCAST STATUS
-                # TEKKEN_STATUS and STEAM_INPUT_STATUS logs removed as per user request
-                
-                # PLAN STATUS BROADCAST
-                limits = access_client.get_session_limits()
-                if not limits['allowed']:
-                     print("ACCESS_STATUS:LOCKED", flush=True)
-                elif limits['plan'] == 'FREE':
-                     print(f"ACCESS_STATUS:FREE|DEMO_LEFT:{int(demo_remaining)}", flush=True)
-                else:
-                     print("ACCESS_STATUS:PAID", flush=True)
+    if RECORD_SESSION:
+        start_recording(None if RECORD_SESSION == '1' else RECORD_SESSION)
 
-                # Logs removed
-                
-            while not input_queue.empty():
-                cmd = input_queue.get_nowait()
-                if cmd.lower() == "idle":
-                    execute_input([]) # Force release
-                elif cmd.startswith("SET_PROFILE:"):
-                    active_profile = cmd.replace("SET_PROFILE:", "").strip()
-                    print(f"[BRIDGE] Active Profile Sync: {active_profile}", flush=True)
-                elif cmd.startswith("SET_SETTINGS:"):
-                    try:
-                        import json
-                        payload = cmd.replace("SET_SETTINGS:", "").strip()
-                        new_settings = json.loads(payload)
-                        
-                        # Update active logic
-                        logic = logic_registry.get(active_profile)
-                        if not logic and "-official" in active_profile:
-                            logic = logic_registry.get(active_profile.replace("-official", ""))
-                        
-                        if logic:
-                            for k, v in new_settings.items():
-                                # Conversion: steerSensitivity -> STEER_SENSITIVITY
-                                attr_name = "".join([f"_{c.lower()}" if c.isupper() else c for c in k]).upper()
-                                if hasattr(logic, attr_name):
-                                    setattr(logic, attr_name, v)
-                                    print(f"[BRIDGE] Updated {attr_name} = {v}", flush=True)
-                                elif hasattr(logic, k):
-                                    setattr(logic, k, v)
-                                    print(f"[BRIDGE] Updated {k} = {v}", flush=True)
-                    except Exception as e:
-                        print(f"SET_SETTINGS_ERROR: {e}", flush=True)
-                elif cmd.startswith("RAW_LM:"):
-                    # DEBUG: Print every 100 frames to avoid spam
-                    if not hasattr(main, 'lm_count'): main.lm_count = 0
-                    main.lm_count += 1
-                    
-                    try:
-                        import json
-                        payload = json.loads(cmd[7:])
-                        pose_lm = payload.get('pose', [])
-                        hands_lm = payload.get('hands', [])
-                        handedness_lm = payload.get('handedness', [])
-                        
-                        # Route by Active Profile
-                        tokens = []
-                        logic = logic_registry.get(active_profile)
-                        if not logic:
-                            # Fallback chain for Beta
-                            logic = logic_registry.get("asphalt") or logic_registry.get("tekken")
-                            
-                        if logic:
-                            tokens = logic.process(pose_lm, hands_lm, handedness_lm)
-                            
-                        if tokens:
-                            # 1. ALWAYS Relay back to UI for "Recent Actions"
-                            print(f"G_ACTION:{','.join(tokens)}", flush=True)
-                            
-                            # 2. Execute via Active Backend
-                            execute_input(tokens)
-                        elif main.lm_count % 30 == 0:
-                             # Faster Heartbeat (1s at 30fps)
-                             print(f"DEBUG: Bridge active | Backend={active_backend} | Count={main.lm_count}", flush=True)
-                    except Exception as e:
-                        print(f"LOGIC_ERROR: {e}", flush=True)
-                elif cmd.startswith("CMD:VERIFY:"):
-                     # Handle Verification
-                     jwt = cmd.replace("CMD:VERIFY:", "").strip()
-                     result = access_client.verify_user(jwt)
-                     if result.get('allowed'):
-                         demo_remaining = float(result.get('demo_seconds') or 60.0)
-                         session_expired = False
-                         print(f"VERIFY_RESULT:ALLOWED|PLAN:{result.get('plan')}", flush=True)
-                     else:
-                         print("VERIFY_RESULT:DENIED", flush=True)
-                else:
-                    # Execute IMMEDIATELY when received
-                    if access_client.is_verified and not session_expired:
-                        tokens = [t.strip() for t in cmd.split(',') if t.strip()]
-                        if tokens:
-                            print(f"G_ACTION:{','.join(tokens)}", flush=True)
-                            execute_input(tokens)
-                
-            time.sleep(0.005) # Faster loop for responsiveness
-            
+    try:
+        asyncio.run(run_bridge())
     except KeyboardInterrupt: pass
     finally:
+        running = False
+        pipeline.close() # Sends what is still queued
+        stop_recording()
         print("BRIDGE_STOPPED", flush=True)
+        output_writer.uninstall(stdout_writer)
 
 if __name__ == "__main__":
     main()
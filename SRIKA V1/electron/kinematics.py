@@ -0,0 +1,250 @@
+"""
+SRIKA Kinematics
+Shared motion stage for presets: filtered velocity and acceleration of
+every pose joint (x, y, z), updated in one vectorized step per frame.
+
+- KinematicsEngine keeps fixed-size circular histories (no list trimming)
+  of velocity and acceleration for all joints.
+- Presets subscribe to the channels (joint, axis) and window they need;
+  each subscription keeps a sliding-window min / max that is O(1)
+  amortized per frame and O(1) to query, whatever the window length.
+
+    engine = KinematicsEngine(smoothing=(0.3, 0.3, 0.4))
+    punches = engine.subscribe([15, 16], [Z, Z], window=3)
+    ...
+    engine.update(frame.pose, dt)
+    peak_l, peak_r = punches.min().tolist()
+
+FrameTimer turns camera capture timestamps into dt, so queueing delays and
+frames delivered in bursts do not distort velocities. Frames that are not
+newer than the previous one are dropped. After a long gap the motion state
+restarts instead of reading the whole gap as one movement.
+"""
+
+import time
+
+import numpy as np
+
+from landmark_protocol import POSE_POINTS
+
+AXES = 3 # x, y, z
+QUANTITIES = ('velocity', 'acceleration')
+
+# FrameTimer results
+FRAME_OK = 'ok'       # dt to the previous frame is usable
+FRAME_STALE = 'stale' # Captured at or before the previous frame: drop it
+FRAME_GAP = 'gap'     # First frame, or too long since the previous one: restart motion state
+MAX_FRAME_GAP = 0.25  # Seconds without frames before velocities are reset
+
+
+class FrameTimer:
+    """dt between consecutive frames, from capture timestamps (wall clock when a frame has none)"""
+
+    def __init__(self, fallback_dt=0.016, max_gap=MAX_FRAME_GAP):
+        self.fallback_dt = fallback_dt
+        self.max_gap = max_gap
+        self.last = None
+        self.stale = 0
+        self.gaps = 0
+
+    def reset(self):
+        self.last = None
+
+    def step(self, capture_ts=0.0, clock=time.time):
+        """Returns (status, now, dt) for the next frame"""
+        if capture_ts:
+            now = capture_ts
+            if self.last is not None and now <= self.last:
+                self.stale += 1
+                return FRAME_STALE, now, 0.0
+        else:
+            now = clock()
+        last, self.last = self.last, now
+        if last is None:
+            return FRAME_GAP, now, self.fallback_dt
+        dt = now - last
+        if dt > self.max_gap:
+            self.gaps += 1
+            return FRAME_GAP, now, self.fallback_dt
+        if dt <= 0: dt = self.fallback_dt # Wall clock resolution
+        return FRAME_OK, now, dt
+
+
+class WindowedExtrema:
+    """
+    Sliding-window min / max over the last `window` pushed rows of C channels.
+    Two-stack queue: pushes fold into a running min / max, and every `window`
+    pops the back stack is turned into suffix extrema in one vectorized pass.
+    """
+    __slots__ = ('window', '_back', '_back_n', '_back_min', '_back_max',
+                 '_front_min', '_front_max', '_front_pos', '_front_n')
+
+    def __init__(self, window, channels):
+        self.window = max(1, int(window))
+        self._back = np.zeros((self.window, channels))
+        self._back_min = np.zeros(channels)
+        self._back_max = np.zeros(channels)
+        self._front_min = np.zeros((self.window, channels))
+        self._front_max = np.zeros((self.window, channels))
+        self.clear()
+
+    def clear(self):
+        self._back_n = 0
+        self._front_pos = 0
+        self._front_n = 0
+
+    def __len__(self):
+        return self._back_n + self._front_n
+
+    def push(self, values):
+        if self._back_n + self._front_n == self.window:
+            self._pop()
+        if self._back_n:
+            np.minimum(self._back_min, values, out=self._back_min)
+            np.maximum(self._back_max, values, out=self._back_max)
+        else:
+            self._back_min[:] = values
+            self._back_max[:] = values
+        self._back[self._back_n] = values
+        self._back_n += 1
+
+    def _pop(self):
+        if not self._front_n:
+            # Oldest row first: suffix extrema cover it and everything newer in the batch
+            n = self._back_n
+            rows = self._back[n - 1::-1]
+            self._front_min[:n] = np.minimum.accumulate(rows, axis=0)[::-1]
+            self._front_max[:n] = np.maximum.accumulate(rows, axis=0)[::-1]
+            self._front_pos, self._front_n, self._back_n = 0, n, 0
+        self._front_pos += 1
+        self._front_n -= 1
+
+    def min(self):
+        if not self._front_n:
+            return self._back_min.copy()
+        front = self._front_min[self._front_pos]
+        return np.minimum(front, self._back_min) if self._back_n else front.copy()
+
+    def max(self):
+        if not self._front_n:
+            return self._back_max.copy()
+        front = self._front_max[self._front_pos]
+        return np.maximum(front, self._back_max) if self._back_n else front.copy()
+
+    def peak(self):
+        """Signed extreme: whichever of min / max has the larger magnitude"""
+        lo, hi = self.min(), self.max()
+        return np.where(np.abs(lo) > np.abs(hi), lo, hi)
+
+
+class Subscription:
+    """A preset's view of some (joint, axis) channels over a sliding window"""
+
+    def __init__(self, joints, axes, window, quantity='velocity'):
+        if quantity not in QUANTITIES:
+            raise ValueError(f"Unknown quantity {quantity!r}")
+        self.joints = np.asarray(joints, dtype=np.intp)
+        self.axes = np.broadcast_to(np.asarray(axes, dtype=np.intp), self.joints.shape).copy()
+        self.quantity = quantity
+        self.extrema = WindowedExtrema(window, len(self.joints))
+        self.latest = np.zeros(len(self.joints))
+
+    @property
+    def window(self):
+        return self.extrema.window
+
+    def __len__(self):
+        return len(self.extrema)
+
+    def _push(self, values):
+        self.latest = values[self.joints, self.axes]
+        self.extrema.push(self.latest)
+
+    def min(self):
+        return self.extrema.min()
+
+    def max(self):
+        return self.extrema.max()
+
+    def peak(self):
+        return self.extrema.peak()
+
+
+class KinematicsEngine:
+    """
+    Filtered per-joint velocity / acceleration (units per second).
+    smoothing: EMA weight of the new sample; scalar, per axis (3,) or per channel (joints, 3).
+    """
+
+    def __init__(self, smoothing=0.3, accel_smoothing=None, history=8, joints=POSE_POINTS, track_acceleration=True):
+        shape = (joints, AXES)
+        self.alpha = np.broadcast_to(np.asarray(smoothing, dtype=np.float64), shape).copy()
+        self.keep = 1 - self.alpha
+        accel_alpha = self.alpha if accel_smoothing is None else np.broadcast_to(
+            np.asarray(accel_smoothing, dtype=np.float64), shape)
+        self.accel_alpha = np.array(accel_alpha)
+        self.accel_keep = 1 - self.accel_alpha
+        self.track_acceleration = track_acceleration
+
+        self.velocity = np.zeros(shape)
+        self.acceleration = np.zeros(shape)
+        self.velocity_history = np.zeros((history, joints, AXES))
+        self.acceleration_history = np.zeros((history, joints, AXES))
+        self.subscriptions = []
+        self.reset()
+
+    def reset(self):
+        """Forget motion (e.g. after the player left the frame)"""
+        self.prev = None
+        self.velocity[:] = 0.0
+        self.acceleration[:] = 0.0
+        self.count = 0 # Velocity samples written to the history
+        self.pos = 0   # Next history slot
+        for sub in self.subscriptions:
+            sub.extrema.clear()
+
+    @property
+    def primed(self):
+        return self.prev is not None
+
+    def subscribe(self, joints, axes, window=3, quantity='velocity'):
+        """Registers interest in (joint, axis) channels; returns the Subscription to query"""
+        if quantity == 'acceleration' and not self.track_acceleration:
+            raise ValueError("Engine created with track_acceleration=False")
+        sub = Subscription(joints, axes, window, quantity)
+        self.subscriptions.append(sub)
+        return sub
+
+    def prime(self, pose):
+        """Sets the reference pose without producing a velocity sample"""
+        self.prev = pose[:, :AXES]
+
+    def update(self, pose, dt):
+        """Advances one frame; pose is (joints, >=3), dt in seconds (> 0)"""
+        cur = pose[:, :AXES]
+        if self.prev is None:
+            self.prev = cur
+            return False
+        raw = (cur - self.prev) / dt
+        self.prev = cur
+
+        prev_velocity = self.velocity
+        self.velocity = prev_velocity * self.keep + raw * self.alpha
+        self.velocity_history[self.pos] = self.velocity
+        if self.track_acceleration:
+            raw_accel = (self.velocity - prev_velocity) / dt
+            self.acceleration = self.acceleration * self.accel_keep + raw_accel * self.accel_alpha
+            self.acceleration_history[self.pos] = self.acceleration
+        self.pos = (self.pos + 1) % len(self.velocity_history)
+        self.count = min(self.count + 1, len(self.velocity_history))
+
+        for sub in self.subscriptions:
+            sub._push(self.velocity if sub.quantity == 'velocity' else self.acceleration)
+        return True
+
+    def history(self, n=None, quantity='velocity'):
+        """Last n samples, oldest first: (n, joints, 3)"""
+        ring = self.velocity_history if quantity == 'velocity' else self.acceleration_history
+        n = self.count if n is None else min(n, self.count)
+        idx = (self.pos - n + np.arange(n)) % len(ring)
+        return ring[idx]
@@ -0,0 +1,265 @@
+"""
+SRIKA Landmark Filter
+Adaptive low-latency smoothing of every pose and hand landmark (x, y, z),
+run on the whole frame as array operations before the preset sees it.
+
+Filters (per coordinate, all landmarks at once):
+    one_euro : One Euro filter - cutoff rises with joint speed, so a still
+               body is smoothed hard while fast strikes pass with little lag
+    kalman   : constant-velocity Kalman filter
+
+Presets opt in with a LANDMARK_FILTER dict on their ControllerLogic, e.g.
+    self.LANDMARK_FILTER = {'type': 'one_euro', 'min_cutoff': 1.0, 'beta': 20.0}
+(None / missing = raw landmarks). The dict is re-read every frame, so
+SET_SETTINGS can retune it live.
+
+Hands keep their filter state per handedness label, so a hand that drops
+out or swaps list position does not inherit the other hand's history.
+Timing comes from capture timestamps (kinematics.FrameTimer); after a gap
+the filter restarts from the raw landmarks.
+
+filter_session() filters a whole preset_batch.BatchSession for process_batch().
+"""
+
+import math
+import time
+import weakref
+
+import numpy as np
+
+from landmark_protocol import POSE_POINTS, HAND_POINTS, MAX_HANDS
+from landmark_frame import LandmarkFrame
+from kinematics import FrameTimer, FRAME_STALE, FRAME_GAP
+from hand_features import hand_slots, session_slots
+from preset_batch import BatchSession
+
+AXES = 3
+ROWS = POSE_POINTS + MAX_HANDS * HAND_POINTS # Pose rows, then one 21-row block per hand slot
+
+FILTER_DEFAULTS = {
+    'one_euro': {'min_cutoff': 1.0, 'beta': 20.0, 'd_cutoff': 5.0},
+    'kalman': {'process_noise': 5.0, 'measurement_noise': 1.6e-5},
+}
+
+
+def smoothing_alpha(cutoff, dt):
+    """EMA weight of a first-order low-pass with the given cutoff (Hz)"""
+    tau = 1.0 / (2 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """Vectorized One Euro filter over (rows, 3); every coordinate adapts to its own speed"""
+
+    def __init__(self, rows=ROWS, min_cutoff=1.0, beta=1.0, d_cutoff=1.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x = np.zeros((rows, AXES))
+        self.dx = np.zeros((rows, AXES))
+        self.ready = np.zeros(rows, dtype=bool)
+        self._delta = np.zeros((rows, AXES))
+        self._step = np.zeros((rows, AXES))
+
+    def reset(self):
+        self.ready[:] = False
+
+    def __call__(self, z, dt, present):
+        """Filters measurement z (rows, 3); rows where `present` is False are forgotten"""
+        fresh = present & ~self.ready
+        delta, step = self._delta, self._step
+        np.subtract(z, self.x, out=delta)
+        # Derivative low-pass: dx += a_d * (delta / dt - dx)
+        np.multiply(delta, 1.0 / dt, out=step)
+        step -= self.dx
+        step *= smoothing_alpha(self.d_cutoff, dt)
+        self.dx += step
+        # Cutoff = min_cutoff + beta * |dx| per coordinate; alpha = rate / (1 + rate) as in smoothing_alpha
+        rate = np.abs(self.dx, out=step)
+        rate *= 2 * math.pi * dt * self.beta
+        rate += 2 * math.pi * dt * self.min_cutoff
+        delta *= rate
+        rate += 1.0
+        delta /= rate
+        self.x += delta
+        if fresh.any():
+            self.x[fresh] = z[fresh]
+            self.dx[fresh] = 0.0
+        self.ready = present
+        return self.x
+
+
+class KalmanFilter:
+    """Vectorized constant-velocity Kalman filter, one independent (position, velocity) state per coordinate"""
+
+    def __init__(self, rows=ROWS, process_noise=50.0, measurement_noise=1e-5):
+        self.q = process_noise
+        self.r = measurement_noise
+        shape = (rows, AXES)
+        self.x = np.zeros(shape)
+        self.v = np.zeros(shape)
+        self.p00 = np.zeros(shape)
+        self.p01 = np.zeros(shape)
+        self.p11 = np.zeros(shape)
+        self.ready = np.zeros(rows, dtype=bool)
+
+    def reset(self):
+        self.ready[:] = False
+
+    def __call__(self, z, dt, present):
+        fresh = present & ~self.ready
+        q = self.q
+        # Predict
+        self.x += self.v * dt
+        self.p00 += dt * (2 * self.p01 + dt * self.p11) + q * dt ** 3 / 3
+        self.p01 += dt * self.p11 + q * dt ** 2 / 2
+        self.p11 += q * dt
+        # Update
+        s = self.p00 + self.r
+        k0 = self.p00 / s
+        k1 = self.p01 / s
+        innovation = z - self.x
+        self.x += k0 * innovation
+        self.v += k1 * innovation
+        self.p11 -= k1 * self.p01
+        self.p00 *= 1 - k0
+        self.p01 *= 1 - k0
+        if fresh.any():
+            self.x[fresh] = z[fresh]
+            self.v[fresh] = 0.0
+            self.p00[fresh] = self.r
+            self.p01[fresh] = 0.0
+            self.p11[fresh] = q * dt
+        self.ready = present
+        return self.x
+
+
+FILTERS = {'one_euro': OneEuroFilter, 'kalman': KalmanFilter}
+
+def make_filter(config):
+    """LANDMARK_FILTER dict -> filter instance (unknown keys are ignored)"""
+    kind = config.get('type', 'one_euro')
+    if kind not in FILTERS:
+        raise ValueError(f"Unknown landmark filter {kind!r}")
+    params = dict(FILTER_DEFAULTS[kind])
+    params.update({k: v for k, v in config.items() if k in params})
+    return FILTERS[kind](**params)
+
+
+class LandmarkFilterStage:
+    """Applies one preset's landmark filter to successive LandmarkFrames"""
+
+    def __init__(self, config, fallback_dt=0.016, max_gap=0.25):
+        self.config = dict(config)
+        self.filter = make_filter(self.config)
+        self.timer = FrameTimer(fallback_dt, max_gap)
+        self._z = np.zeros((ROWS, AXES))
+        self._present = np.zeros(ROWS, dtype=bool)
+        self.frames = 0
+        self.resets = 0
+
+    def _step(self, capture_ts, clock):
+        """dt for the next frame, None when it is stale"""
+        status, _, dt = self.timer.step(capture_ts, clock)
+        if status == FRAME_STALE:
+            return None
+        if status == FRAME_GAP:
+            self.filter.reset()
+            self.resets += 1
+        return dt
+
+    def _gather(self, frame):
+        """Copies the frame's pose + hand slots into the measurement block"""
+        z, present = self._z, self._present
+        has_pose = frame.has_pose
+        if has_pose:
+            z[:POSE_POINTS] = frame.pose[:, :AXES]
+            present[:POSE_POINTS] = True
+        slots = [(i, slot) for i, slot in enumerate(hand_slots(frame.handedness, frame.hands)) if slot is not None]
+        for i, slot in slots:
+            start = POSE_POINTS + slot * HAND_POINTS
+            z[start:start + HAND_POINTS] = frame.hands[i, :, :AXES]
+            present[start:start + HAND_POINTS] = True
+        return has_pose, slots
+
+    def _scatter(self, frame, out, has_pose, slots):
+        """Filtered copy of the frame from the filter output"""
+        pose = frame.pose
+        if has_pose:
+            pose = frame.pose.copy()
+            pose[:, :AXES] = out[:POSE_POINTS]
+        hands = frame.hands
+        if slots:
+            hands = frame.hands.copy()
+            for i, slot in slots:
+                start = POSE_POINTS + slot * HAND_POINTS
+                hands[i, :, :AXES] = out[start:start + HAND_POINTS]
+        return LandmarkFrame(pose, hands, frame.handedness, frame.frame_id, frame.capture_ts)
+
+    def apply(self, frame, clock=time.time):
+        """Returns a filtered copy of frame (the input frame is not modified)"""
+        dt = self._step(frame.capture_ts, clock)
+        if dt is None:
+            return frame # Out of order: leave it (and the filter state) alone
+
+        self._present[:] = False
+        gathered = self._gather(frame)
+        out = self.filter(self._z, dt, self._present.copy())
+        self.frames += 1
+        return self._scatter(frame, out, *gathered)
+
+
+# Stages per ControllerLogic instance (a reloaded preset gets a fresh stage)
+_stages = weakref.WeakKeyDictionary()
+
+def filter_frame(logic, frame):
+    """Runs the preset's LANDMARK_FILTER over frame; returns frame unchanged when it has none"""
+    config = getattr(logic, 'LANDMARK_FILTER', None)
+    if not config:
+        return frame
+    stage = _stages.get(logic)
+    if stage is None or stage.config != config:
+        stage = _stages[logic] = LandmarkFilterStage(config, getattr(logic, 'DT_FALLBACK', 0.016))
+    # Frames without a capture timestamp are timed on the preset's clock (the replay clock in tooling)
+    return stage.apply(frame, getattr(logic, 'clock', time.time))
+
+def filter_session(logic, session):
+    """
+    filter_frame() over a whole preset_batch.BatchSession (fresh filter state,
+    the live stage untouched): the landmarks the streaming process_frame()
+    sees, for process_batch(). Returns the session itself when the preset has
+    no filter. Gathering and scattering are array operations over the session;
+    the filter itself steps frame by frame (each step depends on the last).
+    """
+    config = getattr(logic, 'LANDMARK_FILTER', None)
+    n = len(session)
+    if not config or not n:
+        return session
+    stage = LandmarkFilterStage(config, getattr(logic, 'DT_FALLBACK', 0.016))
+
+    # Measurements of every frame: pose rows, then each listed hand in its slot's block
+    z = np.zeros((n, ROWS, AXES))
+    present = np.zeros((n, ROWS), dtype=bool)
+    z[:, :POSE_POINTS] = session.poses[..., :AXES]
+    present[:, :POSE_POINTS] = session.has_pose[:, None]
+    slots = session_slots(session.hands, session.hand_counts, session.right_hands)
+    frames, listed = np.nonzero(np.arange(slots.shape[1]) < session.hand_counts[:, None])
+    rows = POSE_POINTS + slots[frames, listed][:, None] * HAND_POINTS + np.arange(HAND_POINTS)
+    z[frames[:, None], rows] = session.hands[frames, listed, :, :AXES]
+    present[frames[:, None], rows] = True
+
+    out = z.copy()
+    filtered = np.zeros(n, dtype=bool) # Out-of-order frames keep their raw landmarks
+    for i, stamp in enumerate(session.timestamps.tolist()):
+        dt = stage._step(stamp, lambda: stamp)
+        if dt is not None:
+            out[i] = stage.filter(z[i], dt, present[i])
+            filtered[i] = True
+
+    poses = session.poses.copy()
+    posed = filtered & session.has_pose
+    poses[posed, :, :AXES] = out[posed, :POSE_POINTS]
+    hands = session.hands.copy()
+    keep = filtered[frames]
+    hands[frames[keep], listed[keep], :, :AXES] = out[frames[keep][:, None], rows[keep]]
+    return BatchSession(poses, hands, session.hand_counts, session.timestamps, session.right_hands, session.has_pose)
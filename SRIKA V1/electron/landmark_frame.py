@@ -0,0 +1,237 @@
+"""
+SRIKA Landmark Frame
+Array-backed landmark container shared by all presets.
+
+Pose and hands are stored as contiguous float32 NumPy arrays of shape
+(points, 4) with columns x, y, z, visibility. Joints can be addressed by
+MediaPipe name or index.
+
+Geometry comes in two flavours:
+- joint_distances / joint_angles: a few joints of one frame, plain float
+  math on the gathered rows (a NumPy call costs more than the arithmetic
+  of a handful of joints)
+- distances / angles: vectorized over many frames at once
+  (process_batch), where one call replaces a Python loop
+"""
+
+import math
+
+import numpy as np
+
+from landmark_protocol import FIELDS, HAND_POINTS
+
+X, Y, Z, VIS = 0, 1, 2, 3
+
+# MediaPipe Pose landmark names
+POSE_JOINTS = {
+    'nose': 0,
+    'left_eye_inner': 1, 'left_eye': 2, 'left_eye_outer': 3,
+    'right_eye_inner': 4, 'right_eye': 5, 'right_eye_outer': 6,
+    'left_ear': 7, 'right_ear': 8,
+    'mouth_left': 9, 'mouth_right': 10,
+    'left_shoulder': 11, 'right_shoulder': 12,
+    'left_elbow': 13, 'right_elbow': 14,
+    'left_wrist': 15, 'right_wrist': 16,
+    'left_pinky': 17, 'right_pinky': 18,
+    'left_index': 19, 'right_index': 20,
+    'left_thumb': 21, 'right_thumb': 22,
+    'left_hip': 23, 'right_hip': 24,
+    'left_knee': 25, 'right_knee': 26,
+    'left_ankle': 27, 'right_ankle': 28,
+    'left_heel': 29, 'right_heel': 30,
+    'left_foot_index': 31, 'right_foot_index': 32,
+}
+
+# MediaPipe Hands landmark names
+HAND_JOINTS = {
+    'wrist': 0,
+    'thumb_cmc': 1, 'thumb_mcp': 2, 'thumb_ip': 3, 'thumb_tip': 4,
+    'index_mcp': 5, 'index_pip': 6, 'index_dip': 7, 'index_tip': 8,
+    'middle_mcp': 9, 'middle_pip': 10, 'middle_dip': 11, 'middle_tip': 12,
+    'ring_mcp': 13, 'ring_pip': 14, 'ring_dip': 15, 'ring_tip': 16,
+    'pinky_mcp': 17, 'pinky_pip': 18, 'pinky_dip': 19, 'pinky_tip': 20,
+}
+
+_EMPTY_POSE = np.zeros((0, FIELDS), dtype=np.float32)
+_NO_HANDS = np.zeros((0, HAND_POINTS, FIELDS), dtype=np.float32)
+
+
+def joint_index(name, table=POSE_JOINTS):
+    """Resolves a joint name (or passes an index through)"""
+    return table[name] if isinstance(name, str) else name
+
+def joint_indices(names, table=POSE_JOINTS):
+    return np.array([joint_index(n, table) for n in names], dtype=np.intp)
+
+
+# ==========================================
+# SCALAR GEOMETRY (a few joints of one frame)
+# ==========================================
+def joint_distances(pose, a, b, dims=2):
+    """Distances between joints a[i] and b[i] of one (points, 4) pose, as floats"""
+    out = []
+    for i, j in zip(a, b):
+        if dims == 2:
+            (px, py), (qx, qy) = pose[i, :2].tolist(), pose[j, :2].tolist()
+            out.append(math.hypot(px - qx, py - qy))
+        else:
+            (px, py, pz), (qx, qy, qz) = pose[i, :3].tolist(), pose[j, :3].tolist()
+            out.append(math.sqrt((px - qx) ** 2 + (py - qy) ** 2 + (pz - qz) ** 2))
+    return out
+
+def joint_angles(pose, a, b, c):
+    """Angles a[i]-b[i]-c[i] in degrees (3D) of one pose, as floats; 0 where a segment is degenerate"""
+    out = []
+    for i, j, k in zip(a, b, c):
+        (ax, ay, az), (bx, by, bz), (cx, cy, cz) = pose[i, :3].tolist(), pose[j, :3].tolist(), pose[k, :3].tolist()
+        x1, y1, z1 = ax - bx, ay - by, az - bz
+        x2, y2, z2 = cx - bx, cy - by, cz - bz
+        mag = math.sqrt((x1 * x1 + y1 * y1 + z1 * z1) * (x2 * x2 + y2 * y2 + z2 * z2))
+        out.append(math.degrees(math.acos(max(-1.0, min(1.0, (x1 * x2 + y1 * y2 + z1 * z2) / mag)))) if mag > 0 else 0.0)
+    return out
+
+
+# ==========================================
+# VECTORIZED GEOMETRY (points are (..., >=2) arrays: many frames / players)
+# ==========================================
+def distances(a, b, dims=2):
+    """Euclidean distance between matching rows of a and b (x/y, or x/y/z with dims=3)"""
+    dx = a[..., X] - b[..., X]
+    dy = a[..., Y] - b[..., Y]
+    if dims == 2:
+        return np.hypot(dx, dy)
+    dz = a[..., Z] - b[..., Z]
+    return np.sqrt(dx * dx + dy * dy + dz * dz)
+
+def angles(a, b, c):
+    """Angle ABC in degrees (3D) for matching rows; 0 where a segment is degenerate"""
+    v1 = a[..., :3] - b[..., :3]
+    v2 = c[..., :3] - b[..., :3]
+    x1, y1, z1 = v1[..., X], v1[..., Y], v1[..., Z]
+    x2, y2, z2 = v2[..., X], v2[..., Y], v2[..., Z]
+    dot = x1 * x2 + y1 * y2 + z1 * z2
+    mag = np.sqrt((x1 * x1 + y1 * y1 + z1 * z1) * (x2 * x2 + y2 * y2 + z2 * z2))
+    cos = np.clip(dot / np.maximum(mag, 1e-12), -1.0, 1.0)
+    return np.degrees(np.arccos(cos)) * (mag > 0)
+
+
+def _points_array(points, with_visibility=True):
+    """List of {'x','y','z'[,'visibility']} dicts -> (n, 4) float32"""
+    if not points:
+        return _EMPTY_POSE
+    flat = []
+    if with_visibility:
+        for p in points:
+            flat += (p['x'], p['y'], p['z'], p.get('visibility') or 0.0)
+    else:
+        for p in points:
+            flat += (p['x'], p['y'], p['z'], 0.0)
+    return np.array(flat, dtype=np.float32).reshape(-1, FIELDS)
+
+def _label_of(h):
+    if isinstance(h, dict):
+        return h.get('label') or h.get('categoryName') or 'Left'
+    return str(h)
+
+
+class LandmarkFrame:
+    """
+    One frame of pose + hand landmarks.
+    - pose       : (33, 4) float32 (may be empty when no body was detected)
+    - hands      : (hands, 21, 4) float32 (iterate for per-hand (21, 4) views)
+    - handedness : list of 'Left' / 'Right' labels matching hands
+    """
+    __slots__ = ('pose', 'hands', 'handedness', 'frame_id', 'capture_ts')
+
+    def __init__(self, pose=None, hands=None, handedness=None, frame_id=0, capture_ts=0.0):
+        self.pose = pose if pose is not None else _EMPTY_POSE
+        self.hands = hands if hands is not None else _NO_HANDS
+        self.handedness = handedness if handedness is not None else []
+        self.frame_id = frame_id
+        self.capture_ts = capture_ts
+
+    @classmethod
+    def from_packet(cls, packet):
+        """
+        Wraps a decoded LandmarkPacket without building any dicts.
+        The pose array is shared with the packet, which owns its own copy of the frame.
+        """
+        pose = np.asarray(packet.pose, dtype=np.float32).reshape(-1, FIELDS)
+        hands = np.array(packet.hands, dtype=np.float32).reshape(-1, HAND_POINTS, FIELDS) if len(packet.hands) else _NO_HANDS
+        return cls(pose, hands, list(packet.handedness), packet.frame_id, packet.capture_ts)
+
+    @classmethod
+    def from_player_packet(cls, packet):
+        """One frame per player of a multi-player packet (no pose while out of view); each player gets the hands they own"""
+        poses = np.asarray(packet.pose, dtype=np.float32).reshape(packet.players, -1, FIELDS)
+        hands = np.array(packet.hands, dtype=np.float32).reshape(-1, HAND_POINTS, FIELDS) if len(packet.hands) else _NO_HANDS
+        owners = packet.hand_players
+        frames = []
+        for player, pose in enumerate(poses):
+            own = [i for i, owner in enumerate(owners) if owner == player]
+            frames.append(cls(pose if pose.any() else _EMPTY_POSE, hands[own] if own else _NO_HANDS, [packet.handedness[i] for i in own],
+                              packet.frame_id, packet.capture_ts))
+        return frames
+
+    @classmethod
+    def from_dicts(cls, pose_lm, hands_lm=(), handedness_lm=(), frame_id=0, capture_ts=0.0):
+        """Builds a frame from the legacy RAW_LM dict lists"""
+        hands = np.stack([_points_array(h, with_visibility=False) for h in hands_lm]) if hands_lm else _NO_HANDS
+        handedness = [_label_of(h) for h in (handedness_lm or [])]
+        return cls(_points_array(pose_lm), hands, handedness, frame_id, capture_ts)
+
+    # --- Accessors ---
+    @property
+    def has_pose(self):
+        return len(self.pose) > 0
+
+    @property
+    def hand_count(self):
+        return len(self.hands)
+
+    def joint(self, name):
+        """(4,) row for a pose joint (name or index)"""
+        return self.pose[joint_index(name)]
+
+    def joints(self, names):
+        """(n, 4) rows for several pose joints"""
+        return self.pose[joint_indices(names)]
+
+    def hand(self, label):
+        """First hand with the given handedness label, or None"""
+        for h, lab in zip(self.hands, self.handedness):
+            if lab == label:
+                return h
+        return None
+
+    # --- Geometry (pose) ---
+    def distance(self, a, b, dims=2):
+        """Distance between two pose joints (names or indices)"""
+        return joint_distances(self.pose, (joint_index(a),), (joint_index(b),), dims)[0]
+
+    def angle(self, a, b, c):
+        """Angle ABC in degrees between pose joints (names or indices)"""
+        return joint_angles(self.pose, (joint_index(a),), (joint_index(b),), (joint_index(c),))[0]
+
+    def velocity(self, prev, dt, joints=None):
+        """(pose - prev.pose) / dt for the selected joints (all joints when None)"""
+        if joints is None:
+            return (self.pose - prev.pose) / dt
+        idx = self._idx(joints)
+        return (self.pose[idx] - prev.pose[idx]) / dt
+
+    @staticmethod
+    def _idx(j):
+        if isinstance(j, (str, int, np.integer)):
+            return joint_index(j)
+        if isinstance(j, np.ndarray):
+            return j
+        return joint_indices(j)
+
+    # --- Legacy ---
+    def to_dicts(self):
+        """Returns (pose_lm, hands_lm, handedness_lm) in the RAW_LM JSON shape"""
+        pose_lm = [{'x': x, 'y': y, 'z': z, 'visibility': v} for x, y, z, v in self.pose.tolist()]
+        hands_lm = [[{'x': x, 'y': y, 'z': z} for x, y, z, _ in h.tolist()] for h in self.hands]
+        handedness_lm = [{'index': i, 'label': label} for i, label in enumerate(self.handedness)]
+        return pose_lm, hands_lm, handedness_lm
@@ -0,0 +1,273 @@
+"""
+SRIKA Landmark Frame Protocol
+Versioned binary encoding for landmark frames (Renderer -> Bridge).
+
+Wire format (little endian), sent over stdin as `RAW_LMB:<base64>`:
+    header  : magic 'SL' | version u8 | flags u8 | frame_id u32 | capture_ts f64
+              | pose_count u8 | hand_count u8 | handedness u8 | reserved u8
+    payload : pose_count x (x, y, z, visibility) float32
+              hand_count x 21 x (x, y, z, visibility) float32
+
+`handedness` is a bitmask: bit i set = hand i is labelled 'Right'.
+The legacy `RAW_LM:{json}` line format is still accepted as a fallback.
+
+Multi-player frames (couch versus) set FLAG_PLAYERS; the reserved byte is
+then the player count and the layout becomes
+    payload : players x pose_count x (x, y, z, visibility) float32
+              hand_count x 21 x (x, y, z, visibility) float32
+              hand_count x player u8 (owner of each hand)
+with up to MAX_HANDS hands per player. Skeleton i is player i: the producer
+keeps the order stable (e.g. left to right in the image) and sends a player
+who is out of view as an all-zero skeleton. Frames without the flag are
+unchanged. The renderer tracks one person and never sets the flag; Python
+producers build these frames with encode_players_frame().
+"""
+
+import json
+import struct
+import binascii
+from array import array
+
+PROTOCOL_VERSION = 1
+MAGIC = b'SL'
+
+HEADER = struct.Struct('<2sBBIdBBBB')
+FIELDS = 4 # x, y, z, visibility
+POSE_POINTS = 33
+HAND_POINTS = 21
+MAX_HANDS = 2
+MAX_PLAYERS = 4 # handedness mask has 8 bits: MAX_HANDS per player
+
+FLAG_PLAYERS = 0x01
+
+BINARY_PREFIX = 'RAW_LMB:'
+JSON_PREFIX = 'RAW_LM:'
+SHM_NOTIFY_LINE = 'RAW_LM_SHM' # Internal marker: newest frame is waiting in the shared-memory ring
+
+
+class ProtocolError(ValueError):
+    """Raised when a landmark frame cannot be decoded"""
+
+
+class LandmarkPacket:
+    """
+    Decoded landmark frame. Coordinates stay in flat float32 buffers,
+    dicts are only built on demand for presets that still expect them.
+    """
+    __slots__ = ('version', 'frame_id', 'capture_ts', 'pose', 'hands', 'handedness', 'players', 'hand_players')
+
+    def __init__(self, frame_id=0, capture_ts=0.0, pose=None, hands=None, handedness=None, version=PROTOCOL_VERSION,
+                 players=1, hand_players=None):
+        self.version = version
+        self.frame_id = frame_id
+        self.capture_ts = capture_ts
+        self.pose = pose if pose is not None else array('f') # Every player's skeleton, back to back
+        self.hands = hands if hands is not None else []
+        self.handedness = handedness if handedness is not None else []
+        self.players = players
+        self.hand_players = hand_players if hand_players is not None else [0] * len(self.hands)
+
+    @property
+    def pose_count(self):
+        """Points per skeleton"""
+        return len(self.pose) // (FIELDS * self.players)
+
+    @property
+    def multiplayer(self):
+        return self.players > 1
+
+    def _own_hands(self):
+        """Indices of player 0's hands"""
+        return [i for i, owner in enumerate(self.hand_players) if owner == 0]
+
+    def pose_dicts(self):
+        p = self.pose.tolist()
+        return [
+            {'x': p[i], 'y': p[i + 1], 'z': p[i + 2], 'visibility': p[i + 3]}
+            for i in range(0, self.pose_count * FIELDS, FIELDS)
+        ]
+
+    def hand_dicts(self):
+        return [
+            [{'x': h[i], 'y': h[i + 1], 'z': h[i + 2]} for i in range(0, len(h), FIELDS)]
+            for h in (self.hands[i].tolist() for i in self._own_hands())
+        ]
+
+    def handedness_dicts(self):
+        return [{'index': n, 'label': self.handedness[i]} for n, i in enumerate(self._own_hands())]
+
+    def to_legacy(self):
+        """Returns (pose_lm, hands_lm, handedness_lm) in the RAW_LM JSON shape (player 0 of a multi-player frame)"""
+        return self.pose_dicts(), self.hand_dicts(), self.handedness_dicts()
+
+
+# ==========================================
+# ENCODING
+# ==========================================
+def _flatten(points):
+    out = array('f')
+    for p in points:
+        out.append(p.get('x', 0.0))
+        out.append(p.get('y', 0.0))
+        out.append(p.get('z', 0.0))
+        out.append(p.get('visibility', 0.0) or 0.0)
+    return out
+
+def _label_of(h):
+    if isinstance(h, dict):
+        return h.get('label') or h.get('categoryName') or 'Left'
+    return str(h)
+
+def _players_tail(players, hand_players):
+    """(flags, reserved byte, owner table) of a frame"""
+    if players == 1 and not any(hand_players):
+        return 0, 0, b''
+    return FLAG_PLAYERS, players, bytes(hand_players)
+
+def encode_frame(pose_lm, hands_lm=(), handedness_lm=(), frame_id=0, capture_ts=0.0):
+    """Encodes landmark dicts into a binary frame (Python producer / tooling)"""
+    hands_lm = list(hands_lm)[:MAX_HANDS]
+    mask = 0
+    for i, h in enumerate(list(handedness_lm)[:MAX_HANDS]):
+        if _label_of(h) == 'Right':
+            mask |= 1 << i
+
+    body = _flatten(pose_lm)
+    for hand in hands_lm:
+        body.extend(_flatten(hand))
+
+    header = HEADER.pack(MAGIC, PROTOCOL_VERSION, 0, frame_id & 0xFFFFFFFF, float(capture_ts),
+                         len(pose_lm), len(hands_lm), mask, 0)
+    return header + body.tobytes()
+
+def encode_line(pose_lm, hands_lm=(), handedness_lm=(), frame_id=0, capture_ts=0.0):
+    data = encode_frame(pose_lm, hands_lm, handedness_lm, frame_id, capture_ts)
+    return BINARY_PREFIX + binascii.b2a_base64(data, newline=False).decode('ascii')
+
+def encode_players_frame(poses, hands_lm=(), handedness_lm=(), hand_players=(), frame_id=0, capture_ts=0.0):
+    """
+    Encodes a multi-player frame: poses is one landmark dict list per player,
+    hand_players the player owning each hand (MAX_HANDS per player at most).
+    """
+    players = len(poses)
+    if not 1 <= players <= MAX_PLAYERS:
+        raise ProtocolError(f"Unsupported player count ({players})")
+    hands_lm = list(hands_lm)[:players * MAX_HANDS]
+    hand_players = list(hand_players)[:len(hands_lm)]
+    hand_players += [0] * (len(hands_lm) - len(hand_players))
+    mask = 0
+    for i, h in enumerate(list(handedness_lm)[:len(hands_lm)]):
+        if _label_of(h) == 'Right':
+            mask |= 1 << i
+
+    body = array('f')
+    for pose_lm in poses:
+        if len(pose_lm) != len(poses[0]):
+            raise ProtocolError("Skeletons of one frame must have the same point count")
+        body.extend(_flatten(pose_lm))
+    for hand in hands_lm:
+        body.extend(_flatten(hand))
+
+    flags, reserved, owners = _players_tail(players, hand_players)
+    header = HEADER.pack(MAGIC, PROTOCOL_VERSION, flags, frame_id & 0xFFFFFFFF, float(capture_ts),
+                         len(poses[0]), len(hands_lm), mask, reserved)
+    return header + body.tobytes() + owners
+
+def encode_players_line(poses, hands_lm=(), handedness_lm=(), hand_players=(), frame_id=0, capture_ts=0.0):
+    data = encode_players_frame(poses, hands_lm, handedness_lm, hand_players, frame_id, capture_ts)
+    return BINARY_PREFIX + binascii.b2a_base64(data, newline=False).decode('ascii')
+
+def encode_packet(packet):
+    """Re-encodes a decoded LandmarkPacket (array or NumPy buffers) into a binary frame"""
+    max_hands = MAX_HANDS * packet.players
+    mask = 0
+    for i, label in enumerate(packet.handedness[:max_hands]):
+        if label == 'Right':
+            mask |= 1 << i
+    hands = packet.hands[:max_hands]
+    flags, reserved, owners = _players_tail(packet.players, packet.hand_players[:len(hands)])
+    header = HEADER.pack(MAGIC, PROTOCOL_VERSION, flags, packet.frame_id & 0xFFFFFFFF, float(packet.capture_ts),
+                         packet.pose_count, len(hands), mask, reserved)
+    return header + packet.pose.tobytes() + b''.join(h.tobytes() for h in hands) + owners
+
+def encode_packet_line(packet):
+    return BINARY_PREFIX + binascii.b2a_base64(encode_packet(packet), newline=False).decode('ascii')
+
+
+# ==========================================
+# DECODING
+# ==========================================
+def decode_frame(data):
+    """Decodes a binary frame (bytes / memoryview) into a LandmarkPacket"""
+    if len(data) < HEADER.size:
+        raise ProtocolError(f"Frame too short ({len(data)} bytes)")
+
+    magic, version, flags, frame_id, capture_ts, pose_count, hand_count, mask, reserved = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ProtocolError("Bad magic")
+    if version != PROTOCOL_VERSION:
+        raise ProtocolError(f"Unsupported protocol version {version}")
+    players = frame_players(flags, reserved, hand_count)
+
+    pose_len = players * pose_count * FIELDS
+    hand_len = HAND_POINTS * FIELDS
+    floats_end = HEADER.size + (pose_len + hand_count * hand_len) * 4
+    expected = floats_end + (hand_count if flags & FLAG_PLAYERS else 0)
+    if len(data) != expected:
+        raise ProtocolError(f"Frame size mismatch ({len(data)} != {expected})")
+
+    floats = array('f')
+    floats.frombytes(bytes(data[HEADER.size:floats_end]))
+
+    pose = floats[:pose_len]
+    hands = [floats[pose_len + i * hand_len: pose_len + (i + 1) * hand_len] for i in range(hand_count)]
+    handedness = ['Right' if mask & (1 << i) else 'Left' for i in range(hand_count)]
+    hand_players = None
+    if flags & FLAG_PLAYERS:
+        hand_players = list(bytes(data[floats_end:expected]))
+        if any(p >= players for p in hand_players):
+            raise ProtocolError("Hand owner out of range")
+
+    return LandmarkPacket(frame_id, capture_ts, pose, hands, handedness, version, players, hand_players)
+
+def frame_players(flags, reserved, hand_count):
+    """Player count of a frame header; raises ProtocolError when it (or the hand count) is out of range"""
+    players = reserved if flags & FLAG_PLAYERS else 1
+    if not 1 <= players <= MAX_PLAYERS:
+        raise ProtocolError(f"Unsupported player count ({players})")
+    if hand_count > MAX_HANDS * players:
+        raise ProtocolError(f"Too many hands ({hand_count})")
+    return players
+
+def decode_binary_line(line):
+    """Decodes a RAW_LMB stdin line into a LandmarkPacket (no dicts)"""
+    try:
+        data = binascii.a2b_base64(line[len(BINARY_PREFIX):])
+    except binascii.Error as e:
+        raise ProtocolError(f"Bad base64: {e}")
+    return decode_frame(data)
+
+def decode_line(line):
+    """
+    Decodes a RAW_LMB / RAW_LM stdin line.
+    Returns (pose_lm, hands_lm, handedness_lm, packet_or_None).
+    """
+    if line.startswith(BINARY_PREFIX):
+        packet = decode_binary_line(line)
+        pose_lm, hands_lm, handedness_lm = packet.to_legacy()
+        return pose_lm, hands_lm, handedness_lm, packet
+
+    if line.startswith(JSON_PREFIX):
+        pose_lm, hands_lm, handedness_lm, _, _ = decode_json_line(line)
+        return pose_lm, hands_lm, handedness_lm, None
+
+    raise ProtocolError("Not a landmark frame")
+
+def decode_json_line(line):
+    """
+    Decodes a legacy RAW_LM line.
+    Returns (pose_lm, hands_lm, handedness_lm, frame_id, capture_ts); ids / timestamps are 0 when absent.
+    """
+    payload = json.loads(line[len(JSON_PREFIX):])
+    return (payload.get('pose', []), payload.get('hands', []), payload.get('handedness', []),
+            payload.get('frameId', 0), payload.get('captureTs', 0.0))
@@ -0,0 +1,228 @@
+"""
+SRIKA Landmark Ring (Optional Transport)
+Named shared-memory ring of fixed-size landmark slots.
+
+Layout:
+    ring header (64B) : magic 'SLMR' | version u16 | reserved u16 | slot_count u32 | slot_size u32 | write_seq u64
+    slot i            : seq u64 | length u32 | pad u32 | frame (landmark_protocol binary frame)
+
+Each slot is guarded by a sequence lock: the writer marks it odd while
+writing and even (2 * frame_seq) when complete. The reader always takes
+the newest completed slot, copies its coordinates out in one block and only
+then re-checks the sequence, so a frame the writer lapped during the copy
+is dropped (counted as torn), never half-read. stdin remains the channel
+for control lines.
+
+Run `python landmark_ring.py --fps 240` for a Python-only producer stand-in.
+"""
+
+import sys
+import time
+import struct
+import argparse
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from landmark_protocol import (
+    HEADER, MAGIC as FRAME_MAGIC, PROTOCOL_VERSION, FIELDS, HAND_POINTS, MAX_HANDS, POSE_POINTS, FLAG_PLAYERS,
+    LandmarkPacket, ProtocolError, encode_frame, frame_players,
+)
+
+RING_MAGIC = b'SLMR'
+RING_VERSION = 1
+RING_HEADER = struct.Struct('<4sHHIIQ')
+RING_HEADER_SIZE = 64
+WRITE_SEQ_OFFSET = 16
+SLOT_HEADER = struct.Struct('<QI4x')
+
+DEFAULT_NAME = 'srika_landmarks'
+DEFAULT_SLOTS = 8
+
+def slot_size(players=1):
+    """Slot bytes for frames of up to `players` skeletons with their hands"""
+    owners = players * MAX_HANDS if players > 1 else 0
+    return HEADER.size + players * (POSE_POINTS + MAX_HANDS * HAND_POINTS) * FIELDS * 4 + owners
+
+DEFAULT_SLOT_SIZE = slot_size(1) # Couch versus producers pass slot_size=slot_size(players)
+
+_U64 = struct.Struct('<Q')
+
+
+def _slot_offset(index, slot_size):
+    return RING_HEADER_SIZE + index * (SLOT_HEADER.size + slot_size)
+
+
+class LandmarkRingWriter:
+    """Producer side. Creates (or re-uses) the named ring."""
+
+    def __init__(self, name=DEFAULT_NAME, slots=DEFAULT_SLOTS, slot_size=DEFAULT_SLOT_SIZE):
+        self.slots = slots
+        self.slot_size = slot_size
+        size = RING_HEADER_SIZE + slots * (SLOT_HEADER.size + slot_size)
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+            if self.shm.size < size:
+                # Left behind by a producer with fewer / smaller slots: replace it
+                self.shm.close()
+                self.shm.unlink()
+                try:
+                    self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+                except FileExistsError:
+                    raise ProtocolError(f"Ring '{name}' is smaller than {size}B and still in use") from None
+        self.shm.buf[:size] = bytes(size)
+        RING_HEADER.pack_into(self.shm.buf, 0, RING_MAGIC, RING_VERSION, 0, slots, slot_size, 0)
+        self.seq = 0
+
+    def write(self, frame):
+        """Publishes one encoded landmark frame"""
+        if len(frame) > self.slot_size:
+            raise ProtocolError(f"Frame ({len(frame)}B) larger than slot ({self.slot_size}B)")
+
+        seq = self.seq + 1
+        buf = self.shm.buf
+        off = _slot_offset((seq - 1) % self.slots, self.slot_size)
+
+        _U64.pack_into(buf, off, 2 * seq - 1) # Writing
+        buf[off + SLOT_HEADER.size: off + SLOT_HEADER.size + len(frame)] = frame
+        SLOT_HEADER.pack_into(buf, off, 2 * seq, len(frame)) # Complete
+        _U64.pack_into(buf, WRITE_SEQ_OFFSET, seq)
+        self.seq = seq
+
+    def write_frame(self, pose_lm, hands_lm=(), handedness_lm=(), frame_id=None, capture_ts=None):
+        self.write(encode_frame(
+            pose_lm, hands_lm, handedness_lm,
+            frame_id=self.seq + 1 if frame_id is None else frame_id,
+            capture_ts=time.time() if capture_ts is None else capture_ts,
+        ))
+
+    def close(self, unlink=True):
+        self.shm.close()
+        if unlink:
+            try: self.shm.unlink()
+            except FileNotFoundError: pass
+
+
+class LandmarkRingReader:
+    """Consumer side. Attaches to an existing ring."""
+
+    def __init__(self, name=DEFAULT_NAME):
+        self.shm = shared_memory.SharedMemory(name=name)
+        try:
+            # Attaching must not make us responsible for unlinking the producer's segment
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(self.shm._name, 'shared_memory')
+        except Exception:
+            pass
+        magic, version, _, self.slots, self.slot_size, _ = RING_HEADER.unpack_from(self.shm.buf, 0)
+        if magic != RING_MAGIC or version != RING_VERSION:
+            self.shm.close()
+            raise ProtocolError("Not a SRIKA landmark ring")
+        self.last_seq = 0
+        self.missed = 0 # Frames published but never read (superseded or torn)
+        self.torn = 0   # Reads abandoned because the writer lapped us
+
+    def write_seq(self):
+        return _U64.unpack_from(self.shm.buf, WRITE_SEQ_OFFSET)[0]
+
+    def has_new(self):
+        return self.write_seq() != self.last_seq
+
+    def read_latest(self):
+        """
+        Returns the newest LandmarkPacket (pose / hands are copied out of the
+        slot, so the writer may reuse it) or None if nothing new was published.
+        """
+        seq = self.write_seq()
+        if seq == self.last_seq:
+            return None
+
+        buf = self.shm.buf
+        off = _slot_offset((seq - 1) % self.slots, self.slot_size)
+        slot_seq, length = SLOT_HEADER.unpack_from(buf, off)
+        if slot_seq != 2 * seq:
+            self.torn += 1
+            return None
+
+        data = off + SLOT_HEADER.size
+        magic, version, flags, frame_id, capture_ts, pose_count, hand_count, mask, reserved = HEADER.unpack_from(buf, data)
+        try:
+            if magic != FRAME_MAGIC or version != PROTOCOL_VERSION:
+                raise ProtocolError("Bad frame header")
+            players = frame_players(flags, reserved, hand_count)
+        except ProtocolError:
+            self.torn += 1
+            return None
+
+        floats = data + HEADER.size
+        pose_len = players * pose_count * FIELDS
+        hand_len = HAND_POINTS * FIELDS
+        if (pose_len + hand_count * hand_len) * 4 + (hand_count if flags & FLAG_PLAYERS else 0) > self.slot_size - HEADER.size:
+            self.torn += 1 # Counts from a slot being rewritten
+            return None
+        # One copy of the coordinates, validated by the re-check below
+        payload = np.frombuffer(buf, dtype=np.float32, count=pose_len + hand_count * hand_len, offset=floats).copy()
+        pose = payload[:pose_len]
+        hands = [payload[pose_len + i * hand_len:pose_len + (i + 1) * hand_len] for i in range(hand_count)]
+        hands_base = floats + pose_len * 4
+        handedness = ['Right' if mask & (1 << i) else 'Left' for i in range(hand_count)]
+        hand_players = None
+        if flags & FLAG_PLAYERS:
+            owners = hands_base + hand_count * hand_len * 4
+            hand_players = [min(p, players - 1) for p in bytes(buf[owners:owners + hand_count])]
+
+        # Re-check: the writer must not have started reusing this slot during the copy
+        if _U64.unpack_from(buf, off)[0] != slot_seq:
+            self.torn += 1
+            return None
+
+        if seq > self.last_seq + 1:
+            self.missed += seq - self.last_seq - 1
+        self.last_seq = seq
+        return LandmarkPacket(frame_id, capture_ts, pose, hands, handedness, version, players, hand_players)
+
+    def close(self):
+        try:
+            self.shm.close()
+        except BufferError:
+            pass # Mapping still exported elsewhere; it goes away with the process
+
+
+# ==========================================
+# PRODUCER STAND-IN (Load testing without Electron)
+# ==========================================
+def synthetic_pose(t):
+    """Idle-stance skeleton with a little sway so successive frames differ"""
+    sway = 0.02 * np.sin(t * 2.0)
+    pose = [{'x': 0.5 + sway, 'y': 0.1 + i * 0.025, 'z': -0.1, 'visibility': 0.99} for i in range(POSE_POINTS)]
+    hands = [[{'x': 0.4 + j * 0.005, 'y': 0.5, 'z': 0.0} for j in range(HAND_POINTS)]]
+    return pose, hands, [{'label': 'Left'}]
+
+def run_producer(name=DEFAULT_NAME, fps=120.0, seconds=10.0, slots=DEFAULT_SLOTS):
+    writer = LandmarkRingWriter(name, slots=slots)
+    interval = 1.0 / fps
+    start = time.perf_counter()
+    next_tick = start
+    try:
+        while time.perf_counter() - start < seconds:
+            pose, hands, handedness = synthetic_pose(time.perf_counter() - start)
+            writer.write_frame(pose, hands, handedness)
+            next_tick += interval
+            delay = next_tick - time.perf_counter()
+            if delay > 0: time.sleep(delay)
+    finally:
+        print(f"[RING] Producer wrote {writer.seq} frames in {time.perf_counter() - start:.1f}s", flush=True)
+        writer.close()
+    return writer.seq
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SRIKA landmark ring producer stand-in")
+    parser.add_argument('--name', default=DEFAULT_NAME)
+    parser.add_argument('--fps', type=float, default=120.0)
+    parser.add_argument('--seconds', type=float, default=10.0)
+    parser.add_argument('--slots', type=int, default=DEFAULT_SLOTS)
+    args = parser.parse_args()
+    run_producer(args.name, args.fps, args.seconds, args.slots)
+    sys.exit(0)
@@ -8,7 +8,7 @@ const crypto = require('crypto');
 // --- PRODUCTION SECURITY CONSTANTS ---
 const ALLOWED_CHANNELS = [
     'window-minimize', 'window-maximize', 'window-close',
-    'trigger-key', 'input-update', 'log-error',
+    'trigger-key', 'load-preset', 'input-update', 'log-error',
     'get-app-version', 'open-external',
     'auth-save-session', 'auth-load-session', 'auth-clear-session', 'auth-open-login-window',
     'fs-read-json', 'fs-write-json',
@@ -750,7 +750,7 @@ ipcMain.on('trigger-key', (event, key) => {
             pythonProcess.stdin.write(key + '\n');
 
             // Heartbeat for RAW_LM
-            if (key.startsWith('RAW_LM:')) {
+            if (key.startsWith('RAW_LM:') || key.startsWith('RAW_LMB:')) {
                 if (!global.lm_count) global.lm_count = 0;
                 global.lm_count++;
                 if (global.lm_count % 100 === 0) {
@@ -769,6 +769,38 @@ ipcMain.on('trigger-key', (event, key) => {
     }
 });
 
+// Store presets: the declarative definition ships next to the native preset
+// (presets/<folder>/definition.json); the bridge compiles it on LOAD_PRESET
+const PRESETS_DIR = app.isPackaged
+    ? path.join(process.resourcesPath, '_core', 'presets')
+    : path.join(__dirname, 'presets');
+
+ipcMain.on('load-preset', (event, preset) => {
+    if (!ALLOWED_CHANNELS.includes('load-preset') || !preset) return;
+    if (!pythonProcess || !pythonProcess.stdin) {
+        logToFile('[IPC] ERROR: load-preset received but pythonProcess is NULL or stdin closed.');
+        return;
+    }
+    const folder = String(preset.definition_dir || '');
+    if (!/^[a-z0-9_]+$/i.test(folder)) {
+        logToFile(`[IPC] ERROR: Invalid preset definition: ${folder}`);
+        return;
+    }
+    try {
+        const definition = JSON.parse(fs.readFileSync(path.join(PRESETS_DIR, folder, 'definition.json'), 'utf8'));
+        const item = {
+            id: preset.id,
+            definition,
+            engine_config: preset.engine_config || {},
+            gesture_templates: preset.gesture_templates || []
+        };
+        pythonProcess.stdin.write(`LOAD_PRESET:${JSON.stringify(item)}\n`);
+        logToFile(`[IPC] Store preset: ${preset.id} (${folder}/definition.json)`);
+    } catch (e) {
+        logToFile(`[IPC] ERROR: Store preset ${preset.id}: ${e.message}`);
+    }
+});
+
 ipcMain.handle('get-app-version', () => {
     if (!ALLOWED_CHANNELS.includes('get-app-version')) return 'Unknown';
     try {
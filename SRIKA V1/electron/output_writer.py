@@ -0,0 +1,159 @@
+"""
+SRIKA Output Writer
+Batched, non-blocking stdout for the bridge.
+
+Installs a stdout proxy so every existing `print(..., flush=True)` (bridge,
+presets, adapters) just appends a line to an in-memory buffer. A dedicated
+writer thread drains the buffer in batches with a single write + flush, so a
+slow Electron reader can only ever block that thread, never the frame loop.
+
+When the backlog grows, low-priority lines (debug / controller logs) are
+dropped and summarized in an OUTPUT_STATS line once the pipe catches up.
+"""
+
+import sys
+import threading
+from collections import deque
+
+HIGH = 0
+LOW = 1
+
+# Diagnostic chatter that Electron only writes to the log file
+LOW_PRIORITY_PREFIXES = ('PRESET_DEBUG', 'DEBUG:', '[CONTROLLER]', '[ACTION]', '[STEAM_INPUT]')
+
+
+def classify(line):
+    return LOW if line.startswith(LOW_PRIORITY_PREFIXES) else HIGH
+
+
+class OutputWriter:
+    def __init__(self, stream=None, low_watermark=256, high_limit=4096):
+        self.stream = stream or sys.stdout
+        self.low_watermark = low_watermark # Above this backlog, low-priority lines are dropped
+        self.high_limit = high_limit       # Hard cap, oldest low-priority lines go first
+        self._pending = deque() # (line, priority)
+        self._pending_low = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._closed = False
+        self._busy = False
+
+        # Counters
+        self.lines_written = 0
+        self.batches = 0
+        self.dropped_low = 0
+        self.dropped_high = 0
+        self._unreported = 0
+
+        self._thread = threading.Thread(target=self._run, name="srika-stdout", daemon=True)
+        self._thread.start()
+
+    def emit(self, line, priority=None):
+        """Queues one line (without newline). Never blocks on the pipe."""
+        if priority is None:
+            priority = classify(line)
+        with self._cond:
+            backlog = len(self._pending)
+            if priority == LOW and backlog >= self.low_watermark:
+                self.dropped_low += 1
+                self._unreported += 1
+                return
+            if backlog >= self.high_limit:
+                self._evict()
+            self._pending.append((line, priority))
+            if priority == LOW:
+                self._pending_low += 1
+            self._cond.notify()
+
+    def _evict(self):
+        """Drops the oldest pending LOW line, or the oldest line when only HIGH lines are pending"""
+        pending = self._pending
+        if self._pending_low:
+            for i, (_, priority) in enumerate(pending):
+                if priority == LOW:
+                    del pending[i]
+                    self._pending_low -= 1
+                    self.dropped_low += 1
+                    break
+        else:
+            pending.popleft()
+            self.dropped_high += 1
+        self._unreported += 1
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+                batch = [line for line, _ in self._pending]
+                self._pending.clear()
+                self._pending_low = 0
+                if self._unreported:
+                    batch.append(f"OUTPUT_STATS: Dropped={self._unreported} | TotalLow={self.dropped_low} | TotalHigh={self.dropped_high}")
+                    self._unreported = 0
+                self._busy = True
+
+            try:
+                self.stream.write('\n'.join(batch) + '\n')
+                self.stream.flush()
+            except (OSError, ValueError):
+                pass # Pipe closed: nothing left to talk to
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self.lines_written += len(batch)
+                    self.batches += 1
+                    self._cond.notify_all()
+
+    def flush(self, timeout=1.0):
+        """Waits (bounded) until everything queued so far has been written"""
+        with self._cond:
+            self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self, timeout=1.0):
+        self.flush(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+
+class _StdoutProxy:
+    """File-like stand-in for sys.stdout that feeds complete lines to an OutputWriter"""
+
+    def __init__(self, writer, original):
+        self._writer = writer
+        self._original = original
+        self._local = threading.local()
+
+    def write(self, text):
+        partial = getattr(self._local, 'partial', '') + text
+        if '\n' in partial:
+            *lines, partial = partial.split('\n')
+            for line in lines:
+                self._writer.emit(line)
+        self._local.partial = partial
+        return len(text)
+
+    def flush(self):
+        pass # Batched by the writer thread
+
+    def isatty(self):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self._original, name)
+
+
+def install(low_watermark=256, high_limit=4096):
+    """Routes sys.stdout through a batched OutputWriter and returns the writer"""
+    original = sys.stdout
+    writer = OutputWriter(original, low_watermark, high_limit)
+    sys.stdout = _StdoutProxy(writer, original)
+    return writer
+
+def uninstall(writer):
+    if isinstance(sys.stdout, _StdoutProxy):
+        sys.stdout = sys.stdout._original
+    writer.close()
@@ -0,0 +1,242 @@
+"""
+SRIKA Pipeline
+Backend offload: the controller report (a ViGEm update, a SendInput call)
+runs behind a bounded queue on its own worker thread, so a stalled report
+holds up only that queue instead of the frame loop.
+
+    backend = Stage('backend', send_report, capacity=2, policy='latest', merge=merge_reports)
+    backend.submit((tokens, trace))
+
+The backend is the bridge's only stage. Decode, landmark filter and preset
+stay on the dispatch loop: they are GIL-bound Python / small-array NumPy
+work that a thread would not overlap, and they must stay in order with the
+control lines (SET_PROFILE, SET_SETTINGS) around each frame. A worker
+process would pay a pickle round trip per frame. Frame backlog is handled
+before the loop instead (frame_queue coalescing, frame_scheduler).
+
+Backpressure policy when a stage's queue is full:
+    block        producer waits for space (up to block_timeout, then the item is dropped)
+    latest       newest pending item is replaced by the new one (merge(old, new) when given)
+    drop_newest  new item is dropped
+    drop_oldest  oldest pending item is dropped to make room
+
+Gauges per stage: queue depth (current / max), items in / out, coalesced and
+dropped counts, queue wait and service time histograms (PIPELINE_STATS lines).
+The backend's In counts reports: frames that produced tokens, token lines
+and idle releases. Frames that produce no tokens submit nothing, so a
+session without a single action shows In=0 whatever the backend.
+inline=True runs the handler on the caller's thread (same gauges, no worker),
+for hosts without spare cores or tools that need deterministic ordering.
+"""
+
+import time
+import threading
+from collections import deque
+
+from bridge_metrics import LatencyHistogram
+
+POLICIES = ('block', 'latest', 'drop_newest', 'drop_oldest')
+
+
+def _merge_tokens(old_tokens, new_tokens):
+    if not new_tokens:
+        return new_tokens # An empty report releases everything (IDLE): it must not hold a button
+    held = [t for t in old_tokens if ':' not in t and t not in new_tokens]
+    return list(new_tokens) + held if held else new_tokens
+
+def merge_reports(old, new):
+    """
+    Coalesces two pending (tokens, trace[, {player: tokens}]) controller
+    reports: the newer report wins, but buttons that were only in the older
+    one are kept for one report so a single-frame press is never lost.
+    The extra players of a multi-player report are merged the same way.
+    """
+    tokens = _merge_tokens(old[0], new[0])
+    old_players = old[2] if len(old) > 2 else None
+    if not old_players:
+        return (tokens,) + tuple(new[1:])
+    players = dict(new[2]) if len(new) > 2 and new[2] else {}
+    for player, old_tokens in old_players.items():
+        players[player] = _merge_tokens(old_tokens, players[player]) if player in players else old_tokens
+    return (tokens, new[1], players)
+
+
+class Stage:
+    """One pipeline stage: a bounded queue in front of a handler running on a worker thread"""
+
+    def __init__(self, name, handler, capacity=8, policy='block', merge=None, inline=False, block_timeout=0.05):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown backpressure policy {policy!r}")
+        self.name = name
+        self.handler = handler
+        self.capacity = max(1, int(capacity))
+        self.policy = policy
+        self.merge = merge
+        self.inline = inline
+        self.block_timeout = block_timeout
+        self.on_error = lambda stage, e: print(f"PIPELINE_ERROR: {stage.name} | {e}", flush=True)
+
+        self._items = deque() # (item, submitted_at)
+        self._cond = threading.Condition(threading.Lock())
+        self._busy = False
+        self._closed = False
+        self.reset_stats()
+
+        self._thread = None
+        if not inline:
+            self._thread = threading.Thread(target=self._run, name=f"srika-{name}", daemon=True)
+            self._thread.start()
+
+    def reset_stats(self):
+        self.items_in = 0
+        self.items_out = 0
+        self.coalesced = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.wait = LatencyHistogram()
+        self.service = LatencyHistogram()
+
+    @property
+    def depth(self):
+        return len(self._items)
+
+    # ==========================================
+    # PRODUCER SIDE
+    # ==========================================
+    def submit(self, item):
+        """Queues an item for the handler; returns False when the policy dropped it"""
+        now = time.perf_counter()
+        if self.inline:
+            self.items_in += 1
+            self._process(item, now)
+            return True
+
+        with self._cond:
+            if self._closed:
+                return False
+            self.items_in += 1
+            items = self._items
+            if len(items) >= self.capacity:
+                if self.policy == 'block':
+                    deadline = now + self.block_timeout
+                    while len(items) >= self.capacity and not self._closed:
+                        remaining = deadline - time.perf_counter()
+                        if remaining <= 0: break
+                        self._cond.wait(remaining)
+                    if len(items) >= self.capacity or self._closed:
+                        self.dropped += 1
+                        return False
+                elif self.policy == 'latest':
+                    pending, submitted_at = items[-1]
+                    items[-1] = (self.merge(pending, item) if self.merge else item, submitted_at)
+                    self.coalesced += 1
+                    return True
+                elif self.policy == 'drop_newest':
+                    self.dropped += 1
+                    return False
+                else: # drop_oldest
+                    items.popleft()
+                    self.dropped += 1
+            items.append((item, now))
+            if len(items) > self.max_depth:
+                self.max_depth = len(items)
+            self._cond.notify_all()
+        return True
+
+    # ==========================================
+    # WORKER SIDE
+    # ==========================================
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._items and not self._closed:
+                    self._cond.wait()
+                if not self._items:
+                    return # Closed and drained
+                item, submitted_at = self._items.popleft()
+                self._busy = True
+                self._cond.notify_all() # Room for a blocked producer
+            self._process(item, submitted_at)
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+
+    def _process(self, item, submitted_at):
+        start = time.perf_counter()
+        self.wait.add(start - submitted_at)
+        try:
+            self.handler(item)
+        except Exception as e:
+            self.on_error(self, e)
+        self.service.add(time.perf_counter() - start)
+        self.items_out += 1
+
+    def drain(self, timeout=1.0):
+        """Waits until every queued item has been handled; returns False on timeout"""
+        if self.inline:
+            return True
+        deadline = time.perf_counter() + timeout
+        with self._cond:
+            while self._items or self._busy:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout=1.0):
+        """Handles what is still queued, then stops the worker"""
+        if self.inline or self._thread is None:
+            return
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout)
+
+    # ==========================================
+    # GAUGES
+    # ==========================================
+    def status(self):
+        return (
+            f"PIPELINE_STATS: Stage={self.name} | Policy={self.policy}{' (inline)' if self.inline else ''}"
+            f" | Depth={self.depth}/{self.capacity} Max={self.max_depth}"
+            f" | In={self.items_in} Out={self.items_out} Coalesced={self.coalesced} Dropped={self.dropped}"
+            f" | Wait p50<={self.wait.percentile(50) * 1000:.3f}ms p99<={self.wait.percentile(99) * 1000:.3f}ms"
+            f" | Service p50<={self.service.percentile(50) * 1000:.3f}ms p99<={self.service.percentile(99) * 1000:.3f}ms"
+            f" Max={self.service.max * 1000:.3f}ms"
+        )
+
+
+class Pipeline:
+    """Named stages of the bridge, for reporting and shutdown"""
+
+    def __init__(self):
+        self.stages = {}
+
+    def add(self, stage):
+        self.stages[stage.name] = stage
+        return stage
+
+    def __getitem__(self, name):
+        return self.stages[name]
+
+    def report(self):
+        return [stage.status() for stage in self.stages.values()]
+
+    def shed(self):
+        """Stages that coalesced or dropped items since the previous call"""
+        shed = []
+        for stage in self.stages.values():
+            total = stage.coalesced + stage.dropped
+            if total != getattr(stage, '_shed_seen', 0):
+                stage._shed_seen = total
+                shed.append(stage)
+        return shed
+
+    def reset_stats(self):
+        for stage in self.stages.values():
+            stage.reset_stats()
+
+    def close(self, timeout=1.0):
+        for stage in self.stages.values():
+            stage.close(timeout)
@@ -0,0 +1,101 @@
+"""
+SRIKA Player Batch
+Couch versus: a multi-player frame (landmark_protocol FLAG_PLAYERS) is
+evaluated by the active preset once per player, every player with their own
+preset state (landmark filter, motion, cooldowns, latches) and their own
+controller.
+
+    tokens = player_batch(logic).process(frames) # [player 0 tokens, player 1 tokens, ...]
+
+Every player runs the single-player pipeline (filter_frame + process_frame +
+gesture templates) on their own preset instance. Player 0 is the registry
+instance, so settings and hot reload apply to it as usual; the other players
+are spawned from it (preset_loader.spawn_logic) the first time they show up.
+
+There are no shared array passes across players: with two players they cost
+about as much as they save (bench_players), the decisions are per player
+anyway, and N players cost about N x one player.
+
+The renderer tracks one person (@mediapipe/pose) and never sets
+FLAG_PLAYERS; multi-player frames come from other producers
+(landmark_protocol.encode_players_frame, the shared-memory ring, replays).
+"""
+
+import weakref
+
+from landmark_protocol import MAX_PLAYERS
+from landmark_filter import filter_frame
+from gesture_templates import gesture_tokens
+from preset_loader import spawn_logic, apply_settings
+
+
+class PlayerBatch:
+    """The players of one preset instance (player 0 is the instance itself)"""
+
+    def __init__(self, logic):
+        self._lead = weakref.ref(logic) # The batch lives as long as the instance, not longer
+        self.spawned = [] # Players 1+
+        self.frames = 0
+
+    @property
+    def players(self):
+        return [self._lead()] + self.spawned
+
+    def resize(self, count):
+        """Spawns players up to `count`; players who leave keep their state for when they return"""
+        lead = self._lead()
+        while len(self.spawned) + 1 < min(count, MAX_PLAYERS):
+            self.spawned.append(spawn_logic(lead))
+
+    def apply_settings(self, settings):
+        """SET_SETTINGS for the spawned players (the bridge updates player 0)"""
+        for player in self.spawned:
+            apply_settings(player, settings, log=lambda *a, **k: None)
+
+    def process(self, frames, optional=True, debug=True):
+        """Tokens of every player for one multi-player frame; frames[p] is player p's LandmarkFrame"""
+        count = len(frames)
+        if count > len(self.spawned) + 1:
+            self.resize(count)
+        players = [self._lead()] + self.spawned[:count - 1]
+        self.frames += 1
+
+        tokens = []
+        for player, frame in zip(players, frames):
+            if frame is None:
+                tokens.append([])
+                continue
+            if hasattr(player, 'debug_output'):
+                player.debug_output = debug
+            frame = filter_frame(player, frame) # Hands keep their filter state while the body is out of view
+            out = player.process_frame(frame) if frame.has_pose else [] # Out of view: drives nothing
+            if optional:
+                matched = gesture_tokens(player, frame)
+                if matched:
+                    out = list(out) + matched
+            tokens.append(out)
+        return tokens
+
+    def status(self, label=""):
+        return f"PLAYER_BATCH: {label} | Players={len(self.spawned) + 1} Frames={self.frames}"
+
+
+# Batches per ControllerLogic instance (a reloaded preset starts over with its new instance)
+_batches = weakref.WeakKeyDictionary()
+
+def player_batch(logic):
+    """The PlayerBatch of a preset instance"""
+    batch = _batches.get(logic)
+    if batch is None:
+        batch = _batches[logic] = PlayerBatch(logic)
+    return batch
+
+def apply_batch_settings(logic, settings):
+    """SET_SETTINGS for the spawned players of a preset instance (nothing to do before its first multi-player frame)"""
+    batch = _batches.get(logic)
+    if batch is not None:
+        batch.apply_settings(settings)
+
+def batch_stats(registry):
+    """PLAYER_BATCH status lines for the presets in a logic registry that saw multi-player frames"""
+    return [_batches[logic].status(name) for name, logic in registry.items() if logic in _batches]
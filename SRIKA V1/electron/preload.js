@@ -6,6 +6,7 @@ contextBridge.exposeInMainWorld('electronAPI', {
     maximize: () => ipcRenderer.send('window-maximize'),
     close: () => ipcRenderer.send('window-close'),
     triggerKey: (key) => ipcRenderer.send('trigger-key', key),
+    loadPreset: (preset) => ipcRenderer.send('load-preset', preset),
     setGameMode: (on) => ipcRenderer.send('set-game-mode', on),
     onAdminStatus: (callback) => {
         const listener = (event, status) => callback(status);
@@ -0,0 +1,198 @@
+"""
+SRIKA Preset Batch Mode
+Offline evaluation of preset logic over whole recorded sessions.
+
+A session is held as arrays over time:
+    poses       : (frames, 33, 4) float32
+    hands       : (frames, 2, 21, 4) float32 (zero-padded)
+    hand_counts : (frames,) hands present in each frame
+    right_hands : (frames, 2) True where the hand is labelled 'Right'
+    timestamps  : (frames,) seconds
+    has_pose    : (frames,) False where no body was detected (pose rows are zero)
+
+Presets implement `process_batch(session)` with array operations over the
+time axis and return the same token timeline the streaming `process()`
+would produce frame by frame (landmark_filter.filter_session() first, when
+the preset has a LANDMARK_FILTER). `run_streaming()` replays a session through
+the streaming path (with an injected clock) so the two can be compared.
+"""
+
+import numpy as np
+
+from landmark_protocol import FIELDS, HAND_POINTS, MAX_HANDS, POSE_POINTS
+from landmark_frame import LandmarkFrame
+
+DEFAULT_FPS = 60.0
+
+
+class BatchSession:
+    __slots__ = ('poses', 'hands', 'hand_counts', 'right_hands', 'timestamps', 'has_pose')
+
+    def __init__(self, poses, hands=None, hand_counts=None, timestamps=None, right_hands=None, has_pose=None):
+        self.poses = np.ascontiguousarray(poses, dtype=np.float32).reshape(-1, POSE_POINTS, FIELDS)
+        n = len(self.poses)
+        if hands is None:
+            hands = np.zeros((n, MAX_HANDS, HAND_POINTS, FIELDS), dtype=np.float32)
+        self.hands = np.ascontiguousarray(hands, dtype=np.float32).reshape(n, -1, HAND_POINTS, FIELDS)
+        if hand_counts is None:
+            hand_counts = np.zeros(n, dtype=np.intp)
+        self.hand_counts = np.asarray(hand_counts, dtype=np.intp)
+        if right_hands is None:
+            right_hands = np.zeros((n, self.hands.shape[1]), dtype=bool)
+        self.right_hands = np.asarray(right_hands, dtype=bool)
+        if timestamps is None:
+            timestamps = np.arange(n) / DEFAULT_FPS
+        self.timestamps = np.asarray(timestamps, dtype=np.float64)
+        if has_pose is None:
+            has_pose = np.ones(n, dtype=bool)
+        self.has_pose = np.asarray(has_pose, dtype=bool)
+
+    def __len__(self):
+        return len(self.poses)
+
+    @classmethod
+    def from_frames(cls, frames, timestamps=None):
+        """Stacks LandmarkFrames into a session (frames without a pose get zero rows)"""
+        n = len(frames)
+        poses = np.zeros((n, POSE_POINTS, FIELDS), dtype=np.float32)
+        has_pose = np.array([f.has_pose for f in frames], dtype=bool)
+        for i in np.flatnonzero(has_pose).tolist():
+            poses[i] = frames[i].pose
+        hands = np.zeros((n, MAX_HANDS, HAND_POINTS, FIELDS), dtype=np.float32)
+        counts = np.zeros(n, dtype=np.intp)
+        right = np.zeros((n, MAX_HANDS), dtype=bool)
+        for i, f in enumerate(frames):
+            k = min(f.hand_count, MAX_HANDS)
+            hands[i, :k] = f.hands[:k]
+            counts[i] = k
+            right[i, :k] = [label == 'Right' for label in f.handedness[:k]]
+        if timestamps is None and n and frames[0].capture_ts:
+            timestamps = [f.capture_ts for f in frames]
+        return cls(poses, hands, counts, timestamps, right, has_pose)
+
+    def frame(self, i):
+        """Streaming view of frame i"""
+        k = self.hand_counts[i]
+        labels = ['Right' if r else 'Left' for r in self.right_hands[i, :k].tolist()]
+        pose = self.poses[i] if self.has_pose[i] else None
+        return LandmarkFrame(pose, self.hands[i, :k], labels, i + 1, self.timestamps[i].item())
+
+    def take(self, indices):
+        """Session of the given frames, in that order"""
+        return BatchSession(self.poses[indices], self.hands[indices], self.hand_counts[indices],
+                            self.timestamps[indices], self.right_hands[indices], self.has_pose[indices])
+
+def scatter_timeline(timeline, indices, n):
+    """Token timeline of n frames from the timeline of the frames at `indices` (the others get no tokens)"""
+    full = [[] for _ in range(n)]
+    for i, tokens in zip(indices.tolist(), timeline):
+        full[i] = tokens
+    return full
+
+
+# ==========================================
+# TIME-AXIS HELPERS
+# ==========================================
+def frame_dts(timestamps, fallback):
+    """dt to the previous frame (dt[0] is the fallback); non-positive gaps use the fallback"""
+    dt = np.empty(len(timestamps))
+    if len(timestamps):
+        dt[0] = fallback
+        dt[1:] = np.diff(timestamps)
+        dt[dt <= 0] = fallback
+    return dt
+
+def frame_segments(timestamps, max_gap):
+    """
+    Batch counterpart of kinematics.FrameTimer.
+    Returns (kept frame indices, segment start positions within them): frames not
+    newer than every earlier frame are dropped, and a segment starts at the first
+    kept frame and after every gap longer than max_gap.
+    """
+    ts = np.asarray(timestamps, dtype=np.float64)
+    if not len(ts):
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    newest_before = np.maximum.accumulate(np.concatenate(([-np.inf], ts[:-1])))
+    kept = np.flatnonzero(ts > newest_before)
+    starts = np.flatnonzero(np.concatenate(([True], np.diff(ts[kept]) > max_gap)))
+    return kept, starts
+
+def ema(raw, alpha, initial=0.0):
+    """
+    v[t] = v[t-1] * (1 - alpha) + raw[t] * alpha, per column.
+    The recurrence is scanned on Python floats so every step rounds
+    exactly like the streaming update.
+    """
+    raw = np.asarray(raw, dtype=np.float64)
+    cols = raw.shape[1]
+    keep = (1 - np.asarray(alpha, dtype=np.float64) * np.ones(cols)).tolist()
+    gain = (np.asarray(alpha, dtype=np.float64) * np.ones(cols)).tolist()
+    out = np.empty_like(raw)
+    v = [initial] * cols
+    for t, row in enumerate(raw.tolist()):
+        v = [vi * k + r * a for vi, k, r, a in zip(v, keep, row, gain)]
+        out[t] = v
+    return out
+
+def sliding_min(values, window):
+    """Minimum over the last `window` rows (inclusive), growing at the start"""
+    out = np.array(values, dtype=np.float64, copy=True)
+    for lag in range(1, window):
+        np.minimum(out[lag:], values[:-lag], out=out[lag:])
+    return out
+
+def run_lengths(mask):
+    """Length of the run of True values ending at each index (0 where False)"""
+    mask = np.asarray(mask, dtype=bool)
+    idx = np.arange(1, len(mask) + 1)
+    last_false = np.maximum.accumulate(np.where(mask, 0, idx))
+    return np.where(mask, idx - last_false, 0)
+
+def hysteresis(on, off, initial=False):
+    """Latch that turns on where `on` and off where `off` (mutually exclusive), holding otherwise"""
+    events = np.where(on, 1, np.where(off, -1, 0))
+    idx = np.where(events != 0, np.arange(len(events)), -1)
+    last = np.maximum.accumulate(idx) if len(idx) else idx
+    return np.where(last >= 0, events[np.maximum(last, 0)] > 0, initial)
+
+def cooldown_gate(candidates, timestamps, cooldown, last_time=0.0):
+    """Keeps candidate frames whose time since the previously kept one exceeds `cooldown`"""
+    kept = np.zeros(len(candidates), dtype=bool)
+    last = last_time
+    ts = timestamps.tolist()
+    for i in np.flatnonzero(candidates).tolist():
+        if ts[i] - last > cooldown:
+            kept[i] = True
+            last = ts[i]
+    return kept
+
+
+# ==========================================
+# STREAMING REFERENCE
+# ==========================================
+class _ReplayClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def run_streaming(logic, session):
+    """Feeds a session through filter_frame() + logic.process_frame() one frame at a time, as the bridge does"""
+    from landmark_filter import filter_frame
+
+    clock = _ReplayClock()
+    if hasattr(logic, 'clock'):
+        logic.clock = clock
+    timeline = []
+    for i in range(len(session)):
+        clock.now = session.timestamps[i].item()
+        timeline.append(logic.process_frame(filter_frame(logic, session.frame(i))))
+    return timeline
+
+def first_mismatch(a, b):
+    """Index of the first frame where two token timelines differ (None if identical)"""
+    for i, (x, y) in enumerate(zip(a, b)):
+        if x != y:
+            return i
+    return None if len(a) == len(b) else min(len(a), len(b))
@@ -0,0 +1,141 @@
+"""
+SRIKA Preset Loader
+Discovers `presets/<name>/logic.py` modules (shared by the bridge and offline tools),
+and reloads a changed one while the bridge keeps running.
+
+Hot reload: PresetWatcher polls the logic.py modification times; a changed
+preset is re-executed as a fresh module and its new `logic` replaces the old
+one. carry_state() moves the running instance's state (lowercase attributes:
+motion history, latches, clock) onto the new instance so a reload mid-session
+does not reset gestures; configuration (UPPERCASE attributes) always comes
+from the new code. A preset can take over with `carry_state(self, old)`.
+
+Multi-player frames: spawn_logic() makes the extra players' instances of a
+preset (fresh state, the running instance's configuration); a preset can
+take over with `spawn(self)`.
+"""
+
+import os
+import copy
+import importlib.util
+
+PRESET_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'presets')
+
+
+def logic_path(name, preset_dir=PRESET_DIR):
+    return os.path.join(preset_dir, name, 'logic.py')
+
+def load_preset_module(name, preset_dir=PRESET_DIR, prefix="preset_"):
+    """Executes presets/<name>/logic.py as a new module (raises on errors)"""
+    spec = importlib.util.spec_from_file_location(f"{prefix}{name}", logic_path(name, preset_dir))
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+def load_preset_modules(preset_dir=PRESET_DIR, prefix="preset_", log=print):
+    """Imports every preset logic module. Returns {name: module}."""
+    modules = {}
+    if not os.path.exists(preset_dir):
+        log(f"[BRIDGE] Preset directory not found: {preset_dir}", flush=True)
+        return modules
+
+    for d in os.listdir(preset_dir):
+        path = os.path.join(preset_dir, d)
+        if os.path.isdir(path):
+            if os.path.exists(logic_path(d, preset_dir)):
+                try:
+                    mod = load_preset_module(d, preset_dir, prefix)
+                    modules[d] = mod
+                    if hasattr(mod, 'logic'):
+                        log(f"[BRIDGE] Loaded preset: {d}", flush=True)
+                except Exception as e:
+                    log(f"[BRIDGE] Failed to load preset {d}: {e}", flush=True)
+    return modules
+
+# ==========================================
+# HOT RELOAD
+# ==========================================
+def _is_number(value):
+    return type(value) in (int, float)
+
+def carry_state(old, new):
+    """
+    Copies runtime state from a running logic instance onto its reloaded
+    replacement. Returns the names of the carried attributes.
+    """
+    if hasattr(new, 'carry_state'):
+        return new.carry_state(old) or []
+    carried = []
+    fresh = vars(new)
+    for name, value in vars(old).items():
+        if name.isupper() or name not in fresh:
+            continue # Config comes from the new code; dropped attributes stay dropped
+        current = fresh[name]
+        if type(value) is not type(current) and not (_is_number(value) and _is_number(current)):
+            continue # Types from the reloaded module, or a changed representation
+        if getattr(value, 'shape', None) != getattr(current, 'shape', None):
+            continue # Arrays resized by the new code
+        setattr(new, name, value)
+        carried.append(name)
+    return carried
+
+def spawn_logic(logic):
+    """A fresh instance of a running preset with its current configuration (one more player)"""
+    if hasattr(logic, 'spawn'):
+        spawned = logic.spawn()
+    else:
+        spawned = type(logic)()
+        for name, value in vars(logic).items():
+            if name.isupper():
+                setattr(spawned, name, copy.copy(value)) # Settings applied since load, not shared
+    if hasattr(logic, 'clock'):
+        spawned.clock = logic.clock
+    return spawned
+
+class PresetWatcher:
+    """Polls presets/*/logic.py modification times; changed() lists presets edited since the last call"""
+
+    def __init__(self, preset_dir=PRESET_DIR):
+        self.preset_dir = preset_dir
+        self.mtimes = self._scan()
+
+    def _scan(self):
+        mtimes = {}
+        if not os.path.isdir(self.preset_dir):
+            return mtimes
+        for d in os.listdir(self.preset_dir):
+            try:
+                mtimes[d] = os.stat(logic_path(d, self.preset_dir)).st_mtime_ns
+            except OSError:
+                pass
+        return mtimes
+
+    def changed(self):
+        """Names of presets whose logic.py changed or appeared"""
+        current = self._scan()
+        changed = [name for name, mtime in current.items() if self.mtimes.get(name) != mtime]
+        self.mtimes = current
+        return changed
+
+def resolve_logic(registry, profile):
+    """Active profile -> logic, with the bridge's fallback chain"""
+    logic = registry.get(profile)
+    if not logic:
+        # Fallback chain for Beta
+        logic = registry.get("asphalt") or registry.get("tekken")
+    return logic
+
+def setting_attr(key):
+    """UI setting key -> preset attribute (steerSensitivity -> STEER_SENSITIVITY)"""
+    return "".join([f"_{c.lower()}" if c.isupper() else c for c in key]).upper()
+
+def apply_settings(logic, settings, log=print):
+    """Applies a SET_SETTINGS payload to a preset logic instance"""
+    for k, v in settings.items():
+        attr_name = setting_attr(k)
+        if hasattr(logic, attr_name):
+            setattr(logic, attr_name, v)
+            log(f"[BRIDGE] Updated {attr_name} = {v}", flush=True)
+        elif hasattr(logic, k):
+            setattr(logic, k, v)
+            log(f"[BRIDGE] Updated {k} = {v}", flush=True)
@@ -0,0 +1,410 @@
+"""
+SRIKA Preset Schema
+Declarative presets: features, rules and outputs described as data and
+compiled once, at load time, into an evaluator the bridge runs like any
+ControllerLogic. Store presets (.srk) ship a definition instead of Python.
+
+    {
+      "features": {
+        "tilt":    {"delta": ["left_wrist", "right_wrist"], "axis": "y"},
+        "reach_l": {"distance": ["left_wrist", "left_shoulder"]},
+        "reach_r": {"distance": ["right_wrist", "right_shoulder"]},
+        "reach":   {"mean": ["reach_l", "reach_r"]}
+      },
+      "buttons": [
+        {"token": "ACCEL", "when": [["reach", ">", 0.16]], "release": [["reach", "<", 0.08]]}
+      ],
+      "axes": [
+        {"token": "steer", "feature": "tilt", "range": -0.35, "curve": 1.4, "deadzone": 0.02, "response": 0.7}
+      ]
+    }
+
+Features (pose joints by MediaPipe name or index):
+    distance [a, b]      2D distance ("dims": 3 for 3D)
+    delta    [a, b]      a - b along "axis"
+    coord    joint       position along "axis"
+    angle    [a, b, c]   angle ABC in degrees
+    velocity joint       velocity along "axis" (units / s, EMA "smoothing"), reduced over the
+                         last "window" frames by "peak": min / max / peak / latest (kinematics.py)
+    hand     label       hand_features.py "feature" of the 'Left' / 'Right' hand (0 when missing)
+    mean / max_abs [names]   of other features (derived features may only use earlier ones)
+  Geometric features take "scale": "shoulders" to divide by the shoulder width.
+
+Buttons (evaluated in order; a button's token is emitted while it is active):
+    when / when_any  conditions [feature, op, value]: all of `when`, or all of any one list
+    release          hysteresis latch: once on, stays on until every release condition holds
+    hold_frames      consecutive frames the condition must hold first
+    cooldown         seconds between emissions, shared by buttons with the same "cooldown_group"
+    unless           tokens emitted earlier this frame that suppress this one
+    compete, energy  only the button with the largest |energy| in a compete group may fire
+Axes (after the buttons) emit "<token>:<value>": feature / range, clipped to [-1, 1],
+sign * |v| ** curve, zeroed inside the deadzone, smoothed (response = weight of the new value),
+omitted while |value| <= min_output.
+
+"critical": false lets the bridge evaluate the preset every other frame when it
+runs late (frame_scheduler.py): fine for held axes, not for short strikes.
+
+A store item's engine_config overrides every axis: deadzone, curve and smoothing
+(fraction of the previous value kept, response = 1 - smoothing). SET_SETTINGS
+retunes them live through the DEADZONE / CURVE / SMOOTHING attributes.
+"""
+
+import time
+import operator
+
+import numpy as np
+
+from landmark_frame import LandmarkFrame, POSE_JOINTS, joint_distances, joint_angles, joint_index, X, Y, Z
+from kinematics import KinematicsEngine, FrameTimer, FRAME_STALE, FRAME_GAP
+from hand_features import HAND_SLOTS, FEATURE_NAMES
+from frame_features import feature_cache
+
+AXIS_NAMES = {'x': X, 'y': Y, 'z': Z}
+OPERATORS = {'>': operator.gt, '<': operator.lt, '>=': operator.ge, '<=': operator.le}
+PEAKS = ('min', 'max', 'peak', 'latest')
+ENGINE_KEYS = ('deadzone', 'curve', 'smoothing')
+MIN_SHOULDER_WIDTH = 0.05     # Narrower = body not tracked properly
+FALLBACK_SHOULDER_WIDTH = 0.3 # Typical width at play distance
+
+AXIS_DEFAULTS = {'range': 1.0, 'curve': 1.0, 'deadzone': 0.0, 'response': 1.0, 'min_output': 0.01, 'decimals': 2}
+
+
+def _joint(name):
+    try:
+        index = joint_index(name, POSE_JOINTS)
+    except KeyError:
+        raise ValueError(f"Unknown joint {name!r}") from None
+    if not isinstance(index, int) or not 0 <= index < len(POSE_JOINTS):
+        raise ValueError(f"Unknown joint {name!r}")
+    return index
+
+def _axis(spec, name):
+    axis = spec.get('axis')
+    if axis not in AXIS_NAMES:
+        raise ValueError(f"Feature {name!r}: axis must be one of x / y / z")
+    return AXIS_NAMES[axis]
+
+def _all_of(terms):
+    """[(slot, op, value)] -> f(values): every term holds"""
+    if len(terms) == 1:
+        (i, op, v), = terms
+        return lambda f: op(f[i], v)
+    return lambda f: all(op(f[i], v) for i, op, v in terms)
+
+def _any_of(groups):
+    tests = [_all_of(g) for g in groups]
+    return lambda f: any(test(f) for test in tests)
+
+
+class _Button:
+    __slots__ = ('token', 'when', 'release', 'hold_frames', 'cooldown', 'group', 'unless',
+                 'compete', 'energy', 'latched', 'run')
+
+    def __init__(self, token):
+        self.token = token
+        self.release = None
+        self.latched = False
+        self.run = 0
+
+
+class _Axis:
+    __slots__ = ('token', 'slot', 'spec', 'range', 'curve', 'deadzone', 'response', 'min_output', 'format', 'value')
+
+    def __init__(self, token, slot, spec):
+        self.token = token
+        self.slot = slot
+        self.spec = spec
+        self.value = 0.0
+
+    def configure(self, engine_config):
+        params = dict(AXIS_DEFAULTS)
+        params.update({k: v for k, v in self.spec.items() if k in AXIS_DEFAULTS})
+        if 'deadzone' in engine_config: params['deadzone'] = engine_config['deadzone']
+        if 'curve' in engine_config: params['curve'] = engine_config['curve']
+        if 'smoothing' in engine_config: params['response'] = 1.0 - engine_config['smoothing']
+        if not params['range']:
+            raise ValueError(f"Axis {self.token!r}: range must be non-zero")
+        self.range = params['range']
+        self.curve = params['curve']
+        self.deadzone = params['deadzone']
+        self.response = params['response']
+        self.min_output = params['min_output']
+        self.format = f"{self.token}:{{:.{int(params['decimals'])}f}}"
+
+
+class CompiledPreset:
+    """
+    A definition compiled into an evaluator with the ControllerLogic interface
+    (process / process_frame, uppercase settings, `clock`).
+    """
+
+    def __init__(self, definition, engine_config=None, preset_id=""):
+        self.preset_id = preset_id
+        self.definition = definition
+        self.engine_config = {k: v for k, v in (engine_config or {}).items() if k in ENGINE_KEYS}
+        self.DT_FALLBACK = definition.get('dt_fallback', 0.016)
+        self.MAX_FRAME_GAP = definition.get('max_frame_gap', 0.25)
+        self.LANDMARK_FILTER = definition.get('landmark_filter')
+        self.GESTURE_TEMPLATES = list(definition.get('gesture_templates', []))
+        self.CRITICAL = definition.get('critical', True)
+        self.clock = time.time # Only for frames without a capture timestamp; replaced by replay tooling
+        self.timer = FrameTimer(self.DT_FALLBACK, self.MAX_FRAME_GAP)
+        self.kinematics = None
+        self._last_fire = {}
+
+        start = time.perf_counter()
+        self._compile_features(definition.get('features') or {})
+        self._compile_buttons(definition.get('buttons') or [])
+        self._compile_axes(definition.get('axes') or [])
+        self.compile_ms = (time.perf_counter() - start) * 1000
+
+    def spawn(self):
+        """Same definition, fresh state (one more player, preset_loader.spawn_logic)"""
+        return CompiledPreset(self.definition, self.engine_config, self.preset_id)
+
+    # ==========================================
+    # COMPILATION
+    # ==========================================
+    def _compile_features(self, features):
+        """Groups features by kind, so each kind is one array expression per frame"""
+        d2, d3, delta, coord, angle, hand, derived, scaled = [], [], [], [], [], [], [], []
+        velocity = {} # (window, peak) -> [(name, joint, axis)]
+        smoothing = {}
+        for name, spec in features.items():
+            if not isinstance(spec, dict):
+                raise ValueError(f"Feature {name!r} must be an object")
+            if 'distance' in spec:
+                a, b = map(_joint, spec['distance'])
+                (d3 if spec.get('dims', 2) == 3 else d2).append((name, a, b))
+            elif 'delta' in spec:
+                a, b = map(_joint, spec['delta'])
+                delta.append((name, a, b, _axis(spec, name)))
+            elif 'coord' in spec:
+                coord.append((name, _joint(spec['coord']), _axis(spec, name)))
+            elif 'angle' in spec:
+                angle.append((name, *map(_joint, spec['angle'])))
+            elif 'velocity' in spec:
+                joint, axis = _joint(spec['velocity']), _axis(spec, name)
+                alpha = float(spec.get('smoothing', 1.0))
+                if smoothing.setdefault((joint, axis), alpha) != alpha:
+                    raise ValueError(f"Feature {name!r}: conflicting smoothing for the same joint axis")
+                peak = spec.get('peak', 'latest')
+                if peak not in PEAKS:
+                    raise ValueError(f"Feature {name!r}: peak must be one of {', '.join(PEAKS)}")
+                velocity.setdefault((int(spec.get('window', 1)), peak), []).append((name, joint, axis))
+            elif 'hand' in spec:
+                if spec['hand'] not in HAND_SLOTS or spec.get('feature') not in FEATURE_NAMES:
+                    raise ValueError(f"Feature {name!r}: hand must be Left / Right with a feature from {FEATURE_NAMES}")
+                hand.append((name, HAND_SLOTS[spec['hand']], FEATURE_NAMES.index(spec['feature'])))
+            elif 'mean' in spec or 'max_abs' in spec:
+                derived.append((name, spec))
+            else:
+                raise ValueError(f"Feature {name!r} has no known kind")
+            if spec.get('scale') == 'shoulders':
+                scaled.append(name)
+            elif spec.get('scale') is not None:
+                raise ValueError(f"Feature {name!r}: scale must be 'shoulders'")
+
+        segments = []
+        if d2:
+            a, b = [g[1] for g in d2], [g[2] for g in d2]
+            segments.append(([g[0] for g in d2], lambda frame, a=a, b=b: joint_distances(frame.pose, a, b)))
+        if d3:
+            a3, b3 = [g[1] for g in d3], [g[2] for g in d3]
+            segments.append(([g[0] for g in d3], lambda frame, a=a3, b=b3: joint_distances(frame.pose, a, b, dims=3)))
+        if delta:
+            # One gather of both ends; the difference is Python float math on the float32 values
+            joints = np.array([g[1] for g in delta] + [g[2] for g in delta])
+            axes = np.array([g[3] for g in delta] * 2)
+            def delta_values(frame, joints=joints, axes=axes, n=len(delta)):
+                v = frame.pose[joints, axes].tolist()
+                return [v[i] - v[i + n] for i in range(n)]
+            segments.append(([g[0] for g in delta], delta_values))
+        if coord:
+            cj, cx = np.array([g[1] for g in coord]), np.array([g[2] for g in coord])
+            segments.append(([g[0] for g in coord], lambda frame, joint=cj, axis=cx: frame.pose[joint, axis].tolist()))
+        if angle:
+            aa, ab, ac = ([g[k] for g in angle] for k in (1, 2, 3))
+            segments.append(([g[0] for g in angle], lambda frame, a=aa, b=ab, c=ac: joint_angles(frame.pose, a, b, c)))
+        if velocity:
+            alpha = np.ones((len(POSE_JOINTS), 3))
+            for (joint, axis), a in smoothing.items():
+                alpha[joint, axis] = a
+            self.kinematics = KinematicsEngine(smoothing=alpha, track_acceleration=False,
+                                               history=max(w for w, _ in velocity))
+            for (window, peak), channels in velocity.items():
+                sub = self.kinematics.subscribe([c[1] for c in channels], [c[2] for c in channels], window=window)
+                reduce = (lambda s: s.latest) if peak == 'latest' else getattr(type(sub), peak)
+                segments.append(([c[0] for c in channels], lambda frame, sub=sub, reduce=reduce: reduce(sub).tolist()))
+        if hand:
+            def hand_values(frame, refs=[(g[1], g[2]) for g in hand]):
+                rows = feature_cache(self).get(frame, 'hand_features')
+                return [rows[slot][k] for slot, k in refs]
+            segments.append(([g[0] for g in hand], hand_values))
+
+        self.slots = {}
+        for names, _ in segments:
+            for name in names:
+                self.slots[name] = len(self.slots)
+        self._segments = [produce for _, produce in segments]
+        self._scaled = [self.slots[name] for name in scaled if name in self.slots]
+
+        self._derived = []
+        for name, spec in derived:
+            kind = 'mean' if 'mean' in spec else 'max_abs'
+            refs = [self._slot(ref, name) for ref in spec[kind]]
+            if not refs:
+                raise ValueError(f"Feature {name!r}: {kind} needs at least one feature")
+            if kind == 'mean':
+                n = len(refs)
+                self._derived.append(lambda f, refs=refs, n=n: sum([f[i] for i in refs]) / n)
+            else:
+                self._derived.append(lambda f, refs=refs: max([abs(f[i]) for i in refs]))
+            self.slots[name] = len(self.slots)
+
+    def _slot(self, name, owner):
+        if name not in self.slots:
+            raise ValueError(f"{owner!r}: unknown (or later) feature {name!r}")
+        return self.slots[name]
+
+    def _conditions(self, terms, owner):
+        compiled = []
+        for term in terms:
+            if len(term) != 3 or term[1] not in OPERATORS:
+                raise ValueError(f"{owner!r}: condition must be [feature, op, value] with op in {' '.join(OPERATORS)}")
+            compiled.append((self._slot(term[0], owner), OPERATORS[term[1]], float(term[2])))
+        if not compiled:
+            raise ValueError(f"{owner!r}: empty condition list")
+        return compiled
+
+    def _compile_buttons(self, specs):
+        self._buttons = []
+        self._compete = {} # group -> buttons, in definition order
+        for spec in specs:
+            token = spec.get('token')
+            if not token:
+                raise ValueError("Button without a token")
+            button = _Button(token)
+            if 'when' in spec:
+                button.when = _all_of(self._conditions(spec['when'], token))
+            elif 'when_any' in spec:
+                button.when = _any_of([self._conditions(g, token) for g in spec['when_any']])
+            else:
+                raise ValueError(f"Button {token!r} needs 'when' or 'when_any'")
+            if 'release' in spec:
+                button.release = _all_of(self._conditions(spec['release'], token))
+            button.hold_frames = int(spec.get('hold_frames', 1))
+            button.cooldown = float(spec.get('cooldown', 0.0))
+            button.group = spec.get('cooldown_group', token)
+            button.unless = tuple(spec.get('unless', ()))
+            button.compete = spec.get('compete')
+            button.energy = self._slot(spec['energy'], token) if button.compete else None
+            if button.compete:
+                self._compete.setdefault(button.compete, []).append(button)
+            self._buttons.append(button)
+
+    def _compile_axes(self, specs):
+        self._axes = []
+        for spec in specs:
+            token = spec.get('token')
+            if not token or 'feature' not in spec:
+                raise ValueError("Axis needs a token and a feature")
+            axis = _Axis(token, self._slot(spec['feature'], token), spec)
+            axis.configure(self.engine_config)
+            self._axes.append(axis)
+
+    # ==========================================
+    # ENGINE CONFIG (SET_SETTINGS: deadzone / curve / smoothing)
+    # ==========================================
+    def _engine_value(key):
+        def get(self):
+            return self.engine_config.get(key)
+        def set(self, value):
+            self.engine_config[key] = float(value)
+            for axis in self._axes:
+                axis.configure(self.engine_config)
+        return property(get, set)
+
+    DEADZONE = _engine_value('deadzone')
+    CURVE = _engine_value('curve')
+    SMOOTHING = _engine_value('smoothing')
+    del _engine_value
+
+    # ==========================================
+    # EVALUATION
+    # ==========================================
+    def process(self, pose_lm, hands_lm=[], handedness_lm=[]):
+        return self.process_frame(LandmarkFrame.from_dicts(pose_lm, hands_lm, handedness_lm))
+
+    def process_frame(self, frame):
+        if not frame.has_pose:
+            return []
+        status, now, dt = self.timer.step(frame.capture_ts, self.clock)
+        if self.kinematics is not None:
+            # Velocities need ordered frames, and no velocity across a gap
+            if status == FRAME_STALE:
+                return []
+            if status == FRAME_GAP:
+                self.kinematics.reset()
+                self.kinematics.prime(frame.pose)
+                return []
+            self.kinematics.update(frame.pose, dt)
+
+        f = self.features(frame)
+
+        tokens = []
+        winners = {group: max(members, key=lambda b: abs(f[b.energy])) for group, members in self._compete.items()}
+        for b in self._buttons:
+            on = b.when(f)
+            if b.release is not None:
+                b.latched = not b.release(f) if b.latched else on
+                on = b.latched
+            b.run = b.run + 1 if on else 0
+            if b.run < b.hold_frames:
+                continue
+            if b.unless and any(t in tokens for t in b.unless):
+                continue
+            if b.compete is not None and (winners[b.compete] is not b or not f[b.energy]):
+                continue
+            if b.cooldown:
+                if now - self._last_fire.get(b.group, float('-inf')) <= b.cooldown:
+                    continue
+                self._last_fire[b.group] = now
+            tokens.append(b.token)
+
+        for a in self._axes:
+            value = f[a.slot] / a.range
+            value = max(-1.0, min(1.0, value))
+            sign = 1.0 if value >= 0 else -1.0
+            curved = sign * (abs(value) ** a.curve)
+            if abs(curved) < a.deadzone:
+                curved = 0.0
+            a.value += (curved - a.value) * a.response
+            if abs(a.value) > a.min_output:
+                tokens.append(a.format.format(a.value))
+        return tokens
+
+    def features(self, frame):
+        """Flat feature values for the frame, indexed by self.slots"""
+        f = []
+        for produce in self._segments:
+            f += produce(frame)
+        if self._scaled:
+            width = feature_cache(self).get(frame, 'shoulder_width')
+            if width < MIN_SHOULDER_WIDTH: width = FALLBACK_SHOULDER_WIDTH
+            for i in self._scaled:
+                f[i] /= width
+        for derive in self._derived:
+            f.append(derive(f))
+        return f
+
+
+def compile_store_preset(item):
+    """Store / inventory item ({"id", "definition", "engine_config", "gesture_templates"}) -> CompiledPreset"""
+    definition = item.get('definition')
+    if not isinstance(definition, dict):
+        raise ValueError(f"Preset {item.get('id')!r} has no definition")
+    preset = CompiledPreset(definition, item.get('engine_config'), item.get('id', ""))
+    if item.get('gesture_templates'):
+        preset.GESTURE_TEMPLATES = list(item['gesture_templates'])
+    return preset
@@ -14,6 +14,7 @@ STEAM_API_DLL = "steam_api64.dll"
 # Pulse Logic Config
 PULSE_DURATION = 0.1  # Seconds to hold button
 PULSE_COOLDOWN = 0.5  # Seconds before next trigger
+CALLBACK_INTERVAL = 0.016  # Steam run_callbacks cadence (~60hz)
 
 # ==========================================
 # STEAMWORKS SDK LOADING
@@ -150,10 +151,30 @@ def process_command(cmd):
             nitro_last_time = now
             print("ACTION:NITRO_PULSE", flush=True)
 
+# ==========================================
+# INPUT
+# ==========================================
+def read_stdin():
+    for line in iter(sys.stdin.readline, ''):
+        input_queue.put(line.strip())
+    input_queue.put(None) # EOF: wake the main loop
+
+def wait_for_commands(timeout=None):
+    """Blocks until a command arrives (or timeout), then drains the queue"""
+    batch = []
+    try:
+        batch.append(input_queue.get(timeout=timeout))
+        while batch[-1] is not None:
+            batch.append(input_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
+
 # ==========================================
 # MAIN LOOP
 # ==========================================
 def main():
+    global running, nitro_last_time
     print("ASPHALT_BRIDGE_STARTED", flush=True)
     
     if initialize_steam():
@@ -166,10 +187,15 @@ def main():
     
     print("ASPHALT_BRIDGE_READY_FOR_INPUT", flush=True)
     
+    next_callback_time = 0
+    
     while running:
-        # 1. Process Input
-        while not input_queue.empty():
-            cmd = input_queue.get_nowait()
+        # 1. Process Input (Wake on data, or on the next Steam callback deadline)
+        timeout = max(0.0, next_callback_time - time.time()) if steam else None
+        for cmd in wait_for_commands(timeout):
+            if cmd is None:
+                running = False
+                break
             if not cmd: continue
             
             # Reset defaults
@@ -230,15 +256,16 @@ def main():
                         steam.Input().TriggerDigitalAction(h_brake, True)
 
         # 3. Run Frame
-        try:
-            if steam: steam.run_callbacks()
-        except: pass
-        
-        time.sleep(0.016) # 60hz
+        now = time.time()
+        if steam and now >= next_callback_time:
+            next_callback_time = now + CALLBACK_INTERVAL
+            try:
+                steam.run_callbacks()
+            except: pass
 
 if __name__ == "__main__":
     # Input thread
-    t = threading.Thread(target=lambda: [input_queue.put(sys.stdin.readline().strip()) for _ in iter(sys.stdin.readline, '')], daemon=True)
+    t = threading.Thread(target=read_stdin, daemon=True)
     t.start()
     
     try:
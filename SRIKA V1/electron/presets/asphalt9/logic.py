@@ -1,5 +1,8 @@
-import math
-import time
+import numpy as np
+
+from landmark_frame import LandmarkFrame, distances, Y
+from hand_features import hand_features, session_hand_slots, PRESENT, FOLD_RATIO, THUMB_INDEX, THUMB_WRIST
+from frame_features import feature_cache, POSE_PAIRS_A, POSE_PAIRS_B
 
 class ControllerLogic:
     def __init__(self):
@@ -7,6 +10,10 @@ class ControllerLogic:
         self.STEER_DEADZONE = 0.02    # Micro-deadzone for precision
         self.STEER_SENSITIVITY = 0.35 # Balanced: responsive but not twitchy
         self.CURVE_POWER = 1.4        # Slightly more linear response
+        self.STEER_SMOOTHING = 0.70   # Light: landmarks arrive pre-filtered (LANDMARK_FILTER)
+        self.LANDMARK_FILTER = {'type': 'one_euro', 'min_cutoff': 1.0, 'beta': 20.0}
+        self.GESTURE_TEMPLATES = [] # Recorded motion templates (gesture_templates.py)
+        self.CRITICAL = False # Held steer / throttle: may run every other frame when the bridge is late (frame_scheduler.py)
         self.THROTTLE_ON_THRESHOLD = 0.16
         self.THROTTLE_OFF_THRESHOLD = 0.08
         
@@ -14,6 +21,7 @@ class ControllerLogic:
         self.BUFFER_THRESHOLD = 3 
         
         # State
+        self.debug_output = True # PRESET_DEBUG lines (turned off by the frame scheduler when late)
         self.smoothed_steer = 0.0
         self.was_holding_wheel = False
         self.last_steer = 0.0
@@ -30,16 +38,22 @@ class ControllerLogic:
         Process pose and hand landmarks.
         hands_lm is a list of lists (up to 2 hands, 21 points each)
         """
+        return self.process_frame(LandmarkFrame.from_dicts(pose_lm, hands_lm, handedness_lm))
+
+    def process_frame(self, frame):
+        """Same as process() for an array-backed LandmarkFrame"""
+        if not frame.has_pose:
+            return [] # No body: steering and throttle hold until it is back
         tokens = []
+        pose = frame.pose
+        features = feature_cache(self) # Shared with the other stages of this frame
         
         # --- LAYER 1: GESTURE DETECTION ---
-        l_wrist = pose_lm[15]
-        r_wrist = pose_lm[16]
-        l_shoulder = pose_lm[11]
-        r_shoulder = pose_lm[12]
+        torso_size, l_dist, r_dist = features.get(frame, 'pose_distances')
+        l_wrist_y, r_wrist_y = pose[[15, 16], Y].tolist()
         
         # 1. Steering (Non-Linear Power Curve)
-        raw_dy = l_wrist['y'] - r_wrist['y']
+        raw_dy = l_wrist_y - r_wrist_y
         norm_steer = -(raw_dy / self.STEER_SENSITIVITY)
         norm_steer = max(-1.0, min(1.0, norm_steer))
         
@@ -50,55 +64,34 @@ class ControllerLogic:
         if abs(curved_steer) < self.STEER_DEADZONE:
             curved_steer = 0.0
             
-        self.smoothed_steer += (curved_steer - self.smoothed_steer) * 0.40 # Responsive smoothing
+        self.smoothed_steer += (curved_steer - self.smoothed_steer) * self.STEER_SMOOTHING
         final_steer = self.smoothed_steer
 
         # --- SCALE FACTOR ---
-        torso_size = self._get_distance(l_shoulder, r_shoulder)
         if torso_size < 0.05: torso_size = 0.3
 
         # 2. Key Hand Gestures (Nitro & Brake)
         raw_nitro_signal = False
         raw_brake_signal = False
         
-        if hands_lm and len(hands_lm) > 0:
-            for i, hand in enumerate(hands_lm):
-                # 1. Calculate Robust Palm Size
-                wrist = hand[0]
-                mcp_indices = [5, 9, 13, 17] 
-                palm_scale = sum(self._get_distance(wrist, hand[k]) for k in mcp_indices) / 4
-                if palm_scale < 0.01: continue
-                
-                # 2. Key Landmarks
-                thumb_tip = hand[4]
-                index_mcp = hand[5]
-                tips = [hand[8], hand[12], hand[16], hand[20]]
-                mcps = [hand[5], hand[9], hand[13], hand[17]]
-                
-                # 3. Gesture Math
-                avg_fold = sum(self._get_distance(tips[j], mcps[j]) for j in range(4)) / 4
-                fold_ratio = avg_fold / palm_scale
+        if frame.hand_count:
+            # Palm / fold / thumb features for both hands in one pass (zeros for a missing hand)
+            left, right = features.get(frame, 'hand_features')
+            for f in (left, right):
+                if not f[PRESENT]: continue
                 
                 # NITRO: Tucked Fist + Thumb Flared (Any Hand) - STRICTER
-                tip_to_index_scale = self._get_distance(thumb_tip, index_mcp) / palm_scale
-                tip_to_wrist_scale = self._get_distance(thumb_tip, wrist) / palm_scale
                 # Require very deliberate thumb extension
-                thumb_extended = tip_to_index_scale > 1.50 and tip_to_wrist_scale > 1.70
-                fingers_closed = fold_ratio < 0.40
+                thumb_extended = f[THUMB_INDEX] > 1.50 and f[THUMB_WRIST] > 1.70
+                fingers_closed = f[FOLD_RATIO] < 0.40
                 
                 if fingers_closed and thumb_extended:
                     raw_nitro_signal = True
-                
-                # BRAKE: Open Palm (LEFT Hand Only) - STRICTER
-                # Filter by X-position relative to shoulders to be sure it's the LEFT physical hand
-                hand_x = wrist['x']
-                is_left_physical = hand_x < (l_shoulder['x'] + r_shoulder['x']) / 2
-                
-                # Open Palm: require very flat hand
-                is_open_palm = fold_ratio > 0.95
-                
-                if is_left_physical and is_open_palm:
-                    raw_brake_signal = True
+            
+            # BRAKE: Open Palm (LEFT Hand Only, by handedness) - STRICTER
+            # Open Palm: require very flat hand
+            if left[PRESENT] and left[FOLD_RATIO] > 0.95:
+                raw_brake_signal = True
         
         # 4. Buffers
         if raw_nitro_signal: self.nitro_frames += 1
@@ -111,8 +104,6 @@ class ControllerLogic:
         brake_active = self.brake_frames >= self.BRAKE_BUFFER
         
         # 5. Throttle
-        l_dist = self._get_distance(l_wrist, l_shoulder)
-        r_dist = self._get_distance(r_wrist, r_shoulder)
         avg_dist = (l_dist + r_dist) / 2
         
         if self.was_holding_wheel:
@@ -143,12 +134,73 @@ class ControllerLogic:
             tokens.append(f"steer:{self.last_steer:.2f}")
 
         # Debug logging
-        if nitro_active or brake_active or abs(self.last_steer) > 0.3:
+        if self.debug_output and (nitro_active or brake_active or abs(self.last_steer) > 0.3):
             print(f"PRESET_DEBUG: Racing Stick={self.last_steer:.2f} Nitro={nitro_active} Brake={brake_active}", flush=True)
 
         return tokens
 
-    def _get_distance(self, p1, p2):
-        return math.sqrt((p1['x'] - p2['x'])**2 + (p1['y'] - p2['y'])**2)
+    def process_batch(self, session):
+        """
+        Offline: token timeline for a whole preset_batch.BatchSession (fresh state,
+        streaming state untouched). Matches process_frame() frame by frame.
+        """
+        from preset_batch import scatter_timeline
+        from landmark_filter import filter_session
+
+        session = filter_session(self, session)
+        if not session.has_pose.all(): # Frames without a body drive nothing (process_frame)
+            posed = np.flatnonzero(session.has_pose)
+            return scatter_timeline(self._batch_timeline(session.take(posed)), posed, len(session))
+        return self._batch_timeline(session)
+
+    def _batch_timeline(self, session):
+        """process_batch() of a filtered session whose frames all have a pose"""
+        from preset_batch import run_lengths, hysteresis
+
+        poses = session.poses
+        n = len(poses)
+
+        # --- LAYER 1: GESTURE DETECTION ---
+        pose_d = distances(poses[:, POSE_PAIRS_A].astype(np.float64), poses[:, POSE_PAIRS_B].astype(np.float64))
+        wrist_y = poses[:, [15, 16], Y].astype(np.float64)
+
+        # 1. Steering curve over the whole session
+        norm_steer = np.clip(-((wrist_y[:, 0] - wrist_y[:, 1]) / self.STEER_SENSITIVITY), -1.0, 1.0)
+        sign = np.where(norm_steer >= 0, 1.0, -1.0)
+        power = self.CURVE_POWER
+        curved = sign * np.array([a ** power for a in np.abs(norm_steer).tolist()]) # Python pow, as in streaming
+        curved[np.abs(curved) < self.STEER_DEADZONE] = 0.0
+        steer = []
+        s, k = 0.0, self.STEER_SMOOTHING
+        for c in curved.tolist():
+            s += (c - s) * k
+            steer.append(s)
+
+        # 2. Hand gestures for every frame / hand slot at once
+        feats = hand_features(*session_hand_slots(session.hands, session.hand_counts, session.right_hands))
+        valid = feats[..., PRESENT] > 0
+        fold_ratio = feats[..., FOLD_RATIO]
+        thumb_extended = (feats[..., THUMB_INDEX] > 1.50) & (feats[..., THUMB_WRIST] > 1.70)
+        raw_nitro = (valid & (fold_ratio < 0.40) & thumb_extended).any(axis=1)
+        raw_brake = valid[:, 0] & (fold_ratio[:, 0] > 0.95)
+
+        # 4. Buffers
+        nitro_active = run_lengths(raw_nitro) >= self.NITRO_BUFFER
+        brake_active = run_lengths(raw_brake) >= self.BRAKE_BUFFER
+
+        # 5. Throttle (hysteresis latch)
+        avg_dist = (pose_d[:, 1] + pose_d[:, 2]) / 2
+        holding = hysteresis(avg_dist > self.THROTTLE_ON_THRESHOLD, avg_dist < self.THROTTLE_OFF_THRESHOLD)
+        accel = holding & ~(brake_active | nitro_active)
+
+        # --- LAYER 2: INTENT RESOLVER ---
+        action = np.select([brake_active, nitro_active, accel], ['B', 'A', 'ACCEL'], '').tolist()
+        timeline = []
+        for i in range(n):
+            tokens = [action[i]] if action[i] else []
+            if abs(steer[i]) > 0.01:
+                tokens.append(f"steer:{steer[i]:.2f}")
+            timeline.append(tokens)
+        return timeline
 
 logic = ControllerLogic()
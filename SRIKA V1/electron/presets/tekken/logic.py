@@ -1,6 +1,18 @@
-import math
 import time
 
+import numpy as np
+
+from landmark_frame import LandmarkFrame, angles, X, Y, Z
+from kinematics import KinematicsEngine, FrameTimer, FRAME_STALE, FRAME_GAP
+from frame_features import feature_cache, ELBOW_A, ELBOW_B, ELBOW_C
+
+# Tracked velocity channels: (pose index, axis)
+# 15=L_Wrist, 16=R_Wrist, 25=L_Knee, 26=R_Knee
+VELOCITY_KEYS = ('lWristZ', 'rWristZ', 'lKneeY', 'rKneeY', 'lWristY', 'rWristY')
+VELOCITY_JOINTS = np.array([15, 16, 25, 26, 15, 16])
+VELOCITY_AXES = np.array([Z, Z, Y, Y, Y, Y])
+L_PUNCH, R_PUNCH, L_KICK, R_KICK, L_UP, R_UP = range(6)
+
 class ControllerLogic:
     def __init__(self):
         # Configuration (Identical to TypeScript)
@@ -12,57 +24,86 @@ class ControllerLogic:
         # Debounce/Cooldown
         self.last_action_time = 0
         self.ACTION_COOLDOWN = 0.25 # 250ms between hits
+        self.DT_FALLBACK = 0.016 # Fallback to 60fps
+        self.MAX_FRAME_GAP = 0.25 # Longer without a body = new motion (no velocity across the gap)
         
-        # Smoothing
+        # Smoothing (Z is noisier than Y)
         self.Z_SMOOTHING = 0.4
+        self.Y_SMOOTHING = 0.3
+        self.HISTORY_SIZE = 3
+        # Landmark pre-filter (landmark_filter.py): smooths the resting guard, lets strikes through
+        self.LANDMARK_FILTER = {'type': 'one_euro', 'min_cutoff': 1.0, 'beta': 20.0, 'd_cutoff': 5.0}
+        # Recorded motion templates (gesture_templates.py), e.g. shipped by a .srk preset
+        self.GESTURE_TEMPLATES = []
+        self.CRITICAL = True # Strikes last a few frames: never evaluated at half rate (frame_scheduler.py)
+        self.smoothing = np.array([self.Z_SMOOTHING] * 2 + [self.Y_SMOOTHING] * 4)
         
         # State
-        self.last_landmarks = None
-        self.last_time = 0
-        self.velocities = {
-            'lWristZ': 0, 'rWristZ': 0, 
-            'lKneeY': 0, 'rKneeY': 0,
-            'lWristY': 0, 'rWristY': 0
-        }
-        self.velocity_history = {
-            'lGlobalZ': [], 'rGlobalZ': [],
-            'lGlobalY': [], 'rGlobalY': [],
-            'lUpY': [], 'rUpY': []
-        }
+        self.debug_output = True # PRESET_DEBUG lines (turned off by the frame scheduler when late)
+        self.clock = time.time # Only for frames without a capture timestamp; replaced by replay / batch tooling
+        self.timer = FrameTimer(self.DT_FALLBACK, self.MAX_FRAME_GAP)
+        # Per-axis EMA (x, y, z) for every joint; peaks come from the tracked channels' window
+        self.kinematics = KinematicsEngine(smoothing=(self.Y_SMOOTHING, self.Y_SMOOTHING, self.Z_SMOOTHING),
+                                           track_acceleration=False)
+        self.velocity_window = self.kinematics.subscribe(VELOCITY_JOINTS, VELOCITY_AXES, window=self.HISTORY_SIZE)
+        self._motion_config = (self.Z_SMOOTHING, self.Y_SMOOTHING, self.HISTORY_SIZE) # What the motion model was built with
 
     def process(self, pose_lm, hands_lm=[], handedness_lm=[]):
         """
         Process raw landmarks and return a list of active tokens (u, i, j, k, p)
         """
-        landmarks = pose_lm
-        now = time.time()
-        dt = now - self.last_time
-        if dt <= 0: dt = 0.016 # Fallback to 60fps
-        self.last_time = now
-
-        if not self.last_landmarks:
-            self.last_landmarks = landmarks
+        return self.process_frame(LandmarkFrame.from_dicts(pose_lm, hands_lm, handedness_lm))
+
+    def _sync_motion(self):
+        """Applies Z_SMOOTHING / Y_SMOOTHING / HISTORY_SIZE changed since the last frame (SET_SETTINGS)"""
+        config = (self.Z_SMOOTHING, self.Y_SMOOTHING, self.HISTORY_SIZE)
+        if config == self._motion_config:
+            return
+        self._motion_config = config
+        z, y, window = config
+        per_axis = np.array([y, y, z], dtype=np.float64)
+        self.smoothing = np.array([z] * 2 + [y] * 4)
+        # The EMA weights change in place (the motion so far is kept); a new window starts empty
+        engine = self.kinematics
+        engine.alpha = np.broadcast_to(per_axis, engine.alpha.shape).copy()
+        engine.keep = 1 - engine.alpha
+        if self.velocity_window.window != max(1, int(window)):
+            engine.subscriptions.remove(self.velocity_window)
+            self.velocity_window = engine.subscribe(VELOCITY_JOINTS, VELOCITY_AXES, window=window)
+
+    def process_frame(self, frame):
+        """Same as process() for an array-backed LandmarkFrame"""
+        if not frame.has_pose:
+            return []
+        self._sync_motion()
+
+        # dt from camera capture time, so queueing / bursty delivery does not fake velocity spikes
+        status, now, dt = self.timer.step(frame.capture_ts, self.clock)
+        if status == FRAME_STALE:
+            return []
+        if status == FRAME_GAP:
+            self.kinematics.reset()
+            self.kinematics.prime(frame.pose)
             return []
 
         # 1. Update Physics
-        self._update_physics(landmarks, dt)
-        self.last_landmarks = landmarks
+        self.kinematics.update(frame.pose, dt)
 
-        # 2. Peak Detection
-        def get_peak(key):
-            buff = self.velocity_history.get(key, [])
-            return min(buff) if buff else 0
+        # 2. Peak Detection (most negative velocity in the short history)
+        return self._decide(frame, now, self.velocity_window.min().tolist())
 
-        peakL_Punch = get_peak('lGlobalZ')
-        peakR_Punch = get_peak('rGlobalZ')
-        peakL_Up = get_peak('lUpY')
-        peakR_Up = get_peak('rUpY')
-        peakL_Kick = get_peak('lGlobalY')
-        peakR_Kick = get_peak('rGlobalY')
+    def _decide(self, frame, now, peaks):
+        """Steps 2-5 of process_frame() from the tracked channels' window min"""
+        peakL_Punch = peaks[L_PUNCH]
+        peakR_Punch = peaks[R_PUNCH]
+        peakL_Up = peaks[L_UP]
+        peakR_Up = peaks[R_UP]
+        peakL_Kick = peaks[L_KICK]
+        peakR_Kick = peaks[R_KICK]
 
         # 2.5 Diagnostic (Log if motion detected)
         max_energy = max(abs(peakL_Punch), abs(peakR_Punch), abs(peakL_Kick), abs(peakR_Kick))
-        if max_energy > 0.4:
+        if self.debug_output and max_energy > 0.4:
             print(f"PRESET_DEBUG: Energy={max_energy:.2f} | Thr={self.PUNCH_THRESHOLD}", flush=True)
 
         # 3. Global Dominance Duel
@@ -74,16 +115,18 @@ class ControllerLogic:
 
         winnerEnergy = max(lArmEnergy, rArmEnergy, lLegEnergy, rLegEnergy, hBurstEnergy)
         
-        # 4. Anatomical Gates
-        lElbowAngle = self._calculate_angle(landmarks[11], landmarks[13], landmarks[15])
-        rElbowAngle = self._calculate_angle(landmarks[12], landmarks[14], landmarks[16])
+        # 4. Anatomical Gates (only needed when a punch can win the duel)
+        lElbowAngle = rElbowAngle = 0.0
+        can_fire = winnerEnergy > 0 and (now - self.last_action_time) > self.ACTION_COOLDOWN
+        if can_fire and winnerEnergy in (lArmEnergy, rArmEnergy):
+            lElbowAngle, rElbowAngle = feature_cache(self).get(frame, 'elbow_angles')
 
         # 5. Mapping with Cooldown
         tokens = []
-        if winnerEnergy > 0 and (now - self.last_action_time) > self.ACTION_COOLDOWN:
+        if can_fire:
             if hBurstEnergy == winnerEnergy and hBurstEnergy > abs(self.BURST_THRESHOLD):
-                activeWrist = landmarks[15] if abs(peakL_Up) > abs(peakR_Up) else landmarks[16]
-                if activeWrist['z'] > -0.25:
+                activeWrist = frame.pose[15] if abs(peakL_Up) > abs(peakR_Up) else frame.pose[16]
+                if activeWrist[Z] > -0.25:
                     tokens.append('RB') # Heat Burst
                     self.last_action_time = now
             elif lArmEnergy == winnerEnergy and peakL_Punch < self.PUNCH_THRESHOLD and lElbowAngle > self.MIN_ELBOW_ANGLE:
@@ -101,56 +144,77 @@ class ControllerLogic:
 
         return tokens
 
-    def _update_physics(self, landmarks, dt):
-        # indices: 15=L_Wrist, 16=R_Wrist, 25=L_Knee, 26=R_Knee
-        # indices: 11=L_Shoulder, 13=L_Elbow, 12=R_Shoulder, 14=R_Elbow
-        
-        rawLZ = (landmarks[15]['z'] - self.last_landmarks[15]['z']) / dt
-        rawRZ = (landmarks[16]['z'] - self.last_landmarks[16]['z']) / dt
-        rawLY = (landmarks[25]['y'] - self.last_landmarks[25]['y']) / dt
-        rawRY = (landmarks[26]['y'] - self.last_landmarks[26]['y']) / dt
-        rawLUpY = (landmarks[15]['y'] - self.last_landmarks[15]['y']) / dt
-        rawRUpY = (landmarks[16]['y'] - self.last_landmarks[16]['y']) / dt
-
-        # Low-Pass Filtered Velocity
-        lZ = self.velocities['lWristZ'] * (1 - self.Z_SMOOTHING) + rawLZ * self.Z_SMOOTHING
-        rZ = self.velocities['rWristZ'] * (1 - self.Z_SMOOTHING) + rawRZ * self.Z_SMOOTHING
-        lY = self.velocities['lKneeY'] * 0.7 + rawLY * 0.3 # Y is usually cleaner
-        rY = self.velocities['rKneeY'] * 0.7 + rawRY * 0.3
-        lUp = self.velocities['lWristY'] * 0.7 + rawLUpY * 0.3
-        rUp = self.velocities['rWristY'] * 0.7 + rawRUpY * 0.3
-
-        self.velocities = {
-            'lWristZ': lZ, 'rWristZ': rZ, 
-            'lKneeY': lY, 'rKneeY': rY,
-            'lWristY': lUp, 'rWristY': rUp
-        }
-
-        def update_buff(key, val):
-            buff = self.velocity_history[key]
-            buff.append(val)
-            if len(buff) > 3: buff.pop(0)
-
-        update_buff('lGlobalZ', lZ)
-        update_buff('rGlobalZ', rZ)
-        update_buff('lGlobalY', lY)
-        update_buff('rGlobalY', rY)
-        update_buff('lUpY', lUp)
-        update_buff('rUpY', rUp)
-
-    def _calculate_angle(self, a, b, c):
-        v1 = [a['x']-b['x'], a['y']-b['y'], a['z']-b['z']]
-        v2 = [c['x']-b['x'], c['y']-b['y'], c['z']-b['z']]
-        
-        dot = v1[0]*v2[0] + v1[1]*v2[1] + v1[2]*v2[2]
-        mag1 = math.sqrt(v1[0]**2 + v1[1]**2 + v1[2]**2)
-        mag2 = math.sqrt(v2[0]**2 + v2[1]**2 + v2[2]**2)
-        
-        if mag1 == 0 or mag2 == 0: return 0
-        
-        cos_angle = dot / (mag1 * mag2)
-        cos_angle = max(-1.0, min(1.0, cos_angle))
-        
-        return math.degrees(math.acos(cos_angle))
+    def process_batch(self, session):
+        """
+        Offline: token timeline for a whole preset_batch.BatchSession (fresh state,
+        streaming state untouched). Matches process_frame() frame by frame.
+        """
+        from preset_batch import scatter_timeline
+        from landmark_filter import filter_session
+
+        self._sync_motion()
+        session = filter_session(self, session)
+        if not session.has_pose.all(): # Frames without a body are skipped before any state is touched
+            posed = np.flatnonzero(session.has_pose)
+            return scatter_timeline(self._batch_timeline(session.take(posed)), posed, len(session))
+        return self._batch_timeline(session)
+
+    def _batch_timeline(self, session):
+        """process_batch() of a filtered session whose frames all have a pose"""
+        from preset_batch import frame_segments, ema, sliding_min, cooldown_gate
+
+        poses = session.poses
+        n = len(poses)
+        timeline = [[] for _ in range(n)]
+        if n < 2:
+            return timeline
+        ts = session.timestamps
+
+        # 1. Physics per gap-free segment of in-order frames (a segment's first frame only primes)
+        kept, starts = frame_segments(ts, self.MAX_FRAME_GAP)
+        channels = poses[kept][:, VELOCITY_JOINTS, VELOCITY_AXES]
+        frames, peaks = [], []
+        for a, b in zip(starts.tolist(), starts[1:].tolist() + [len(kept)]):
+            if b - a < 2:
+                continue
+            dt = np.diff(ts[kept[a:b]]).astype(np.float32) # Streaming divides float32 by dt
+            raw = (channels[a + 1:b] - channels[a:b - 1]) / dt[:, None]
+            peaks.append(sliding_min(ema(raw, self.smoothing), self.HISTORY_SIZE))
+            frames.append(kept[a + 1:b])
+        if not frames:
+            return timeline
+        frames = np.concatenate(frames)
+
+        # 2. Peak Detection
+        peaks = np.concatenate(peaks)
+        energy = np.abs(peaks)
+        burst = np.maximum(energy[:, L_UP], energy[:, R_UP])
+        winner = np.maximum.reduce([energy[:, L_PUNCH], energy[:, R_PUNCH], energy[:, L_KICK], energy[:, R_KICK], burst])
+
+        # 4. Anatomical Gates
+        arms = poses[frames].astype(np.float64) # Same precision as the per-frame float math
+        elbows = angles(arms[:, ELBOW_A], arms[:, ELBOW_B], arms[:, ELBOW_C])
+
+        # 5. Mapping (same elif chain, evaluated for every frame at once)
+        burst_branch = (burst == winner) & (burst > abs(self.BURST_THRESHOLD))
+        left_up = energy[:, L_UP] > energy[:, R_UP]
+        wrist_z = np.where(left_up, poses[frames, 15, Z], poses[frames, 16, Z])
+        rest = ~burst_branch
+        lp = rest & (energy[:, L_PUNCH] == winner) & (peaks[:, L_PUNCH] < self.PUNCH_THRESHOLD) & (elbows[:, 0] > self.MIN_ELBOW_ANGLE)
+        rest &= ~lp
+        rp = rest & (energy[:, R_PUNCH] == winner) & (peaks[:, R_PUNCH] < self.PUNCH_THRESHOLD) & (elbows[:, 1] > self.MIN_ELBOW_ANGLE)
+        rest &= ~rp
+        lk = rest & (energy[:, L_KICK] == winner) & (peaks[:, L_KICK] < self.KICK_THRESHOLD)
+        rest &= ~lk
+        rk = rest & (energy[:, R_KICK] == winner) & (peaks[:, R_KICK] < self.KICK_THRESHOLD)
+
+        rb = burst_branch & (wrist_z > -0.25)
+        candidates = (winner > 0) & (rb | lp | rp | lk | rk)
+        fired = cooldown_gate(candidates, ts[frames], self.ACTION_COOLDOWN)
+
+        labels = np.select([rb, lp, rp, lk], ['RB', 'X', 'Y', 'A'], 'B')
+        for k in np.flatnonzero(fired).tolist():
+            timeline[frames[k]] = [labels[k].item()]
+        return timeline
 
 logic = ControllerLogic()
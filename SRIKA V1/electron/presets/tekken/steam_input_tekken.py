@@ -23,6 +23,7 @@ except ImportError:
 # ==========================================
 TEKKEN_STEAM_APPID = 1778820  # Tekken 8
 TEKKEN_PROCESS_NAMES = ['TEKKEN', 'Tekken', 'TekkenGame']
+TEKKEN_DETECT_INTERVAL = 2.0  # Seconds between process scans
 
 # Action Set Definition
 DIGITAL_ACTIONS = {
@@ -189,6 +190,18 @@ def read_stdin():
         except:
             running = False
             break
+    input_queue.put(None) # EOF: wake the main loop
+
+def wait_for_commands(timeout=None):
+    """Blocks until a command arrives (or timeout), then drains the queue"""
+    batch = []
+    try:
+        batch.append(input_queue.get(timeout=timeout))
+        while batch[-1] is not None:
+            batch.append(input_queue.get_nowait())
+    except queue.Empty:
+        pass
+    return batch
 
 def process_gesture_tokens(tokens):
     """Map gesture tokens to Steam Input actions"""
@@ -255,20 +268,31 @@ def main():
     reader_thread.start()
     
     last_command = "idle"
+    next_detect_time = 0
     
     try:
         while running:
             # Check Tekken status periodically
-            tekken_running = detect_tekken()
-            if tekken_running != tekken_detected:
-                tekken_detected = tekken_running
-                # status = "DETECTED" if tekken_detected else "NOT_DETECTED"
-                # print(f"TEKKEN_STATUS:{status}", flush=True)
-                pass
+            now = time.time()
+            if now >= next_detect_time:
+                next_detect_time = now + TEKKEN_DETECT_INTERVAL
+                tekken_running = detect_tekken()
+                if tekken_running != tekken_detected:
+                    tekken_detected = tekken_running
+                    # status = "DETECTED" if tekken_detected else "NOT_DETECTED"
+                    # print(f"TEKKEN_STATUS:{status}", flush=True)
+                    pass
+
+            # Wake on data (or on the next detection deadline)
+            batch = wait_for_commands(max(0.0, next_detect_time - time.time()))
+            if not batch:
+                continue
             
             # Process input commands
-            while not input_queue.empty():
-                cmd = input_queue.get_nowait()
+            for cmd in batch:
+                if cmd is None:
+                    running = False
+                    break
                 
                 if cmd.startswith("SET_MODE:"):
                     pass # Handled by global engine state
@@ -295,8 +319,6 @@ def main():
             elif not tekken_detected and tokens:
                 print("WARNING: Input blocked - Tekken not detected", flush=True)
             
-            time.sleep(0.016)  # ~60Hz
-            
     except KeyboardInterrupt:
         pass
     except Exception as e:
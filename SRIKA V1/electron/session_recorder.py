@@ -0,0 +1,96 @@
+"""
+SRIKA Session Recorder
+Captures the landmark / control stream the bridge receives, with the
+original receive timestamps, so a real play session can be replayed
+offline (see session_replay.py).
+
+File format (text, one record per line):
+    # SRIKA_SESSION v1 started=<epoch> profile=<id>
+    <recv_ts epoch seconds> <bridge stdin line>
+
+Landmark frames are stored exactly as received (RAW_LMB / RAW_LM), so
+frame ids and capture timestamps travel with them. Token lines are only
+recorded once they pass the bridge's access gate (a LOCKED bridge drops
+them), so a replay presses what the live session pressed. CMD: lines are
+never recorded (they can carry session tokens).
+"""
+
+import os
+import time
+import threading
+
+SESSION_VERSION = 1
+SESSION_HEADER = "# SRIKA_SESSION"
+SESSION_EXT = ".srs"
+
+
+def default_session_dir():
+    return os.environ.get('SRIKA_SESSION_DIR') or os.path.join(os.path.expanduser('~'), 'SRIKA', 'sessions')
+
+def is_recordable(line):
+    return not line.startswith("CMD:")
+
+
+class SessionRecorder:
+    """Append-only session writer. record() is thread-safe and never flushes."""
+
+    def __init__(self, path=None, profile="", buffer_size=1 << 16):
+        if path is None:
+            path = os.path.join(default_session_dir(), time.strftime("session_%Y%m%d_%H%M%S") + SESSION_EXT)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.frames = 0
+        self.lines = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8', buffering=buffer_size)
+        self._file.write(f"{SESSION_HEADER} v{SESSION_VERSION} started={self.started:.6f} profile={profile}\n")
+        if profile:
+            self.record(f"SET_PROFILE:{profile}", self.started)
+
+    def record(self, line, ts=None):
+        if not is_recordable(line):
+            return
+        ts = time.time() if ts is None else ts
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(f"{ts:.6f} {line}\n")
+            self.lines += 1
+            if line.startswith("RAW_LM"):
+                self.frames += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def status(self, state):
+        return (
+            f"RECORD_STATUS: {state} | Frames={self.frames} | Lines={self.lines}"
+            f" | Duration={time.time() - self.started:.1f}s | Path={self.path}"
+        )
+
+
+def read_session(path):
+    """Returns (header dict, [(recv_ts, line), ...])"""
+    header = {}
+    records = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for raw in f:
+            raw = raw.rstrip('\n')
+            if not raw:
+                continue
+            if raw.startswith('#'):
+                if raw.startswith(SESSION_HEADER):
+                    for field in raw[len(SESSION_HEADER):].split():
+                        if '=' in field:
+                            k, v = field.split('=', 1)
+                            header[k] = v
+                        else:
+                            header['version'] = field.lstrip('v')
+                continue
+            ts, _, line = raw.partition(' ')
+            records.append((float(ts), line))
+    return header, records
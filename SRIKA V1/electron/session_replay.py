@@ -0,0 +1,242 @@
+"""
+SRIKA Session Replay
+Feeds a recorded session (session_recorder.py) back through the preset
+logic and an XboxAdapter driving a recording gamepad instead of ViGEm.
+
+Presets and the adapter read time from an injected clock that is set to
+each record's original receive timestamp, so cooldowns, hold times and
+velocities replay identically at any speed:
+
+    --speed 1     real time
+    --speed 4     4x faster
+    --speed max   as fast as possible (throughput)
+
+Usage: python session_replay.py SESSION.srs [--speed 1|N|max] [--profile ID] [--timeline out.jsonl] [--verbose]
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+import contextlib
+from collections import Counter
+
+from landmark_protocol import decode_json_line, decode_binary_line, BINARY_PREFIX
+from preset_loader import load_preset_modules, resolve_logic, apply_settings
+from session_recorder import read_session
+from xbox_adapter import XboxAdapter
+
+
+class ReplayClock:
+    """Stands in for time.time(): returns the timestamp of the record being replayed"""
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+class RecordingGamepad:
+    """vgamepad.VX360Gamepad stand-in that logs button edges and axis changes"""
+    def __init__(self, clock):
+        self.clock = clock
+        self.events = [] # (t, kind, name, value)
+        self.axes = {'steer': 0.0, 'accel': 0.0, 'brake': 0.0}
+        self.reports = 0
+
+    def _axis(self, name, value):
+        if self.axes[name] != value:
+            self.axes[name] = value
+            self.events.append((self.clock(), 'axis', name, value))
+
+    def left_joystick_float(self, x_value_float, y_value_float):
+        self._axis('steer', x_value_float)
+
+    def right_trigger_float(self, value_float):
+        self._axis('accel', value_float)
+
+    def left_trigger_float(self, value_float):
+        self._axis('brake', value_float)
+
+    def press_button(self, button):
+        self.events.append((self.clock(), 'press', getattr(button, 'name', button), 1))
+
+    def release_button(self, button):
+        self.events.append((self.clock(), 'release', getattr(button, 'name', button), 0))
+
+    def update(self):
+        self.reports += 1
+
+
+class SessionReplay:
+    def __init__(self, records, profile=None, speed=None, modules=None):
+        """speed: playback factor (1.0 = real time), None = as fast as possible"""
+        self.records = records
+        self.forced_profile = profile
+        self.profile = profile or ""
+        self.speed = speed
+        self.clock = ReplayClock()
+        self.gamepad = RecordingGamepad(self.clock)
+        self.adapter = XboxAdapter(gamepad=self.gamepad, clock=self.clock)
+
+        # Fresh preset instances (module-level `logic`) with the replay clock injected
+        if modules is None:
+            modules = load_preset_modules(prefix="replay_", log=lambda *a, **k: None)
+        self.registry = {}
+        for name, mod in modules.items():
+            if hasattr(mod, 'logic'):
+                if hasattr(mod.logic, 'clock'):
+                    mod.logic.clock = self.clock
+                self.registry[name] = mod.logic
+
+        self.frames = 0
+        self.errors = 0
+        self.token_counts = Counter()
+        self.timeline = [] # One entry per record that produced tokens or controller events
+
+    def _logic(self):
+        return resolve_logic(self.registry, self.profile)
+
+    def _landmarks(self, line):
+        logic = self._logic()
+        if not logic:
+            return []
+        if line.startswith(BINARY_PREFIX):
+            packet = decode_binary_line(line)
+            if hasattr(logic, 'process_frame'):
+                from landmark_frame import LandmarkFrame
+                if packet.multiplayer: # Every player is evaluated (their state evolves); player 0 drives the replay pad
+                    from player_batch import player_batch
+                    return player_batch(logic).process(LandmarkFrame.from_player_packet(packet))[0]
+                return self._process_frame(logic, LandmarkFrame.from_packet(packet))
+            return logic.process(*packet.to_legacy())
+        pose_lm, hands_lm, handedness_lm, frame_id, capture_ts = decode_json_line(line)
+        if hasattr(logic, 'process_frame'):
+            from landmark_frame import LandmarkFrame
+            return self._process_frame(logic, LandmarkFrame.from_dicts(pose_lm, hands_lm, handedness_lm, frame_id, capture_ts))
+        return logic.process(pose_lm, hands_lm, handedness_lm)
+
+    def _process_frame(self, logic, frame):
+        from landmark_filter import filter_frame # Same stages as the bridge
+        from gesture_templates import gesture_tokens
+        frame = filter_frame(logic, frame)
+        tokens = logic.process_frame(frame)
+        matched = gesture_tokens(logic, frame)
+        return list(tokens) + matched if matched else tokens
+
+    def dispatch(self, line):
+        """Same routing as the bridge for the recordable commands. Returns tokens sent to the adapter."""
+        if line.startswith("SET_PROFILE:"):
+            if not self.forced_profile:
+                self.profile = line[len("SET_PROFILE:"):].strip()
+            return None
+        if line.startswith("SET_SETTINGS:"):
+            logic = self._logic()
+            if logic:
+                apply_settings(logic, json.loads(line[len("SET_SETTINGS:"):]), log=lambda *a, **k: None)
+            return None
+        if line.startswith("LOAD_PRESET:"):
+            from preset_schema import compile_store_preset
+            preset = compile_store_preset(json.loads(line[len("LOAD_PRESET:"):]))
+            preset.clock = self.clock
+            self.registry[preset.preset_id] = preset
+            return None
+        if line == "idle":
+            self.adapter.update([])
+            return []
+        if line.startswith("RAW_LM"):
+            self.frames += 1
+            tokens = self._landmarks(line)
+        else:
+            # Recorded after the bridge's access gate: every token line here was sent live
+            tokens = [t.strip() for t in line.split(',') if t.strip()]
+        if tokens:
+            self.adapter.update(tokens)
+        return tokens
+
+    def run(self, verbose=False):
+        if not self.records:
+            return self.summary(0.0)
+        t0 = self.records[0][0]
+        wall0 = time.perf_counter()
+        out = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+        with out:
+            for i, (ts, line) in enumerate(self.records):
+                if self.speed:
+                    ahead = (ts - t0) / self.speed - (time.perf_counter() - wall0)
+                    if ahead > 0:
+                        time.sleep(ahead)
+                self.clock.now = ts
+                n_events = len(self.gamepad.events)
+                try:
+                    tokens = self.dispatch(line)
+                except Exception as e:
+                    self.errors += 1
+                    print(f"LOGIC_ERROR: {e}", flush=True)
+                    continue
+                if tokens:
+                    self.token_counts.update(t.split(':')[0] for t in tokens)
+                events = self.gamepad.events[n_events:]
+                if tokens or events:
+                    self.timeline.append({
+                        'i': i,
+                        't': round(ts - t0, 6),
+                        'tokens': tokens or [],
+                        # Edges within one report are simultaneous; sorted so timelines diff cleanly
+                        'events': sorted([kind, name, value] for _, kind, name, value in events),
+                    })
+        return self.summary(time.perf_counter() - wall0)
+
+    def summary(self, wall):
+        duration = self.records[-1][0] - self.records[0][0] if self.records else 0.0
+        presses = Counter(name for _, kind, name, _ in self.gamepad.events if kind == 'press')
+        return {
+            'records': len(self.records),
+            'frames': self.frames,
+            'errors': self.errors,
+            'duration_s': duration,
+            'wall_s': wall,
+            'fps': self.frames / wall if wall > 0 else 0.0,
+            'realtime_factor': duration / wall if wall > 0 else 0.0,
+            'reports': self.gamepad.reports,
+            'tokens': dict(sorted(self.token_counts.items())),
+            'presses': dict(sorted(presses.items())),
+        }
+
+
+def parse_speed(value):
+    return None if value == 'max' else float(value)
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('session')
+    parser.add_argument('--speed', default='1', help="Playback factor (1 = real time) or 'max'")
+    parser.add_argument('--profile', default=None, help="Override the recorded profile")
+    parser.add_argument('--timeline', default=None, help="Write the token/press timeline as JSON lines")
+    parser.add_argument('--verbose', action='store_true', help="Show preset / controller output")
+    args = parser.parse_args()
+
+    header, records = read_session(args.session)
+    replay = SessionReplay(records, profile=args.profile, speed=parse_speed(args.speed))
+    result = replay.run(verbose=args.verbose)
+
+    print(
+        f"REPLAY_STATS: Profile={replay.profile or header.get('profile', '')} | Speed={args.speed}"
+        f" | Frames={result['frames']} | Duration={result['duration_s']:.2f}s | Wall={result['wall_s']:.3f}s"
+        f" | FPS={result['fps']:.0f} | Realtime=x{result['realtime_factor']:.1f} | Reports={result['reports']}"
+        f" | Errors={result['errors']}",
+        flush=True,
+    )
+    print(f"REPLAY_TOKENS: {result['tokens']}", flush=True)
+    print(f"REPLAY_PRESSES: {result['presses']}", flush=True)
+
+    if args.timeline:
+        with open(args.timeline, 'w', encoding='utf-8') as f:
+            for entry in replay.timeline:
+                f.write(json.dumps(entry) + "\n")
+        print(f"REPLAY_TIMELINE: Entries={len(replay.timeline)} | Path={args.timeline}", flush=True)
+    sys.exit(1 if result['errors'] else 0)
+
+if __name__ == "__main__":
+    main()
@@ -9,26 +9,116 @@ except ImportError:
     HAS_VGJ = False
     print("[DRIVER_ERROR] 'vgamepad' library not found. pip install vgamepad", flush=True)
 
+# Generic Mapping (Presets should return these tokens)
+BUTTON_NAMES = {
+    'A': 'XUSB_GAMEPAD_A',
+    'B': 'XUSB_GAMEPAD_B',
+    'X': 'XUSB_GAMEPAD_X',
+    'Y': 'XUSB_GAMEPAD_Y',
+    'LB': 'XUSB_GAMEPAD_LEFT_SHOULDER',
+    'RB': 'XUSB_GAMEPAD_RIGHT_SHOULDER',
+    'START': 'XUSB_GAMEPAD_START',
+    'BACK': 'XUSB_GAMEPAD_BACK',
+    'UP': 'XUSB_GAMEPAD_DPAD_UP',
+    'DOWN': 'XUSB_GAMEPAD_DPAD_DOWN',
+    'LEFT': 'XUSB_GAMEPAD_DPAD_LEFT',
+    'RIGHT': 'XUSB_GAMEPAD_DPAD_RIGHT',
+    'GUIDE': 'XUSB_GAMEPAD_GUIDE',
+}
+# Token -> vgamepad button (button names when vgamepad is missing, for fake gamepads)
+BUTTONS = {
+    token: getattr(vg.XUSB_BUTTON, name) if HAS_VGJ else name
+    for token, name in BUTTON_NAMES.items()
+}
+
+# Controller state model: buttons are a bitmask (bit i = BUTTON_TOKENS[i]), axes a tuple
+BUTTON_TOKENS = tuple(BUTTON_NAMES)
+BUTTON_BITS = {token.lower(): 1 << i for i, token in enumerate(BUTTON_TOKENS)}
+STEER, ACCEL, BRAKE = range(3)
+NEUTRAL_AXES = (0.0, 0.0, 0.0)
+
+TOKEN_CACHE_SIZE = 4096 # Distinct tokens remembered (steer values repeat within a session)
+_token_cache = {}
+
+def parse_token(token):
+    """Token -> (button bit, axis, axis value); bit 0 / axis None when the token is neither (cached)"""
+    parsed = _token_cache.get(token)
+    if parsed is None:
+        name = token.lower()
+        parsed = (BUTTON_BITS.get(name, 0), None, 0.0)
+        if name.startswith('steer:'):
+            try:
+                parsed = (0, STEER, float(name[len('steer:'):]))
+            except ValueError:
+                pass
+        elif name == 'accel':
+            parsed = (0, ACCEL, 1.0)
+        elif name == 'brake':
+            parsed = (0, BRAKE, 1.0)
+        if len(_token_cache) >= TOKEN_CACHE_SIZE:
+            _token_cache.clear()
+        _token_cache[token] = parsed
+    return parsed
+
+def desired_state(tokens):
+    """(button mask, (steer, accel, brake)) a token set asks for; axes not mentioned are neutral"""
+    buttons = 0
+    axes = [0.0, 0.0, 0.0]
+    for token in tokens:
+        bit, axis, value = parse_token(token)
+        if axis is not None:
+            axes[axis] = value
+        else:
+            buttons |= bit
+    return buttons, tuple(axes)
+
+def _bits(mask):
+    """Indices of the set bits of a button mask"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
 class XboxAdapter:
-    def __init__(self):
-        self.gamepad = None
-        self.active_buttons = set()
-        self.state = {} # key -> { 'pressed': bool, 'time': float }
-        self.cooldowns = {}
+    """
+    Token sets -> virtual Xbox 360 reports. The adapter keeps the state of the
+    last report it sent (button mask + axes), diffs every token set against
+    it and only touches the buttons / axes that changed; a token set that
+    matches the sent state sends no report at all (counted as suppressed).
+    """
+
+    def __init__(self, gamepad=None, clock=time.time):
+        """gamepad / clock can be injected (replay, tests); otherwise a ViGEm pad is created"""
+        self.gamepad = gamepad
+        self.clock = clock
+        self.buttons = 0 # Button mask of the last report sent
+        self.axes = NEUTRAL_AXES # (steer, accel, brake) of the last report sent
+        self.pressed_at = [0.0] * len(BUTTON_TOKENS)
+        self.ready_at = [0.0] * len(BUTTON_TOKENS) # Cooldown after a release
+        self.reset_stats()
         
         # CONFIGURATION
         self.MIN_HOLD = 0.01
         self.COOLDOWN = 0.0
 
-        if HAS_VGJ:
+        if gamepad is None and HAS_VGJ:
             self._init_controller()
             if not self.gamepad:
                 # Start a background retry if it failed (maybe driver just installed)
                 threading.Thread(target=self._retry_init, daemon=True).start()
 
+    def reset_stats(self):
+        self.updates = 0
+        self.reports = 0
+        self.suppressed = 0 # Token sets that matched the last report
+        self.presses = 0
+        self.releases = 0
+
     def _init_controller(self):
         try:
             self.gamepad = vg.VX360Gamepad()
+            self.buttons, self.axes = 0, NEUTRAL_AXES # A new pad starts neutral
             print("[CONTROLLER] Virtual Xbox 360 Controller CREATE SUCCESS", flush=True)
             return True
         except Exception as e:
@@ -47,96 +137,74 @@ class XboxAdapter:
                 print("[CONTROLLER] Virtual Controller CONNECTED on retry.", flush=True)
                 break
 
-    def update(self, active_tokens):
-        if not self.gamepad: return
-
-        now = time.time()
-        active_set = set(t.lower() for t in active_tokens)
-
-        # 1. PROCESS ANALOG AXES (Racing / Smooth Movement)
-        # Reset axes to neutral initially unless held
-        steer_val = 0.0
-        accel_val = 0.0
-        brake_val = 0.0
-
-        for token in active_set:
-            if token.startswith('steer:'):
-                try:
-                    steer_val = float(token.split(':')[1])
-                except: pass
-            elif token == 'accel':
-                accel_val = 1.0
-            elif token == 'brake':
-                brake_val = 1.0
-
-        # Apply Analog State
-        self.gamepad.left_joystick_float(x_value_float=steer_val, y_value_float=0.0)
-        self.gamepad.right_trigger_float(value_float=accel_val)
-        self.gamepad.left_trigger_float(value_float=brake_val)
-
-        # 2. PROCESS BUTTON PRESSES (Digital)
-        for token in active_set:
-            if token.startswith('steer:') or token in ['accel', 'brake']:
-                continue
-            
-            btn = self._resolve_button(token)
-            if not btn: continue
-
-            # Init State
-            if token not in self.state:
-                self.state[token] = { 'pressed': False, 'time': 0 }
-            
-            st = self.state[token]
-            last_release = self.cooldowns.get(token, 0)
-            
-            # REMOVED PULSING: Only press if not currently pressed and not in cooldown
-            if not st['pressed'] and now >= last_release:
-                self.gamepad.press_button(button=btn)
-                st['pressed'] = True
-                st['time'] = now
-                print(f"[CONTROLLER] PRESS {token.upper()}", flush=True)
-        
-        # 3. PROCESS BUTTON RELEASES
-        for token, st in list(self.state.items()):
-            if not st['pressed']: continue
-            if token.startswith('steer:') or token in ['accel', 'brake']:
-                continue
-
-            is_active = token in active_set
-            duration = now - st['time']
-            
-            # Standard Release Pattern (No Safety Timeout)
-            if not is_active and duration > self.MIN_HOLD:
-                btn = self._resolve_button(token)
-                if btn:
-                    self.gamepad.release_button(button=btn)
-                    st['pressed'] = False
-                    self.cooldowns[token] = now + self.COOLDOWN
-                    print(f"[CONTROLLER] RELEASE {token.upper()}", flush=True)
-        
-        self.gamepad.update() # Single update call at the end for performance
+    def update(self, active_tokens, trace=None):
+        """Applies one token set. `trace` (bridge FrameTrace) is stamped once the report is sent."""
+        gamepad = self.gamepad
+        if not gamepad: return
+        self.updates += 1
+        wanted, axes = desired_state(active_tokens)
+        sent = self.buttons
 
-    def _resolve_button(self, name):
-        name = name.upper()
-        
-        # Generic Mapping (Presets should return these tokens)
-        mapping = {
-            'A': vg.XUSB_BUTTON.XUSB_GAMEPAD_A,
-            'B': vg.XUSB_BUTTON.XUSB_GAMEPAD_B,
-            'X': vg.XUSB_BUTTON.XUSB_GAMEPAD_X,
-            'Y': vg.XUSB_BUTTON.XUSB_GAMEPAD_Y,
-            'LB': vg.XUSB_BUTTON.XUSB_GAMEPAD_LEFT_SHOULDER,
-            'RB': vg.XUSB_BUTTON.XUSB_GAMEPAD_RIGHT_SHOULDER,
-            'START': vg.XUSB_BUTTON.XUSB_GAMEPAD_START,
-            'BACK': vg.XUSB_BUTTON.XUSB_GAMEPAD_BACK,
-            'UP': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_UP,
-            'DOWN': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_DOWN,
-            'LEFT': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_LEFT,
-            'RIGHT': vg.XUSB_BUTTON.XUSB_GAMEPAD_DPAD_RIGHT,
-            'GUIDE': vg.XUSB_BUTTON.XUSB_GAMEPAD_GUIDE,
-        }
-        
-        return mapping.get(name)
+        if wanted == sent and axes == self.axes:
+            self.suppressed += 1 # The pad already shows this state
+            if trace is not None: trace.mark_report()
+            return
+
+        now = self.clock()
+        buttons = sent
+
+        # 1. ANALOG AXES (Racing / Smooth Movement): only the ones that moved
+        steer, accel, brake = axes
+        if steer != self.axes[STEER]:
+            gamepad.left_joystick_float(x_value_float=steer, y_value_float=0.0)
+        if accel != self.axes[ACCEL]:
+            gamepad.right_trigger_float(value_float=accel)
+        if brake != self.axes[BRAKE]:
+            gamepad.left_trigger_float(value_float=brake)
+        changed = axes != self.axes
+        self.axes = axes
+
+        # 2. BUTTON PRESSES (not while a button is in its release cooldown)
+        for i in _bits(wanted & ~sent):
+            if now >= self.ready_at[i]:
+                gamepad.press_button(button=BUTTONS[BUTTON_TOKENS[i]])
+                buttons |= 1 << i
+                self.pressed_at[i] = now
+                self.presses += 1
+                print(f"[CONTROLLER] PRESS {BUTTON_TOKENS[i]}", flush=True)
+
+        # 3. BUTTON RELEASES (held for at least MIN_HOLD)
+        for i in _bits(sent & ~wanted):
+            if now - self.pressed_at[i] > self.MIN_HOLD:
+                gamepad.release_button(button=BUTTONS[BUTTON_TOKENS[i]])
+                buttons &= ~(1 << i)
+                self.ready_at[i] = now + self.COOLDOWN
+                self.releases += 1
+                print(f"[CONTROLLER] RELEASE {BUTTON_TOKENS[i]}", flush=True)
+
+        if buttons != sent or changed:
+            self.buttons = buttons
+            gamepad.update() # One report for every change of this token set
+            self.reports += 1
+        else:
+            self.suppressed += 1 # Every change is waiting on a cooldown / minimum hold
+        if trace is not None: trace.mark_report()
+
+    def status(self, label="player 1"):
+        rate = self.suppressed / self.updates * 100 if self.updates else 0.0
+        return (
+            f"CONTROLLER_STATS: {label} | Updates={self.updates} Reports={self.reports}"
+            f" Suppressed={self.suppressed} ({rate:.1f}%) | Presses={self.presses} Releases={self.releases}"
+        )
+
+# Singleton (created on first access, so offline tools can import XboxAdapter
+# without plugging in a virtual controller)
+_singleton = None
 
-# Singleton
-xbox_adapter = XboxAdapter()
+def __getattr__(name):
+    global _singleton
+    if name == 'xbox_adapter':
+        if _singleton is None:
+            _singleton = XboxAdapter()
+        return _singleton
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -7,6 +7,7 @@ import { drawConnectors, drawLandmarks } from '@mediapipe/drawing_utils';
 import { useSrika } from '../context/SrikaContext';
 import { useEngine, CameraState } from '../context/EngineContext';
 import { gestureEngine } from '../engine/GestureEngine';
+import { InputController } from '../engine/InputController';
 import { settingsManager } from '../managers/SettingsManager';
 
 
@@ -179,6 +180,7 @@ export function LiveCameraPanel() {
         isProcessingFrame.current = true;
         try {
           // Serial processing (More stable WASM state)
+          InputController.markFrameCaptured();
           if (poseRef.current) {
             await poseRef.current.send({ image: videoRef.current! });
           }
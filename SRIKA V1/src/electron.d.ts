@@ -7,6 +7,7 @@ declare global {
             maximize: () => void;
             close: () => void;
             triggerKey: (key: string) => void;
+            loadPreset: (preset: import('./managers/ProfileManager').StorePreset) => void;
             setGameMode: (on: boolean) => void;
             onAdminStatus: (callback: (status: boolean) => void) => void;
             onSteamStatus: (callback: (status: string) => void) => void;
@@ -21,10 +21,15 @@ export class InputController {
         // 1. Set Input Mode (Force KEYBOARD for Rebuild Test)
         window.electronAPI.triggerKey(`SET_INPUT_MODE:KEYBOARD`);
 
-        // 2. Set Profile Type (e.g., 'tekken-official' or 'asphalt9')
-        window.electronAPI.triggerKey(`SET_PROFILE:${profile.id}`);
+        // 2. Store presets: push the definition first, the bridge registers it under its store id
+        if (profile.storePreset) {
+            window.electronAPI.loadPreset(profile.storePreset);
+        }
+
+        // 3. Set Profile Type (e.g., 'tekken-official', 'asphalt9' or a store id)
+        window.electronAPI.triggerKey(`SET_PROFILE:${profile.storePreset?.id ?? profile.id}`);
 
-        // 3. Sync initial settings if any
+        // 4. Sync initial settings if any
         if (profile.settings) {
             this.syncSettings(profile.settings);
         }
@@ -127,16 +132,89 @@ export class InputController {
         this.activeKeys = [...mappedTokens];
     }
 
+    // Binary Landmark Frame Protocol (mirrors electron/landmark_protocol.py)
+    private static readonly LM_PROTOCOL_VERSION = 1;
+    private static readonly LM_HEADER_SIZE = 20;
+    private static readonly LM_FIELDS = 4;
+    private static readonly LM_MAX_HANDS = 2;
+    // Legacy RAW_LM JSON frames only when localStorage 'srika_landmark_transport' is 'json' (bridges before RAW_LMB)
+    private static readonly useBinaryLandmarks: boolean = localStorage.getItem('srika_landmark_transport') !== 'json';
+    private static lmFrameId: number = 0;
+    private static lastCaptureTs: number = 0;
+
+    /**
+     * Stamp the camera frame that is about to be sent to MediaPipe.
+     * The bridge measures capture -> controller report latency from this timestamp.
+     */
+    public static markFrameCaptured() {
+        // Epoch seconds (same clock as Python's time.time())
+        this.lastCaptureTs = (performance.timeOrigin + performance.now()) / 1000;
+    }
+
+    private static encodeLandmarkFrame(frameId: number, captureTs: number, pose: any[], hands: any[][], handedness: any[]): string {
+        const handCount = Math.min(hands.length, this.LM_MAX_HANDS);
+        const floatCount = (pose.length + handCount * 21) * this.LM_FIELDS;
+        const buffer = new ArrayBuffer(this.LM_HEADER_SIZE + floatCount * 4);
+        const view = new DataView(buffer);
+
+        let mask = 0;
+        for (let i = 0; i < handCount; i++) {
+            const h = handedness[i];
+            const label = (h && (h.label || h.categoryName)) || h;
+            if (label === 'Right') mask |= (1 << i);
+        }
+
+        // Header: magic 'SL' | version | flags | frame_id | capture_ts | pose_count | hand_count | handedness | reserved
+        view.setUint8(0, 0x53);
+        view.setUint8(1, 0x4c);
+        view.setUint8(2, this.LM_PROTOCOL_VERSION);
+        view.setUint8(3, 0);
+        view.setUint32(4, frameId >>> 0, true);
+        view.setFloat64(8, captureTs, true);
+        view.setUint8(16, pose.length);
+        view.setUint8(17, handCount);
+        view.setUint8(18, mask);
+        view.setUint8(19, 0);
+
+        const floats = new Float32Array(buffer, this.LM_HEADER_SIZE, floatCount);
+        let o = 0;
+        const pack = (p: any) => {
+            floats[o++] = p.x;
+            floats[o++] = p.y;
+            floats[o++] = p.z;
+            floats[o++] = p.visibility ?? 0;
+        };
+        pose.forEach(pack);
+        for (let i = 0; i < handCount; i++) hands[i].forEach(pack);
+
+        const bytes = new Uint8Array(buffer);
+        let binary = '';
+        for (let i = 0; i < bytes.length; i++) binary += String.fromCharCode(bytes[i]);
+        return btoa(binary);
+    }
+
     public static sendRawLandmarks(poseLandmarks: any, handLandmarks?: any[], handedness?: any[]) {
         if (!this.isInputAllowed || !window.electronAPI) return;
 
-        // Protocol: RAW_LM:JSON (Updated to include handedness)
-        const payload = {
-            pose: poseLandmarks,
-            hands: handLandmarks || [],
-            handedness: handedness || []
-        };
-        window.electronAPI.triggerKey(`RAW_LM:${JSON.stringify(payload)}`);
+        this.lmFrameId++;
+        // Capture timestamp in epoch seconds (falls back to send time if the camera loop did not stamp it)
+        const captureTs = this.lastCaptureTs || (performance.timeOrigin + performance.now()) / 1000;
+
+        if (this.useBinaryLandmarks) {
+            // Protocol: RAW_LMB:BASE64 (Versioned binary frame)
+            const frame = this.encodeLandmarkFrame(this.lmFrameId, captureTs, poseLandmarks || [], handLandmarks || [], handedness || []);
+            window.electronAPI.triggerKey(`RAW_LMB:${frame}`);
+        } else {
+            // Protocol: RAW_LM:JSON (Legacy fallback, includes handedness)
+            const payload = {
+                pose: poseLandmarks,
+                hands: handLandmarks || [],
+                handedness: handedness || [],
+                frameId: this.lmFrameId,
+                captureTs
+            };
+            window.electronAPI.triggerKey(`RAW_LM:${JSON.stringify(payload)}`);
+        }
 
         // DIAGNOSTIC
         if (!(this as any).frame_count) (this as any).frame_count = 0;
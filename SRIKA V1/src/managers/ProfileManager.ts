@@ -18,6 +18,15 @@ export interface EngineConfig {
     handsEnabled?: boolean;
 }
 
+// Store preset: a declarative definition (electron/presets/<definition_dir>/definition.json)
+// compiled by the bridge instead of a native logic.py
+export interface StorePreset {
+    id: string;
+    definition_dir: string;
+    engine_config?: { deadzone?: number; curve?: number; smoothing?: number };
+    gesture_templates?: Record<string, any>[];
+}
+
 export interface GameProfile {
     id: string;
     name: string;
@@ -29,6 +38,7 @@ export interface GameProfile {
     mappings: ActionMapping[];
     customPoses: Record<string, NormalizedLandmarkList>;
     engineConfig?: EngineConfig;
+    storePreset?: StorePreset;
     settings?: Record<string, any>;
     created_at: number; // Updated name
     updated_at: number; // Added
@@ -173,7 +183,7 @@ export class ProfileManager {
         window.dispatchEvent(new CustomEvent('srika-active-profile-changed', { detail: id }));
     }
 
-    public static async createProfile(name: string, gameName: string = 'Custom Game', category: string = 'Custom'): Promise<GameProfile> {
+    public static async createProfile(name: string, gameName: string = 'Custom Game', category: string = 'Custom', storePreset?: StorePreset): Promise<GameProfile> {
         const now = Date.now();
         const profile: GameProfile = {
             id: crypto.randomUUID(),
@@ -187,7 +197,8 @@ export class ProfileManager {
             total_hours_used: 0,
             total_sessions: 0,
             mappings: [],
-            customPoses: {}
+            customPoses: {},
+            storePreset
         };
         this.profiles.push(profile);
         await this.saveProfiles();
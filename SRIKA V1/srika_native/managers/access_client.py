@@ -1,5 +1,4 @@
 
-import requests
 import json
 import time
 import logging
@@ -35,6 +34,7 @@ class AccessClient:
         # ------------------
 
         try:
+            import requests # Deferred: only needed for real network verification
             headers = {"Authorization": f"Bearer {jwt_token}"}
             response = requests.post(VERIFY_API_URL, headers=headers, timeout=5)
             
@@ -88,6 +88,7 @@ class InventoryManager:
                     "name": data.get("name"),
                     "game": data.get("game"),
                     "version": data.get("version", "1.0"),
+                    "gesture_templates": len(data.get("gesture_templates", [])),
                     "active": preset_id == self.active_preset_id
                 })
             except Exception as e:
@@ -1,7 +1,18 @@
 
+import json
 import time
+from pathlib import Path
 from .inventory_manager import InventoryManager
 
+# Declarative preset definitions (electron/preset_schema.py) live next to the
+# native presets as presets/<folder>/definition.json. Store presets ship these
+# instead of Python code; the engine compiles them on LOAD_PRESET.
+ROOT_DIR = Path(__file__).resolve().parents[2]
+PRESETS_DIR = ROOT_DIR / ("_core" if (ROOT_DIR / "_core").exists() else "electron") / "presets"
+
+def load_definition(folder: str) -> dict:
+    return json.loads((PRESETS_DIR / folder / "definition.json").read_text())
+
 class StoreService:
     def __init__(self, inventory_mgr: InventoryManager):
         self.inventory_mgr = inventory_mgr
@@ -20,11 +31,12 @@ class StoreService:
                 "price": "Free",
                 "description": "Optimized for Legends. Smooth steering and precise drift.",
                 "engine_config": {
-                    # Mock Engine Config
+                    # Applied to every axis of the definition
                     "deadzone": 0.15,
                     "curve": 2.2,
                     "smoothing": 0.12
-                }
+                },
+                "definition": load_definition("asphalt9")
             },
             {
                 "id": "tekken8_mishima",
@@ -37,7 +49,8 @@ class StoreService:
                     "deadzone": 0.05,
                     "curve": 1.0,
                     "smoothing": 0.05
-                }
+                },
+                "definition": load_definition("tekken")
             },
             {
                 "id": "sf6_modern",
@@ -50,7 +63,8 @@ class StoreService:
                     "deadzone": 0.10,
                     "curve": 1.5,
                     "smoothing": 0.10
-                }
+                },
+                "definition": load_definition("tekken")
             }
         ]
 
@@ -0,0 +1,77 @@
+"""
+CommandRouter resolution: hot prefixes, exact lines, 'A:' / 'A:B:' colon
+heads (longest first) and the default token handler.
+
+Run: python -m unittest discover -s test
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'electron'))
+
+from command_router import CommandRouter
+
+
+class CommandRouterTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.router = CommandRouter(default=self.handler('default'))
+
+    def handler(self, name):
+        return lambda line: self.calls.append((name, line))
+
+    def routed(self, line):
+        self.router.dispatch(line)
+        return self.calls[-1][0]
+
+    def test_hot_prefix_wins_over_colon_heads(self):
+        self.router.register("RAW_LMB", self.handler('binary'), hot=True)
+        self.router.register("RAW_LM", self.handler('json'), hot=True)
+        self.router.register("RAW_LMB:", self.handler('prefixed'))
+        self.assertEqual(self.routed("RAW_LMB:AAAA"), 'binary')
+        self.assertEqual(self.routed('RAW_LM:{"pose": []}'), 'json')
+
+    def test_exact_lines_match_case_insensitively(self):
+        self.router.register("idle", self.handler('idle'), exact=True)
+        self.assertEqual(self.routed("idle"), 'idle')
+        self.assertEqual(self.routed("IDLE"), 'idle')
+        self.assertEqual(self.routed("idle,A"), 'default')
+
+    def test_colon_heads_longest_first(self):
+        self.router.register("CMD:", self.handler('cmd'))
+        self.router.register("CMD:VERIFY:", self.handler('verify'))
+        self.router.register("CMD:DUMP_STATS", self.handler('dump'), exact=True)
+        self.router.register("CMD:DUMP_STATS:", self.handler('dump_reset'))
+        self.assertEqual(self.routed("CMD:VERIFY:jwt.with:colons"), 'verify')
+        self.assertEqual(self.routed("CMD:OTHER:x"), 'cmd')
+        self.assertEqual(self.routed("CMD:DUMP_STATS"), 'dump')
+        self.assertEqual(self.routed("CMD:DUMP_STATS:RESET"), 'dump_reset')
+
+    def test_payload_colons_do_not_change_the_head(self):
+        self.router.register("SET_SETTINGS:", self.handler('settings'))
+        self.assertEqual(self.routed('SET_SETTINGS:{"a": {"b": 1}}'), 'settings')
+        self.assertEqual(self.calls[-1][1], 'SET_SETTINGS:{"a": {"b": 1}}')
+
+    def test_unmatched_lines_go_to_the_default(self):
+        self.router.register("SET_PROFILE:", self.handler('profile'))
+        self.assertEqual(self.routed("X,Y"), 'default')
+        self.assertEqual(self.routed("SET_PROFILE"), 'default') # No colon: not the prefix command
+        self.assertEqual(self.router.resolve("steer:0.5")[1], 'DEFAULT')
+
+    def test_unregister_and_stats(self):
+        self.router.register("LOAD_PRESET:", self.handler('load'))
+        self.router.dispatch("LOAD_PRESET:{}")
+        self.router.unregister("LOAD_PRESET:")
+        self.assertEqual(self.routed("LOAD_PRESET:{}"), 'default')
+        self.assertEqual(self.router.stats['LOAD_PRESET'].count, 1)
+        self.assertTrue(any(line.startswith("ROUTER_STATS: DEFAULT") for line in self.router.dump_stats()))
+
+    def test_prefix_commands_must_end_with_a_colon(self):
+        with self.assertRaises(ValueError):
+            self.router.register("SET_PROFILE", self.handler('profile'))
+
+
+if __name__ == '__main__':
+    unittest.main()
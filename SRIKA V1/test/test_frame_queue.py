@@ -0,0 +1,87 @@
+"""
+FrameCoalescingQueue: landmark frames collapse to the newest, control lines
+keep strict FIFO order.
+
+Run: python -m unittest discover -s test
+"""
+
+import os
+import sys
+import queue
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'electron'))
+
+from frame_queue import FrameCoalescingQueue
+
+
+def frame(n):
+    return (float(n), f"RAW_LMB:frame{n}")
+
+def control(line, n=0):
+    return (float(n), line)
+
+
+class FrameQueueTest(unittest.TestCase):
+    def setUp(self):
+        self.q = FrameCoalescingQueue()
+
+    def drain(self):
+        lines = []
+        while not self.q.empty():
+            lines.append(self.q.get_nowait()[1])
+        return lines
+
+    def test_consecutive_frames_coalesce_to_the_newest(self):
+        for n in range(5):
+            self.q.put(frame(n))
+        self.assertEqual(self.drain(), ["RAW_LMB:frame4"])
+        frames_in, coalesced, dropped, _ = self.q.take_stats()
+        self.assertEqual((frames_in, coalesced, dropped), (5, 4, 0))
+
+    def test_control_lines_keep_fifo_order(self):
+        lines = ["SET_PROFILE:tekken", "X,Y", "idle", "CMD:DUMP_STATS", "SET_SETTINGS:{}"]
+        for line in lines:
+            self.q.put(control(line))
+        self.assertEqual(self.drain(), lines)
+
+    def test_frame_behind_a_control_line_evicts_the_stale_frame(self):
+        self.q.put(frame(1))
+        self.q.put(control("SET_PROFILE:asphalt9"))
+        self.q.put(control("idle"))
+        self.q.put(frame(2))
+        # The command stays in place; only the newest frame is left, after it
+        self.assertEqual(self.drain(), ["SET_PROFILE:asphalt9", "idle", "RAW_LMB:frame2"])
+        self.assertEqual(self.q.take_stats()[2], 1)
+
+    def test_frames_between_controls_keep_the_controls_in_order(self):
+        self.q.put(control("A", 1))
+        self.q.put(frame(1))
+        self.q.put(frame(2))
+        self.q.put(control("B", 2))
+        self.q.put(frame(3))
+        self.q.put(control("C", 3))
+        self.assertEqual(self.drain(), ["A", "B", "RAW_LMB:frame3", "C"])
+
+    def test_consumed_frame_is_not_replaced(self):
+        self.q.put(frame(1))
+        self.assertEqual(self.q.get_nowait()[1], "RAW_LMB:frame1")
+        self.q.put(frame(2))
+        self.q.put(frame(3))
+        self.assertEqual(self.drain(), ["RAW_LMB:frame3"])
+
+    def test_none_sentinel_is_delivered(self):
+        self.q.put(frame(1))
+        self.q.put(None) # stdin EOF
+        self.assertEqual(self.q.get_nowait()[1], "RAW_LMB:frame1")
+        self.assertIsNone(self.q.get_nowait())
+
+    def test_get_times_out_when_empty(self):
+        with self.assertRaises(queue.Empty):
+            self.q.get(timeout=0.01)
+        with self.assertRaises(queue.Empty):
+            self.q.get_nowait()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+OutputWriter backpressure: with the pipe stalled, low-priority lines are
+dropped past the watermark and the hard cap evicts LOW lines before HIGH.
+
+Run: python -m unittest discover -s test
+"""
+
+import os
+import sys
+import threading
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'electron'))
+
+from output_writer import OutputWriter, classify, HIGH, LOW
+
+
+class StalledStream:
+    """Pipe stand-in whose first write blocks until release()"""
+    def __init__(self):
+        self.text = ''
+        self.writing = threading.Event()
+        self.gate = threading.Event()
+
+    def write(self, text):
+        self.writing.set()
+        self.gate.wait(5)
+        self.text += text
+
+    def flush(self):
+        pass
+
+    def release(self):
+        self.gate.set()
+
+    @property
+    def lines(self):
+        return self.text.splitlines()
+
+
+class OutputWriterTest(unittest.TestCase):
+    def start(self, low_watermark, high_limit):
+        self.stream = StalledStream()
+        self.writer = OutputWriter(self.stream, low_watermark=low_watermark, high_limit=high_limit)
+        self.addCleanup(self.writer.close)
+        self.addCleanup(self.stream.release)
+        self.writer.emit("G_ACTION:first")
+        self.assertTrue(self.stream.writing.wait(5)) # The writer thread is now stuck on the pipe
+
+    def finish(self):
+        self.stream.release()
+        self.writer.flush(5)
+        return self.stream.lines
+
+    def test_classify(self):
+        self.assertEqual(classify("PRESET_DEBUG: x"), LOW)
+        self.assertEqual(classify("[CONTROLLER] PRESS A"), LOW)
+        self.assertEqual(classify("G_ACTION:A"), HIGH)
+        self.assertEqual(classify("ACCESS_STATUS:PAID"), HIGH)
+
+    def test_low_lines_dropped_above_the_watermark(self):
+        self.start(low_watermark=2, high_limit=100)
+        self.writer.emit("DEBUG: kept")
+        self.writer.emit("G_ACTION:A")
+        self.writer.emit("DEBUG: dropped") # Backlog is at the watermark
+        self.writer.emit("G_ACTION:B")     # HIGH lines still queue
+        self.assertEqual(self.writer.dropped_low, 1)
+        self.assertEqual(self.finish(), [
+            "G_ACTION:first", "DEBUG: kept", "G_ACTION:A", "G_ACTION:B",
+            "OUTPUT_STATS: Dropped=1 | TotalLow=1 | TotalHigh=0",
+        ])
+
+    def test_hard_cap_evicts_oldest_low_before_high(self):
+        self.start(low_watermark=100, high_limit=4)
+        for line in ("DEBUG: 1", "G_ACTION:A", "DEBUG: 2", "G_ACTION:B"):
+            self.writer.emit(line)
+        self.writer.emit("G_ACTION:C") # Evicts DEBUG: 1
+        self.writer.emit("G_ACTION:D") # Evicts DEBUG: 2
+        self.writer.emit("G_ACTION:E") # Only HIGH left: evicts G_ACTION:A
+        self.assertEqual((self.writer.dropped_low, self.writer.dropped_high), (2, 1))
+        self.assertEqual(self.finish(), [
+            "G_ACTION:first", "G_ACTION:B", "G_ACTION:C", "G_ACTION:D", "G_ACTION:E",
+            "OUTPUT_STATS: Dropped=3 | TotalLow=2 | TotalHigh=1",
+        ])
+
+    def test_no_stats_line_without_drops(self):
+        self.start(low_watermark=8, high_limit=16)
+        self.writer.emit("DEBUG: x")
+        self.assertEqual(self.finish(), ["G_ACTION:first", "DEBUG: x"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+"""
+XboxAdapter state diffing: reports go out only when the pad state changes,
+and suppressing repeated token sets never swallows a short press.
+
+Run: python -m unittest discover -s test
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'electron'))
+
+from xbox_adapter import XboxAdapter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeGamepad:
+    """vgamepad stand-in that logs every call"""
+    def __init__(self):
+        self.calls = []
+        self.reports = 0
+
+    def press_button(self, button):
+        self.calls.append(('press', button))
+
+    def release_button(self, button):
+        self.calls.append(('release', button))
+
+    def left_joystick_float(self, x_value_float, y_value_float):
+        self.calls.append(('steer', x_value_float))
+
+    def right_trigger_float(self, value_float):
+        self.calls.append(('accel', value_float))
+
+    def left_trigger_float(self, value_float):
+        self.calls.append(('brake', value_float))
+
+    def update(self):
+        self.reports += 1
+
+
+class XboxAdapterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.pad = FakeGamepad()
+        self.adapter = XboxAdapter(gamepad=self.pad, clock=self.clock)
+
+    def step(self, tokens, dt=0.016):
+        self.clock.now += dt
+        self.adapter.update(tokens)
+
+    def test_repeated_token_sets_are_suppressed(self):
+        self.step(['A'])
+        self.step(['A'])
+        self.step(['A'])
+        self.assertEqual(self.pad.calls, [('press', 'XUSB_GAMEPAD_A')])
+        self.assertEqual(self.pad.reports, 1)
+        self.assertEqual(self.adapter.suppressed, 2)
+
+    def test_one_frame_press_after_suppression_is_sent(self):
+        for _ in range(5):
+            self.step([]) # Idle: matches the neutral pad, nothing sent
+        self.assertEqual(self.adapter.suppressed, 5)
+        self.step(['X']) # Held for a single frame
+        self.step([])
+        self.assertEqual(self.pad.calls, [('press', 'XUSB_GAMEPAD_X'), ('release', 'XUSB_GAMEPAD_X')])
+        self.assertEqual(self.pad.reports, 2)
+        self.assertEqual(self.adapter.buttons, 0)
+
+    def test_release_inside_min_hold_is_sent_on_a_later_frame(self):
+        self.step(['X'])
+        self.step([], dt=self.adapter.MIN_HOLD / 2) # Too early: the press stays on the pad
+        self.assertEqual(self.pad.calls, [('press', 'XUSB_GAMEPAD_X')])
+        self.step([])
+        self.assertEqual(self.pad.calls[-1], ('release', 'XUSB_GAMEPAD_X'))
+        self.assertEqual(self.adapter.buttons, 0)
+
+    def test_only_changed_axes_are_touched(self):
+        self.step(['ACCEL', 'steer:0.5'])
+        self.step(['ACCEL', 'steer:0.25'])
+        self.assertEqual(self.pad.calls, [('steer', 0.5), ('accel', 1.0), ('steer', 0.25)])
+        self.step([])
+        self.assertEqual(self.pad.calls[-2:], [('steer', 0.0), ('accel', 0.0)])
+        self.assertEqual(self.pad.reports, 3)
+
+
+if __name__ == '__main__':
+    unittest.main()